@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.core.signals import request_finished
 
 
 class BlogConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "blog"
+
+    def ready(self):
+        from .counters import flush_after_request
+        from . import mail  # noqa: F401  registers the "email" job
+        from . import checks  # noqa: F401  registers the system checks
+
+        # buffered view counts are written after the response has gone out
+        request_finished.connect(flush_after_request, dispatch_uid="blog_flush_views")
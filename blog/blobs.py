@@ -0,0 +1,144 @@
+"""
+Content-addressed storage for uploaded images.
+
+Every upload used to get a fresh name, so the same avatar uploaded five times
+(media/profile_pics/home.png, home_92kcisJ.png, ...) was stored five times,
+and no URL could be cached for long because a name said nothing about its
+bytes. Now:
+
+- BlobStorage hashes the upload (SHA-256) while streaming it to a temp file
+  and stores it as blobs/<ab>/<cd>/<digest>.<ext>. Identical bytes get the
+  same name, so they are stored (and their variants built) only once;
+- a blogs_media_blobs row per blob counts the bu_profile_pic and
+  bd_featured_image values that point at it: add_ref()/release() in the
+  views that set or replace them;
+- a name never changes content, so blobs and their variants are served with
+  a one-year `immutable` Cache-Control (IMMUTABLE_CACHE_CONTROL, y_media in
+  development; the front server should send the same header for
+  IMMUTABLE_PATH);
+- `manage.py gc_media` deletes blobs that nothing has referenced for a grace
+  period. Counts are a fast filter only: before deleting, it checks the
+  actual columns, so drift can cost disk space but never a live image.
+
+Upload and GC may meet on the same digest (an orphan uploaded again just as
+it is collected). The upload touches the row before moving its file in, and
+delete_blob() moves the file aside before its conditional row delete, putting
+it back if the row was touched; either way the file survives.
+"""
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.db.models import F
+from django.utils import timezone
+
+BLOBS_DIR = "blobs"
+TMP_DIR = posixpath.join(BLOBS_DIR, "tmp")
+# a blob or one of its variants (variants/<kind>/blobs/...); see images.variant_dir
+IMMUTABLE_PATH = re.compile(r"^(?:variants/[a-z]+/)?blobs/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}[./]")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def blob_name(digest, ext):
+    return posixpath.join(BLOBS_DIR, digest[:2], digest[2:4], f"{digest}{ext}")
+
+
+def is_blob(name):
+    return bool(name) and str(name).startswith(f"{BLOBS_DIR}/") and not str(name).startswith(f"{TMP_DIR}/")
+
+
+class BlobStorage(FileSystemStorage):
+    """FileSystemStorage that names files by the SHA-256 of their content."""
+
+    def get_available_name(self, name, max_length=None):
+        # the same name means the same bytes: reuse it instead of adding a suffix
+        return name
+
+    def _save(self, name, content):
+        ext = posixpath.splitext(name)[1].lower()
+        os.makedirs(self.path(TMP_DIR), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path(TMP_DIR), suffix=".part")
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    size += len(chunk)
+                    fh.write(chunk)
+            name = blob_name(digest.hexdigest(), ext)
+            _touch(name, size)
+
+            path = self.path(name)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.chmod(tmp, self.file_permissions_mode or 0o644)
+                os.replace(tmp, path)
+            return name
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+
+blob_storage = BlobStorage()
+
+
+# ----------- REFERENCES -----------
+def _touch(name, size):
+    """Make sure the blob has a row and restart its GC grace period."""
+    from .models import BlogsMediaBlobs
+
+    now = timezone.now()
+    if not BlogsMediaBlobs.objects.filter(bmb_name=name).update(bmb_updated_at=now):
+        BlogsMediaBlobs.objects.get_or_create(
+            bmb_name=name, defaults={"bmb_size": size, "bmb_created_at": now, "bmb_updated_at": now},
+        )
+
+
+def _adjust(name, delta):
+    from .models import BlogsMediaBlobs
+
+    if is_blob(name):
+        BlogsMediaBlobs.objects.filter(bmb_name=name).update(
+            bmb_refcount=F("bmb_refcount") + delta, bmb_updated_at=timezone.now(),
+        )
+
+
+def add_ref(name):
+    """A row now points at the blob (paths from before content addressing are ignored)."""
+    _adjust(name, 1)
+
+
+def release(name):
+    """A row no longer points at the blob."""
+    _adjust(name, -1)
+
+
+# ----------- GC -----------
+def delete_blob(name, cutoff):
+    """
+    Delete the blob if its row is still unreferenced and untouched since
+    `cutoff`; True if it was deleted. Variants are left to the caller.
+    """
+    from .models import BlogsMediaBlobs
+
+    path = blob_storage.path(name)
+    aside = f"{path}.gc"
+    moved = os.path.exists(path)
+    if moved:
+        os.replace(path, aside)
+    deleted, _ = BlogsMediaBlobs.objects.filter(
+        bmb_name=name, bmb_refcount__lte=0, bmb_updated_at__lt=cutoff,
+    ).delete()
+    if moved:
+        if deleted:
+            os.remove(aside)
+        elif not os.path.exists(path):
+            os.replace(aside, path)
+        else:
+            # uploaded again meanwhile; the new copy has the same bytes
+            os.remove(aside)
+    return bool(deleted)
@@ -0,0 +1,74 @@
+"""
+Process-wide category registry.
+
+blogs_categories is small and changes only through the admin category
+views, yet the home feed, the create/edit forms and the categories page all
+queried it on every request. The registry loads the whole table once per
+process and keeps serving that snapshot until the category version stamp
+(kept in the cache, bumped by y_category_create/edit/delete) moves.
+
+With a per-process cache backend a bump is only seen by the worker that
+made it, so snapshots are also reloaded after BLOG_CATEGORY_REGISTRY_MAX_AGE
+seconds.
+
+Snapshots are shared between requests: treat the rows as read-only.
+"""
+import threading
+import time
+
+from django.conf import settings
+
+from .fragments import KEY_PREFIX, bump_version, get_version
+
+CATEGORIES_VERSION_KEY = f"{KEY_PREFIX}:categories-version"
+
+
+class CategorySnapshot:
+    def __init__(self, rows):
+        # same order the pages used: sort order, then name
+        self.all = sorted(rows, key=lambda c: (c.bc_sort_order or 0, c.bc_category_name or ""))
+        self.active = [c for c in self.all if c.bc_category_status == "Active"]
+        self.by_name = sorted(rows, key=lambda c: c.bc_category_name or "")
+
+
+class CategoryRegistry:
+    def __init__(self):
+        self._snapshot = None
+        self._version = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _is_current(self, version):
+        max_age = getattr(settings, "BLOG_CATEGORY_REGISTRY_MAX_AGE", 300)
+        return (
+            self._snapshot is not None
+            and self._version == version
+            and time.monotonic() - self._loaded_at < max_age
+        )
+
+    def get(self):
+        """The current snapshot, reloaded only if the version stamp has changed."""
+        version = get_version(CATEGORIES_VERSION_KEY)
+        if self._is_current(version):
+            return self._snapshot
+
+        from .models import BlogsCategories
+
+        with self._lock:
+            if not self._is_current(version):
+                self._snapshot = CategorySnapshot(list(BlogsCategories.objects.all()))
+                self._version = version
+                self._loaded_at = time.monotonic()
+            return self._snapshot
+
+
+category_registry = CategoryRegistry()
+
+
+def categories_version():
+    return get_version(CATEGORIES_VERSION_KEY)
+
+
+def bump_categories_version():
+    """Make every process reload its registry after the current transaction commits."""
+    bump_version(CATEGORIES_VERSION_KEY)
@@ -0,0 +1,31 @@
+"""System checks for settings the blog cannot run correctly without."""
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.checks import Error, Warning, register
+
+
+@register()
+def check_viewed_cache(app_configs, **kwargs):
+    """The once-a-day view filter (blog/viewed.py) needs a cache shared by every worker."""
+    from .viewed import CACHE_ALIAS, is_shared
+
+    try:
+        cache = caches[CACHE_ALIAS]
+    except InvalidCacheBackendError:
+        return [Error(
+            f"CACHES has no {CACHE_ALIAS!r} alias for the viewed-today filter (BLOG_VIEWED_CACHE).",
+            id="blog.E001",
+        )]
+    if is_shared(cache):
+        return []
+    # a warning by default: a deploy without Redis still starts, and counts too many views
+    if getattr(settings, "BLOG_VIEWED_REQUIRE_SHARED", False):
+        level, check_id = Error, "blog.E002"
+    else:
+        level, check_id = Warning, "blog.W001"
+    return [level(
+        f"The {CACHE_ALIAS!r} cache is {type(cache).__name__}, which each worker keeps to itself: "
+        "with several workers a view is counted once per worker per day.",
+        hint="Set BLOG_REDIS_URL, or silence blog.W001 if one process serves everything.",
+        id=check_id,
+    )]
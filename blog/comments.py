@@ -0,0 +1,198 @@
+"""
+Comment threads stored as materialized paths.
+
+bc_path is the chain of ancestor ids, one fixed-width base36 segment each,
+ending with the comment's own id. A subtree is therefore a prefix range on
+the (bc_blog_id, bc_path) index and ordering by bc_path yields the thread in
+display order (parent first, replies oldest first).
+
+y_blog_detail loads one page of root comments plus their first few replies;
+anything deeper is fetched on demand through y_comment_replies. Both hand a
+flat list of rows to blog/_comment.html, which renders them in a single loop.
+"""
+from django.db import transaction
+from django.db.models import F, Q, Value, Window
+from django.db.models.functions import Greatest, RowNumber, Substr
+from django.utils import timezone
+
+from .counters import adjust_counter
+from .fragments import bump_comments_version
+from .models import BlogsComments
+from .pagination import KeysetPaginator
+
+SEGMENT_WIDTH = 6  # base36, up to ~2.1 billion comment ids
+MAX_DEPTH = 255 // SEGMENT_WIDTH  # bc_path is varchar(255)
+_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+ROOTS_PER_PAGE = 20
+INLINE_DEPTH = 2  # reply levels shown with each root thread
+INLINE_REPLIES = 10  # replies shown per root thread before "show more"
+REPLIES_PER_PAGE = 50  # rows per lazy "load replies" request
+
+INDENT_PX = 24
+MAX_INDENT_DEPTH = 8
+
+
+def path_segment(comment_id):
+    out = ""
+    while comment_id:
+        comment_id, r = divmod(comment_id, 36)
+        out = _DIGITS[r] + out
+    return out.rjust(SEGMENT_WIDTH, "0")
+
+
+def _visible(qs):
+    # deleted comments stay in the tree as placeholders while they have replies
+    return qs.filter(bc_status="Approved").filter(Q(bc_is_deleted=0) | Q(bc_reply_count__gt=0))
+
+
+def _rows_qs(blog_id):
+    return _visible(BlogsComments.objects.filter(bc_blog_id=blog_id)).select_related("bc_user")
+
+
+# ----------- WRITES -----------
+def create_comment(blog, user_id, text, parent=None):
+    with transaction.atomic():
+        # replies past MAX_DEPTH go to the deepest ancestor that still fits
+        while parent is not None and parent.bc_depth >= MAX_DEPTH - 1:
+            parent = parent.bc_parent
+
+        c = BlogsComments.objects.create(
+            bc_blog=blog,
+            bc_user_id=user_id,
+            bc_comment=text,
+            bc_status="Approved",
+            bc_created_at=timezone.now(),
+            bc_is_deleted=0,
+            bc_parent=parent,
+            bc_depth=parent.bc_depth + 1 if parent else 0,
+        )
+        c.bc_path = (parent.bc_path if parent else "") + path_segment(c.bc_comment_id)
+        c.save(update_fields=["bc_path"])
+
+        if parent is not None:
+            BlogsComments.objects.filter(bc_comment_id=parent.bc_comment_id).update(
+                bc_reply_count=F("bc_reply_count") + 1
+            )
+        adjust_counter(blog.bd_blog_id, "bd_comment_count", 1)
+        bump_comments_version(blog.bd_blog_id)
+    return c
+
+
+def edit_comment(c, text):
+    with transaction.atomic():
+        c.bc_comment = text
+        # Optional safe update if field exists
+        if hasattr(c, "bc_updated_at"):
+            c.bc_updated_at = timezone.now()
+        c.save()
+        bump_comments_version(c.bc_blog_id)
+
+
+def soft_delete_comment(c):
+    """Mark a comment deleted. Its replies keep their place in the tree."""
+    with transaction.atomic():
+        updated = BlogsComments.objects.filter(
+            bc_comment_id=c.bc_comment_id, bc_is_deleted=0
+        ).update(bc_is_deleted=1)
+        if not updated:
+            return
+        c.bc_is_deleted = 1
+        bump_comments_version(c.bc_blog_id)
+        if c.bc_status == "Approved":
+            adjust_counter(c.bc_blog_id, "bd_comment_count", -1)
+            if c.bc_parent_id:
+                BlogsComments.objects.filter(bc_comment_id=c.bc_parent_id).update(
+                    bc_reply_count=Greatest(F("bc_reply_count") - 1, Value(0))
+                )
+
+
+# ----------- READS -----------
+def _decorate(rows):
+    """
+    Add the indent of each row and, for rows with replies that are not on
+    the page, where the "show more" request should continue from: the path
+    of the last row of its subtree that is shown (more_after) and that row's
+    id, after which the loaded rows are inserted (more_anchor).
+    """
+    shown = {}
+    for c in rows:
+        if c.bc_parent_id:
+            shown[c.bc_parent_id] = shown.get(c.bc_parent_id, 0) + 1
+
+    for i, c in enumerate(rows):
+        c.indent = min(c.bc_depth, MAX_INDENT_DEPTH) * INDENT_PX
+        c.hidden_replies = max(c.bc_reply_count - shown.get(c.bc_comment_id, 0), 0)
+        if c.hidden_replies:
+            j = i
+            while j + 1 < len(rows) and rows[j + 1].bc_path.startswith(c.bc_path):
+                j += 1
+            c.more_after = rows[j].bc_path
+            c.more_anchor = rows[j].bc_comment_id
+    return rows
+
+
+def roots_paginator(blog_id):
+    roots_qs = _rows_qs(blog_id).filter(bc_depth=0)
+    return KeysetPaginator(roots_qs, ("bc_created_at", "bc_comment_id"), ROOTS_PER_PAGE)
+
+
+def thread_page(blog, cursor=None):
+    """
+    One page of root threads, newest first, each followed by up to
+    INLINE_REPLIES replies (INLINE_DEPTH levels deep). Returns (rows, page).
+    """
+    page = roots_paginator(blog.bd_blog_id).page(cursor)
+    roots = list(page)
+    if not roots:
+        return [], page
+
+    under_roots = Q()
+    for r in roots:
+        under_roots |= Q(bc_path__startswith=r.bc_path)
+    # the first INLINE_REPLIES of each root (its path segment), in one query,
+    # so a busy root cannot take the whole page's share; the rest of a
+    # thread gets a "show more" link
+    replies = (
+        _rows_qs(blog.bd_blog_id)
+        .filter(under_roots, bc_depth__gte=1, bc_depth__lte=INLINE_DEPTH)
+        .annotate(root_rank=Window(
+            RowNumber(), partition_by=Substr("bc_path", 1, SEGMENT_WIDTH), order_by="bc_path",
+        ))
+        .filter(root_rank__lte=INLINE_REPLIES)
+        .order_by("bc_path")
+    )
+
+    by_root = {r.bc_path: [] for r in roots}
+    for c in replies:
+        by_root[c.bc_path[:SEGMENT_WIDTH]].append(c)
+
+    rows = []
+    for r in roots:
+        rows.append(r)
+        rows.extend(by_root[r.bc_path])
+    return _decorate(rows), page
+
+
+def replies_page(comment, after=None):
+    """
+    Descendants of `comment` in thread order, REPLIES_PER_PAGE at a time.
+    `after` is the bc_path of the last row already shown. Returns (rows, next_after).
+    """
+    qs = _rows_qs(comment.bc_blog_id).filter(
+        bc_path__startswith=comment.bc_path, bc_depth__gt=comment.bc_depth
+    )
+    if after:
+        qs = qs.filter(bc_path__gt=after)
+    rows = list(qs.order_by("bc_path")[: REPLIES_PER_PAGE + 1])
+
+    next_after = None
+    if len(rows) > REPLIES_PER_PAGE:
+        rows = rows[:REPLIES_PER_PAGE]
+        next_after = rows[-1].bc_path
+    # the whole subtree comes in path order, so the only thing left to load
+    # is the next page (next_after), not individual replies
+    for c in rows:
+        c.indent = min(c.bc_depth, MAX_INDENT_DEPTH) * INDENT_PX
+        c.hidden_replies = 0
+    return rows, next_after
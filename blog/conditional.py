@@ -0,0 +1,66 @@
+"""
+Conditional GET for the pages people reload most.
+
+y_blog_detail, y_home, y_bookmarks and y_profile compute an ETag from
+version stamps they can read without the posts' comment/like tables or the
+template engine, and answer 304 Not Modified when the browser already has
+that version:
+
+- detail: bd_updated_at and the counters of a lean blogs_details row, the
+  post's comment version and its like version (bumped by like and bookmark
+  toggles, fragments.likes_version);
+- home: the feed generation (feed.py), the category version and a time
+  bucket of the feed cache timeout, since card numbers change without a
+  generation bump and the cached feed goes stale the same way;
+- bookmarks: the user's bookmark version (fragments.bookmarks_version),
+  plus the feed generation for edits of the bookmarked posts;
+- profile: the user's row (users.py), with bu_updated_at as Last-Modified.
+
+Every tag also covers who is asking (user, role, CSRF cookie), because the
+navigation and the forms differ per user. Responses carry
+"Cache-Control: private, no-cache": browsers keep the page but revalidate
+it on each visit, shared caches never store it. A request with flash
+messages waiting is always answered in full, or they would never be shown.
+
+The view counter on the detail page is not part of the tag; a 304 shows
+the count from the user's last full load, which is at most one visit old
+for that user.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def page_etag(request, user_id, role, *parts):
+    """Quoted ETag for the page's `parts` as seen by this user."""
+    raw = ":".join(str(p) for p in (
+        request.resolver_match.view_name if request.resolver_match else request.path,
+        user_id or "", role or "", request.COOKIES.get(settings.CSRF_COOKIE_NAME, ""),
+        *parts,
+    ))
+    return f'"{hashlib.md5(raw.encode()).hexdigest()}"'
+
+
+def not_modified(request, etag, last_modified=None):
+    """A 304 response if the browser's copy is current, else None (render the page)."""
+    if request.method not in ("GET", "HEAD") or get_messages(request):
+        return None
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is not None:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def with_validators(response, etag, last_modified=None):
+    """Attach the validators to a full response so the next visit can revalidate."""
+    if response.status_code == 200:
+        response["ETag"] = etag
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,220 @@
+"""
+Write-behind view counter.
+
+y_blog_detail used to run UPDATE ... bd_views = bd_views + 1 followed by a
+refresh on every first daily view, so all readers of a popular post queued
+on the same row lock. Views are now added to an in-process buffer and
+written out in one multi-row UPDATE per flush interval. Pages show the
+stored value plus whatever this process still has pending.
+
+Each flush also adds the views to the per-day blogs_view_stats rows that
+the analytics rollups (blog/rollups.py) are built from.
+
+Flushing happens after a response has been sent (request_finished, see
+BlogConfig.ready) once the interval has passed or the buffer is large, and
+once more when the worker process exits.
+
+Like, bookmark and comment counters are not buffered: adjust_counter() is
+called in the same transaction as the row it counts. Migration 0016 fills
+the new columns once, and reconcile_counters() (`manage.py
+reconcile_counters`) recounts them from the rows to repair drift later.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Max, Q, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# rows per UPDATE statement
+FLUSH_CHUNK_SIZE = 500
+
+
+class ViewCounter:
+    def __init__(self, interval, max_pending):
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending = Counter()
+        # (blog_id, day) -> views, for blogs_view_stats
+        self._daily = Counter()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def incr(self, blog_id, n=1, day=None):
+        day = day or timezone.localdate()
+        with self._lock:
+            self._pending[blog_id] += n
+            self._daily[(blog_id, day)] += n
+
+    def pending(self, blog_id):
+        """Views recorded by this process that are not in the database yet."""
+        with self._lock:
+            return self._pending.get(blog_id, 0)
+
+    def is_due(self):
+        with self._lock:
+            if not self._pending:
+                return False
+            return (
+                len(self._pending) >= self.max_pending
+                or time.monotonic() - self._last_flush >= self.interval
+            )
+
+    def flush(self):
+        """Write all pending views. Returns the number of views written."""
+        with self._lock:
+            batch, self._pending = self._pending, Counter()
+            daily, self._daily = self._daily, Counter()
+            self._last_flush = time.monotonic()
+        if not batch:
+            return 0
+
+        try:
+            with transaction.atomic():
+                self._write(batch)
+                self._write_daily(daily)
+        except Exception:
+            # put them back so the next flush retries
+            with self._lock:
+                self._pending.update(batch)
+                self._daily.update(daily)
+            raise
+        return sum(batch.values())
+
+    def maybe_flush(self):
+        if self.is_due():
+            self.flush()
+
+    def _write(self, batch):
+        from .models import BlogsDetails
+
+        items = list(batch.items())
+        for start in range(0, len(items), FLUSH_CHUNK_SIZE):
+            chunk = items[start:start + FLUSH_CHUNK_SIZE]
+            BlogsDetails.objects.filter(
+                bd_blog_id__in=[blog_id for blog_id, _ in chunk]
+            ).update(
+                bd_views=F("bd_views") + Case(
+                    *[When(bd_blog_id=blog_id, then=Value(n)) for blog_id, n in chunk],
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+            )
+
+    def _write_daily(self, daily):
+        from .models import BlogsViewStats
+
+        items = list(daily.items())
+        for start in range(0, len(items), FLUSH_CHUNK_SIZE):
+            chunk = items[start:start + FLUSH_CHUNK_SIZE]
+            # make sure every (post, day) row exists, then add to all of them at once
+            BlogsViewStats.objects.bulk_create(
+                [BlogsViewStats(bvs_blog_id=blog_id, bvs_day=day, bvs_views=0) for (blog_id, day), _ in chunk],
+                ignore_conflicts=True,
+            )
+            match = Q()
+            for (blog_id, day), _ in chunk:
+                match |= Q(bvs_blog_id=blog_id, bvs_day=day)
+            BlogsViewStats.objects.filter(match).update(
+                bvs_views=F("bvs_views") + Case(
+                    *[When(bvs_blog_id=blog_id, bvs_day=day, then=Value(n)) for (blog_id, day), n in chunk],
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+            )
+
+
+ENGAGEMENT_COUNTERS = ("bd_like_count", "bd_bookmark_count", "bd_comment_count")
+
+
+def adjust_counter(blog_id, field, delta):
+    """Atomically add `delta` to one of the BlogsDetails engagement counters."""
+    from .models import BlogsDetails
+
+    if field not in ENGAGEMENT_COUNTERS:
+        raise ValueError(f"Unknown counter: {field}")
+    BlogsDetails.objects.filter(bd_blog_id=blog_id).update(
+        **{field: Greatest(F(field) + delta, Value(0))}
+    )
+
+
+def _counts(qs, blog_field, lo, hi):
+    return dict(
+        qs.filter(**{f"{blog_field}__gte": lo, f"{blog_field}__lt": hi})
+        .values(blog_field)
+        .annotate(n=Count("pk"))
+        .values_list(blog_field, "n")
+    )
+
+
+def reconcile_counters(*, batch_size=1000, dry_run=False, report=None):
+    """
+    Recount likes, bookmarks and approved comments per post and store them
+    where they differ, in bd_blog_id ranges of `batch_size` with plain reads
+    and row updates, so no table is locked. `report(blog_id, stored, actual)`
+    is called per drifted post; returns (checked, drifted).
+    """
+    from .models import BlogsBookmarks, BlogsComments, BlogsDetails, BlogsLikes
+
+    max_id = BlogsDetails.objects.aggregate(m=Max("bd_blog_id"))["m"] or 0
+
+    checked = drifted = 0
+    for lo in range(0, max_id + 1, batch_size):
+        hi = lo + batch_size
+        like_counts = _counts(BlogsLikes.objects.all(), "bl_blog_id", lo, hi)
+        bookmark_counts = _counts(BlogsBookmarks.objects.all(), "bb_blog_id", lo, hi)
+        comment_counts = _counts(
+            BlogsComments.objects.filter(bc_is_deleted=0, bc_status="Approved"), "bc_blog_id", lo, hi
+        )
+
+        rows = BlogsDetails.objects.filter(bd_blog_id__gte=lo, bd_blog_id__lt=hi).values_list(
+            "bd_blog_id", *ENGAGEMENT_COUNTERS
+        )
+        for blog_id, like_count, bookmark_count, comment_count in rows:
+            checked += 1
+            actual = (like_counts.get(blog_id, 0), bookmark_counts.get(blog_id, 0), comment_counts.get(blog_id, 0))
+            stored = (like_count, bookmark_count, comment_count)
+            if actual == stored:
+                continue
+
+            drifted += 1
+            if report:
+                report(blog_id, stored, actual)
+            if dry_run:
+                continue
+            # compare-and-set: if a toggle changed the row meanwhile, leave it for the next run
+            BlogsDetails.objects.filter(bd_blog_id=blog_id, **dict(zip(ENGAGEMENT_COUNTERS, stored))).update(
+                **dict(zip(ENGAGEMENT_COUNTERS, actual))
+            )
+    return checked, drifted
+
+
+view_counter = ViewCounter(
+    interval=getattr(settings, "BLOG_VIEW_FLUSH_INTERVAL", 10),
+    max_pending=getattr(settings, "BLOG_VIEW_FLUSH_MAX_PENDING", 1000),
+)
+
+
+def flush_after_request(sender, **kwargs):
+    from .rollups import maybe_rollup_views
+
+    try:
+        view_counter.maybe_flush()
+        maybe_rollup_views()
+    except Exception:
+        logger.exception("Could not flush buffered blog views")
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        view_counter.flush()
+    except Exception:
+        logger.exception("Could not flush buffered blog views on shutdown")
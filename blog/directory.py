@@ -0,0 +1,54 @@
+"""
+The admin user directory (y_users).
+
+It used to render every BlogsUsers row, with bu_bio and the password hash,
+and searched with icontains over names, email and role: a full table scan
+per page view. Now:
+
+- keyset pages on bu_user_id (blog/pagination.py), newest users first;
+- role and status are exact filters, served by bu_role_status_idx and
+  bu_status_idx (migration 0015);
+- the search box matches from the start of first name, last name or email
+  ("jo" finds "John", "jo@x.com"), and "first last" matches the full name.
+  Prefix LIKE is a range scan on bu_first_name_idx, bu_last_name_idx and
+  the unique email index; MySQL's case-insensitive collation keeps it one
+  even for istartswith;
+- only the columns the table shows are loaded.
+"""
+from django.db.models import Q
+
+from .models import BlogsUsers
+
+USER_ROLES = ["admin", "writer", "viewer"]
+USER_STATUSES = ["Active", "Inactive"]
+
+DIRECTORY_KEYS = ("bu_user_id",)
+DIRECTORY_PER_PAGE = 25
+DIRECTORY_FIELDS = ("bu_user_id", "bu_first_name", "bu_last_name", "bu_email", "bu_role", "bu_status")
+
+
+def search_filter(q):
+    """Prefix match on first name, last name or email; None for an empty query."""
+    words = q.split()
+    if not words:
+        return None
+    if "@" in q:
+        return Q(bu_email__istartswith=q.strip())
+
+    cond = Q(bu_first_name__istartswith=q) | Q(bu_last_name__istartswith=q) | Q(bu_email__istartswith=q)
+    if len(words) > 1:
+        cond |= Q(bu_first_name__istartswith=words[0], bu_last_name__istartswith=" ".join(words[1:]))
+    return cond
+
+
+def directory_queryset(q="", role=None, status=None):
+    """Lean rows of the user directory; unknown roles/statuses are ignored."""
+    qs = BlogsUsers.objects.only(*DIRECTORY_FIELDS)
+    if role in USER_ROLES:
+        qs = qs.filter(bu_role=role)
+    if status in USER_STATUSES:
+        qs = qs.filter(bu_status=status)
+    cond = search_filter(q)
+    if cond is not None:
+        qs = qs.filter(cond)
+    return qs
@@ -0,0 +1,75 @@
+"""
+Cached home feed.
+
+y_home shows the same few pages of published posts to almost everyone, and
+the result only depends on the search text, the category, the page and the
+role. Each (normalized) combination is cached under a feed generation
+number that y_blog_create, y_blog_edit, y_blog_delete and the category views
+bump whenever something the feed shows changes. A hit renders the page
+without touching the posts tables (categories come from the registry).
+
+The timeout is only a backstop for the view/like/comment numbers on the
+cards, which change without bumping the generation.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .fragments import KEY_PREFIX, bump_version, cache_key, fragment_stats, get_version
+
+FEED_GENERATION_KEY = f"{KEY_PREFIX}:feed-generation"
+
+# keyset order of the feed: newest first, unpublished edits after
+FEED_KEYS = ("bd_published_at", "bd_updated_at", "bd_blog_id")
+FEED_PER_PAGE = 6
+
+
+def feed_timeout():
+    return getattr(settings, "BLOG_FEED_CACHE_TIMEOUT", 300)
+
+
+def feed_generation():
+    return get_version(FEED_GENERATION_KEY)
+
+
+def bump_feed_generation():
+    bump_version(FEED_GENERATION_KEY)
+
+
+def feed_validator():
+    """Changes when the cached feed may: a new generation, or the timeout backstop running out."""
+    return feed_generation(), int(time.time() // feed_timeout())
+
+
+def feed_queryset(cat=""):
+    from .models import BlogsDetails
+
+    blogs = BlogsDetails.objects.filter(bd_blog_status="Published", bd_is_deleted=0)
+    if cat:
+        blogs = blogs.filter(bd_category_id=cat)
+    return blogs
+
+
+def normalize_feed_params(q, cat):
+    """Search text as the index sees it (case and spacing don't matter), category id or ""."""
+    q = " ".join((q or "").lower().split())
+    cat = (cat or "").strip()
+    return q, cat if cat.isdigit() else ""
+
+
+def cached_feed(role, q, cat, token, build):
+    """
+    Return the feed data for these (already normalized) params, calling
+    build() on a miss. `token` is the keyset cursor or the search page number.
+    """
+    key = cache_key("home_feed", (feed_generation(), role, q, cat, token or ""))
+    data = cache.get(key)
+    if data is not None:
+        fragment_stats.hit("home_feed")
+        return data
+
+    fragment_stats.miss("home_feed")
+    data = build()
+    cache.set(key, data, feed_timeout())
+    return data
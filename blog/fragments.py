@@ -0,0 +1,149 @@
+"""
+Fragment cache for the blog detail page.
+
+The post body and the comment thread are rendered once per version and
+reused until something they show changes:
+
+- the body is keyed on bd_updated_at, which y_blog_edit sets on every save;
+- the thread is keyed on a per-post comment version kept in the cache and
+  bumped (after commit) whenever a comment is created, edited or deleted,
+  plus bd_comment_count from the row the page loads anyway, so a worker
+  that misses a bump on a per-process cache still sees new/deleted comments.
+
+Cached fragments are the same for every visitor. Per-user parts (the like
+and bookmark buttons, the views pill, the reply/edit/delete controls and
+the CSRF token) are rendered outside them or switched on in the browser,
+see y_detail.html.
+
+Hit/miss counts are kept per process and shown by y_cache_stats.
+"""
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.safestring import mark_safe
+
+KEY_PREFIX = "blog:frag"
+
+
+def fragment_timeout():
+    return getattr(settings, "BLOG_FRAGMENT_CACHE_TIMEOUT", 600)
+
+
+class FragmentStats:
+    def __init__(self):
+        self._hits = Counter()
+        self._misses = Counter()
+        self._lock = threading.Lock()
+
+    def hit(self, name):
+        with self._lock:
+            self._hits[name] += 1
+
+    def miss(self, name):
+        with self._lock:
+            self._misses[name] += 1
+
+    def snapshot(self):
+        with self._lock:
+            names = sorted(set(self._hits) | set(self._misses))
+            out = {}
+            for name in names:
+                hits, misses = self._hits[name], self._misses[name]
+                out[name] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+                }
+            return out
+
+
+fragment_stats = FragmentStats()
+
+
+def cache_key(name, parts):
+    raw = ":".join(str(p) for p in parts)
+    return f"{KEY_PREFIX}:{name}:{hashlib.md5(raw.encode()).hexdigest()}"
+
+
+def cached_fragment(name, parts, render):
+    """
+    Return the HTML cached for (name, parts), calling render() on a miss.
+    `parts` must change whenever the fragment's content does.
+    """
+    key = cache_key(name, parts)
+    html = cache.get(key)
+    if html is not None:
+        fragment_stats.hit(name)
+        return mark_safe(html)
+
+    fragment_stats.miss(name)
+    html = str(render())
+    cache.set(key, html, fragment_timeout())
+    return mark_safe(html)
+
+
+# ----------- VERSION COUNTERS -----------
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        # start from the clock so an evicted version never comes back with old entries
+        version = int(time.time() * 1000)
+        cache.add(key, version, None)
+        version = cache.get(key, version)
+    return version
+
+
+def bump_version(key):
+    """Move `key` to a new version once the current transaction commits."""
+
+    def bump():
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, int(time.time() * 1000), None)
+
+    transaction.on_commit(bump)
+
+
+def _comments_version_key(blog_id):
+    return f"{KEY_PREFIX}:comments-version:{blog_id}"
+
+
+def comments_version(blog_id):
+    return get_version(_comments_version_key(blog_id))
+
+
+def bump_comments_version(blog_id):
+    """Invalidate the cached threads of a post."""
+    bump_version(_comments_version_key(blog_id))
+
+
+def _likes_version_key(blog_id):
+    return f"{KEY_PREFIX}:likes-version:{blog_id}"
+
+
+def likes_version(blog_id):
+    return get_version(_likes_version_key(blog_id))
+
+
+def bump_likes_version(blog_id):
+    """A like or bookmark of the post was added or removed."""
+    bump_version(_likes_version_key(blog_id))
+
+
+def _bookmarks_version_key(user_id):
+    return f"{KEY_PREFIX}:bookmarks-version:{user_id}"
+
+
+def bookmarks_version(user_id):
+    return get_version(_bookmarks_version_key(user_id))
+
+
+def bump_bookmarks_version(user_id):
+    """The user's bookmark list changed."""
+    bump_version(_bookmarks_version_key(user_id))
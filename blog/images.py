@@ -0,0 +1,192 @@
+"""
+Uploaded images: profile pictures and post featured images.
+
+Pages used to serve the original upload, often several megabytes, into a
+90px avatar or a 170px card. Now:
+
+- save_upload() checks that the upload is an image Pillow can read and
+  within BLOG_IMAGE_MAX_UPLOAD_BYTES, then streams it into the
+  content-addressed blob store (blog/blobs.py) in chunks, never reading the
+  whole file into memory. The same bytes uploaded twice are stored once;
+- after the transaction commits, a background thread writes WebP and JPEG
+  copies at the fixed widths of each kind (VARIANT_WIDTHS), never wider than
+  the original, under media/variants/<kind>/<original path without extension>/;
+- a manifest.json with the widths that were written is saved last. Until it
+  exists, the {% picture %} tag (templatetags/images.py) falls back to the
+  original, so a page rendered right after the upload is never broken.
+
+`manage.py process_images` builds variants for images uploaded before this
+(or lost when a worker died mid-job).
+"""
+import json
+import logging
+import os
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .blobs import blob_storage
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = {
+    "profile": (64, 128, 256),
+    "featured": (320, 640, 960, 1280),
+}
+ALLOWED_FORMATS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp", "GIF": "gif"}
+VARIANTS_DIR = "variants"
+MANIFEST = "manifest.json"
+
+MAX_UPLOAD_BYTES = getattr(settings, "BLOG_IMAGE_MAX_UPLOAD_BYTES", 10 * 1024 * 1024)
+# Pillow's own decompression-bomb limit is ~89M pixels; uploads are capped lower
+MAX_PIXELS = getattr(settings, "BLOG_IMAGE_MAX_PIXELS", 40_000_000)
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "BLOG_IMAGE_WORKERS", 1),
+    thread_name_prefix="blog-images",
+)
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+def _abs(rel):
+    return os.path.join(settings.MEDIA_ROOT, rel)
+
+
+def media_path(value):
+    """Media-relative path of a stored image value (a path or a /media/ URL); None for external URLs."""
+    if not value:
+        return None
+    value = str(value)
+    if value.startswith(settings.MEDIA_URL):
+        return value[len(settings.MEDIA_URL):]
+    if "://" in value or value.startswith("/"):
+        return None
+    return value
+
+
+def media_url(rel):
+    return f"{settings.MEDIA_URL}{rel}"
+
+
+# ----------- UPLOAD -----------
+def save_upload(upload, kind):
+    """Store an uploaded image for `kind` in the blob store; returns its media-relative path."""
+    if upload.size and upload.size > MAX_UPLOAD_BYTES:
+        raise InvalidImage(f"Image is larger than {MAX_UPLOAD_BYTES // (1024 * 1024)} MB.")
+
+    # reads the header only; the pixels are decoded later, off the request
+    try:
+        with Image.open(upload) as img:
+            fmt = img.format
+            width, height = img.size
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise InvalidImage("The file is not an image we can read.")
+    if fmt not in ALLOWED_FORMATS:
+        raise InvalidImage("Use a JPEG, PNG, WebP or GIF image.")
+    if width * height > MAX_PIXELS:
+        raise InvalidImage("Image dimensions are too large.")
+
+    # hashed while it is streamed to disk; the extension comes from the format Pillow found
+    return blob_storage.save(f"upload.{ALLOWED_FORMATS[fmt]}", upload)
+
+
+# ----------- VARIANTS -----------
+def variant_dir(rel, kind):
+    # per kind: the same blob may be both an avatar and a featured image
+    return posixpath.join(VARIANTS_DIR, kind, posixpath.splitext(rel)[0])
+
+
+def variant_path(rel, kind, width, ext):
+    return posixpath.join(variant_dir(rel, kind), f"w{width}.{ext}")
+
+
+def _save_atomic(img, rel, **params):
+    path = _abs(rel)
+    tmp = f"{path}.part"
+    img.save(tmp, **params)
+    os.replace(tmp, path)
+
+
+def generate_variants(rel, kind):
+    """Write the WebP/JPEG variants and then the manifest; returns the widths written."""
+    with Image.open(_abs(rel)) as img:
+        img = ImageOps.exif_transpose(img)
+        img = img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB")
+        original_width = img.width
+
+        os.makedirs(_abs(variant_dir(rel, kind)), exist_ok=True)
+        # the fixed widths below the original, then the largest one capped at the original
+        widths = []
+        targets = [w for w in VARIANT_WIDTHS[kind] if w < original_width]
+        targets.append(min(VARIANT_WIDTHS[kind][-1], original_width))
+        for width in dict.fromkeys(targets):
+            height = max(1, round(img.height * width / img.width))
+            resized = img.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+
+            _save_atomic(resized, variant_path(rel, kind, width, "webp"), format="WEBP", quality=80, method=4)
+            if resized.mode == "RGBA":
+                # JPEG has no alpha: flatten onto white
+                flat = Image.new("RGB", resized.size, (255, 255, 255))
+                flat.paste(resized, mask=resized.getchannel("A"))
+                resized = flat
+            _save_atomic(
+                resized, variant_path(rel, kind, width, "jpg"),
+                format="JPEG", quality=82, optimize=True, progressive=True,
+            )
+            widths.append(width)
+
+    manifest = posixpath.join(variant_dir(rel, kind), MANIFEST)
+    with open(f"{_abs(manifest)}.part", "w") as fh:
+        json.dump({"kind": kind, "widths": widths}, fh)
+    os.replace(f"{_abs(manifest)}.part", _abs(manifest))
+    return widths
+
+
+def _run(rel, kind):
+    if variant_widths(rel, kind):
+        # the same bytes were uploaded before
+        return
+    try:
+        generate_variants(rel, kind)
+    except Exception:
+        logger.exception("Could not build image variants for %s", rel)
+
+
+def schedule_variants(rel, kind):
+    """Build the variants in the background once the current transaction commits."""
+    transaction.on_commit(lambda: _executor.submit(_run, rel, kind))
+
+
+# ----------- READING -----------
+_ready = {}
+_ready_lock = threading.Lock()
+READY_CACHE_SIZE = 4096
+
+
+def variant_widths(rel, kind):
+    """Widths with variants on disk, or None while they are not built yet."""
+    widths = _ready.get((rel, kind))
+    if widths is not None:
+        return widths
+    try:
+        with open(_abs(posixpath.join(variant_dir(rel, kind), MANIFEST))) as fh:
+            widths = json.load(fh)["widths"]
+    except (OSError, ValueError, KeyError):
+        return None
+    # a path never changes content, so a manifest once found stays valid
+    with _ready_lock:
+        if len(_ready) >= READY_CACHE_SIZE:
+            _ready.clear()
+        _ready[(rel, kind)] = widths
+    return widths
+
+
+def srcset(rel, kind, widths, ext):
+    return ", ".join(f"{media_url(variant_path(rel, kind, w, ext))} {w}w" for w in widths)
@@ -0,0 +1,225 @@
+"""
+Background jobs: slow side effects moved out of the request.
+
+A view calls enqueue(kind, payload) and returns; the job is a blogs_jobs row
+written in the view's transaction, so it exists exactly when the data it is
+about was committed. `manage.py run_workers` runs a few worker processes
+that claim and run due jobs:
+
+- higher priority first, then oldest. A worker claims up to the kind's
+  batch_size jobs of one kind at a time with a conditional UPDATE (status
+  "queued" -> "running" under its own token). Two workers never get the
+  same job, and no SELECT ... FOR UPDATE is needed, so it works the same on
+  MySQL and SQLite;
+- a failed job is queued again with exponential backoff and jitter
+  (BLOG_JOB_BACKOFF seconds, doubled per attempt) until bj_max_attempts,
+  then left "failed" with its last error for inspection;
+- a job whose worker died stays "running" until BLOG_JOB_LOCK_TIMEOUT has
+  passed, then it is claimed again (counting as an attempt);
+- dedup_key: while a job with that key is queued or running, enqueueing
+  the same key returns the existing job instead of adding one.
+
+Handlers are registered with @job(kind, batch_size) and get a list of
+payloads; they return one error (or None) per payload, so a batch can
+partly fail. blog/mail.py is the first consumer.
+
+`run_workers --once` runs everything due in the calling process and exits,
+which is also how the jobs are run against the console or locmem email
+backend in development.
+"""
+import logging
+import os
+import random
+import signal
+import socket
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = getattr(settings, "BLOG_JOB_MAX_ATTEMPTS", 5)
+BACKOFF = getattr(settings, "BLOG_JOB_BACKOFF", 30)
+BACKOFF_MAX = 6 * 3600
+LOCK_TIMEOUT = getattr(settings, "BLOG_JOB_LOCK_TIMEOUT", 300)
+KEEP_DAYS = getattr(settings, "BLOG_JOB_KEEP_DAYS", 7)
+
+_handlers = {}  # kind -> (handler, batch_size)
+
+
+def job(kind, batch_size=1):
+    """Register handler(payloads) -> [error or None per payload] for `kind`."""
+
+    def register(handler):
+        _handlers[kind] = (handler, batch_size)
+        return handler
+
+    return register
+
+
+def registered_kinds():
+    return sorted(_handlers)
+
+
+# ----------- QUEUEING -----------
+def enqueue(kind, payload, *, priority=0, dedup_key=None, delay=0, max_attempts=None):
+    """
+    Queue a job with the current transaction; returns its id, or the id of
+    the queued/running job that already has `dedup_key`.
+    """
+    from .models import BlogsJobs
+
+    if kind not in _handlers:
+        raise ValueError(f"Unknown job kind {kind!r}")
+    now = timezone.now()
+    # twice: the job holding the key may finish (and free it) right after our insert failed
+    for _ in range(2):
+        try:
+            with transaction.atomic():
+                return BlogsJobs.objects.create(
+                    bj_kind=kind,
+                    bj_payload=payload,
+                    bj_priority=priority,
+                    bj_dedup_key=dedup_key,
+                    bj_max_attempts=max_attempts or MAX_ATTEMPTS,
+                    bj_run_at=now + timedelta(seconds=delay),
+                    bj_created_at=now,
+                ).pk
+        except IntegrityError:
+            if dedup_key is None:
+                raise
+            existing = BlogsJobs.objects.filter(bj_dedup_key=dedup_key).values_list("bj_id", flat=True).first()
+            if existing is not None:
+                return existing
+    raise IntegrityError(f"Could not queue job with dedup key {dedup_key!r}")
+
+
+# ----------- RUNNING -----------
+def _due(now):
+    stale = now - timedelta(seconds=LOCK_TIMEOUT)
+    return Q(bj_status="queued", bj_run_at__lte=now) | Q(
+        bj_status="running", bj_locked_at__lt=stale, bj_attempts__lt=F("bj_max_attempts"),
+    )
+
+
+def claim(worker_id, kinds=None):
+    """Claim the next due jobs (one kind, up to its batch size) for this worker; [] if none are due."""
+    from .models import BlogsJobs
+
+    now = timezone.now()
+    due = BlogsJobs.objects.filter(_due(now), bj_kind__in=list(kinds or _handlers))
+    order = ("-bj_priority", "bj_run_at", "bj_id")
+    kind = due.order_by(*order).values_list("bj_kind", flat=True).first()
+    if kind is None:
+        return []
+
+    ids = list(due.filter(bj_kind=kind).order_by(*order).values_list("bj_id", flat=True)[:_handlers[kind][1]])
+    token = f"{worker_id}:{uuid.uuid4().hex[:12]}"
+    # only rows still due are taken: a concurrent worker's claim makes them not match
+    BlogsJobs.objects.filter(_due(now), bj_id__in=ids).update(
+        bj_status="running", bj_locked_by=token, bj_locked_at=now, bj_attempts=F("bj_attempts") + 1,
+    )
+    return list(BlogsJobs.objects.filter(bj_locked_by=token).order_by(*order))
+
+
+def backoff(attempts):
+    """Seconds before retry number `attempts`: doubled each time, with jitter."""
+    return min(BACKOFF * 2 ** (attempts - 1), BACKOFF_MAX) * random.uniform(0.5, 1.0)
+
+
+def run_batch(jobs):
+    """Run claimed jobs (all of one kind) and record the outcome of each."""
+    from .models import BlogsJobs
+
+    handler = _handlers[jobs[0].bj_kind][0]
+    try:
+        errors = handler([j.bj_payload for j in jobs])
+    except Exception:
+        logger.exception("Job batch %s failed", jobs[0].bj_kind)
+        errors = [traceback.format_exc(limit=5)] * len(jobs)
+
+    now = timezone.now()
+    # filtered on our token: a job taken over after a lock timeout belongs to the new worker
+    mine = BlogsJobs.objects.filter(bj_locked_by=jobs[0].bj_locked_by)
+    done = [j.pk for j, error in zip(jobs, errors) if error is None]
+    mine.filter(bj_id__in=done).update(
+        bj_status="done", bj_finished_at=now, bj_dedup_key=None, bj_locked_by=None, bj_last_error=None,
+    )
+    for j, error in zip(jobs, errors):
+        if error is None:
+            continue
+        if j.bj_attempts >= j.bj_max_attempts:
+            logger.error("Job %s #%s failed for good: %s", j.bj_kind, j.pk, error)
+            mine.filter(bj_id=j.pk).update(
+                bj_status="failed", bj_finished_at=now, bj_dedup_key=None, bj_locked_by=None,
+                bj_last_error=str(error),
+            )
+        else:
+            mine.filter(bj_id=j.pk).update(
+                bj_status="queued", bj_locked_by=None, bj_last_error=str(error),
+                bj_run_at=now + timedelta(seconds=backoff(j.bj_attempts)),
+            )
+    return len(done)
+
+
+def run_pending(kinds=None, worker_id=None):
+    """Run every due job in this process; returns how many succeeded."""
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    succeeded = 0
+    while jobs := claim(worker_id, kinds):
+        succeeded += run_batch(jobs)
+    return succeeded
+
+
+def housekeeping():
+    """Fail jobs whose worker died on their last attempt and delete old finished jobs."""
+    from .models import BlogsJobs
+
+    now = timezone.now()
+    BlogsJobs.objects.filter(
+        bj_status="running",
+        bj_locked_at__lt=now - timedelta(seconds=LOCK_TIMEOUT),
+        bj_attempts__gte=F("bj_max_attempts"),
+    ).update(bj_status="failed", bj_finished_at=now, bj_dedup_key=None, bj_last_error="worker lost (lock timeout)")
+    BlogsJobs.objects.filter(bj_status="done", bj_finished_at__lt=now - timedelta(days=KEEP_DAYS)).delete()
+
+
+# ----------- WORKER PROCESS -----------
+def worker_main(kinds=None, poll=1.0, settings_module=None):
+    """Body of one worker process: claim and run jobs until SIGTERM."""
+    if settings_module:
+        # spawned (not forked): a fresh interpreter
+        import django
+
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+        django.setup()
+
+    # Ctrl-C reaches the whole process group; the supervisor decides when to stop
+    # and sends SIGTERM, which lets the current batch finish. (A shared
+    # multiprocessing.Event would stay locked for good if a worker was killed
+    # while holding it.)
+    terminated = []
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *_: terminated.append(True))
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    parent = os.getppid()
+    # a supervisor killed with SIGKILL cannot stop us: leave when it is gone
+    while not (terminated or os.getppid() != parent):
+        close_old_connections()
+        try:
+            jobs = claim(worker_id, kinds)
+            if jobs:
+                run_batch(jobs)
+                continue
+        except Exception:
+            # database away: keep the process, try again after the poll interval
+            logger.exception("Job worker %s could not claim or record jobs", worker_id)
+        time.sleep(poll)
+    connections.close_all()
@@ -0,0 +1,49 @@
+"""
+Outgoing email, sent by the job workers instead of the request.
+
+y_forgot_password used to call send_mail() inline and wait on the SMTP
+server. queue_mail() only writes a job (blog/jobs.py). The workers send
+queued mails in batches of up to BLOG_MAIL_BATCH_SIZE over one connection
+opened for the batch, rather than one SMTP handshake per mail. A mail that
+fails is retried on its own; the rest of its batch is not affected.
+
+Any Django EMAIL_BACKEND works: console in development, locmem to inspect
+mail.outbox after `run_workers --once`.
+"""
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+from .jobs import enqueue, job
+
+BATCH_SIZE = getattr(settings, "BLOG_MAIL_BATCH_SIZE", 50)
+
+
+def queue_mail(subject, message, recipients, *, from_email=None, priority=0, dedup_key=None):
+    """Send a plain-text mail from a worker; returns the job id."""
+    return enqueue("email", {
+        "subject": subject,
+        "message": message,
+        "from_email": from_email or settings.DEFAULT_FROM_EMAIL,
+        "to": list(recipients),
+    }, priority=priority, dedup_key=dedup_key)
+
+
+@job("email", batch_size=BATCH_SIZE)
+def send_batch(payloads):
+    connection = get_connection()
+    connection.open()
+    errors = []
+    try:
+        for payload in payloads:
+            message = EmailMessage(
+                payload["subject"], payload["message"], payload["from_email"], payload["to"],
+                connection=connection,
+            )
+            try:
+                message.send()
+                errors.append(None)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+    finally:
+        connection.close()
+    return errors
@@ -0,0 +1,244 @@
+import hashlib
+import json
+import re
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models.sql.where import AND, WhereNode
+
+from blog.comments import roots_paginator
+from blog.directory import DIRECTORY_KEYS, DIRECTORY_PER_PAGE, directory_queryset
+from blog.feed import FEED_KEYS, FEED_PER_PAGE, feed_queryset
+from blog.models import (
+    BlogsBookmarks,
+    BlogsCategories,
+    BlogsComments,
+    BlogsDetails,
+    BlogsSearchTerms,
+    BlogsUsers,
+)
+from blog.pagination import KeysetPaginator
+from blog.search import term_filter
+
+EQUALITY_LOOKUPS = ("exact", "iexact", "isnull")
+RANGE_LOOKUPS = ("gt", "gte", "lt", "lte", "range", "startswith")
+
+
+def hot_queries():
+    """(name, queryset) for the queries the pages run most, built the way the views build them."""
+    blog_id = BlogsDetails.objects.values_list("bd_blog_id", flat=True).first() or 1
+    category_id = BlogsCategories.objects.values_list("bc_category_id", flat=True).first() or 1
+    user_id = BlogsUsers.objects.values_list("bu_user_id", flat=True).first() or 1
+
+    drafts = BlogsDetails.objects.filter(bd_is_deleted=0, bd_blog_status="Draft")
+    yield "home feed", KeysetPaginator(feed_queryset(), FEED_KEYS, FEED_PER_PAGE).page_queryset()
+    yield "home feed by category", KeysetPaginator(
+        feed_queryset(str(category_id)), FEED_KEYS, FEED_PER_PAGE
+    ).page_queryset()
+    yield "drafts dashboard (admin)", KeysetPaginator(drafts, ("bd_updated_at", "bd_blog_id"), 8).page_queryset()
+    yield "drafts dashboard (writer)", KeysetPaginator(
+        drafts.filter(bd_user_id=user_id), ("bd_updated_at", "bd_blog_id"), 8
+    ).page_queryset()
+    yield "analytics (writer)", BlogsDetails.objects.filter(bd_is_deleted=0, bd_user_id=user_id)
+    yield "comment roots", roots_paginator(blog_id).page_queryset()
+    yield "comment subtree", BlogsComments.objects.filter(
+        bc_blog_id=blog_id, bc_path__startswith="000001"
+    ).order_by("bc_path")
+    yield "bookmarks", KeysetPaginator(
+        BlogsBookmarks.objects.filter(bb_user_id=user_id), ("bb_created_at", "bb_id"), 12
+    ).page_queryset()
+    yield "user directory by role", KeysetPaginator(
+        directory_queryset(role="viewer", status="Active"), DIRECTORY_KEYS, DIRECTORY_PER_PAGE
+    ).page_queryset()
+    yield "search postings", BlogsSearchTerms.objects.filter(term_filter("django")).values("bst_blog_id")
+
+
+# ----------- EXPLAIN -----------
+def explain(qs):
+    if connection.vendor == "mysql":
+        return qs.explain(format="json")
+    return qs.explain()
+
+
+def _walk_json(node, found):
+    if isinstance(node, dict):
+        table = node.get("table_name")
+        if node.get("access_type") == "ALL":
+            found.append(f"full scan of {table}")
+        if node.get("using_filesort"):
+            found.append("filesort")
+        if node.get("using_temporary_table"):
+            found.append("temporary table")
+        for value in node.values():
+            _walk_json(value, found)
+    elif isinstance(node, list):
+        for value in node:
+            _walk_json(value, found)
+
+
+def plan_problems(plan):
+    """Full scans and sorts that are not served by an index, per backend."""
+    found = []
+    if connection.vendor == "mysql":
+        _walk_json(json.loads(plan), found)
+    elif connection.vendor == "sqlite":
+        for line in plan.splitlines():
+            m = re.search(r"\bSCAN (\w+)", line)
+            if m and "USING" not in line:
+                found.append(f"full scan of {m.group(1)}")
+            if "USE TEMP B-TREE" in line:
+                found.append("filesort")
+    else:
+        for m in re.finditer(r"Seq Scan on (\w+)", plan):
+            found.append(f"full scan of {m.group(1)}")
+        if re.search(r"^\s*(->\s*)?Sort\b", plan, re.M):
+            found.append("filesort")
+    return list(dict.fromkeys(found))
+
+
+# ----------- CANDIDATE INDEXES -----------
+def _conditions(node, table):
+    """(column, lookup) of the plain ANDed conditions on `table`; OR branches are skipped."""
+    if not isinstance(node, WhereNode) or node.connector != AND or node.negated:
+        return
+    for child in node.children:
+        if isinstance(child, WhereNode):
+            yield from _conditions(child, table)
+            continue
+        lhs = getattr(child, "lhs", None)
+        target = getattr(lhs, "target", None)
+        if target is not None and getattr(lhs, "alias", None) == table:
+            yield target.column, child.lookup_name
+
+
+def candidate_index(qs):
+    """
+    Columns for a composite index serving `qs`: equality filters first, then
+    the ORDER BY columns (or else one range column). The primary key is left
+    out since InnoDB and SQLite already append it to every secondary index.
+    """
+    query = qs.query
+    opts = qs.model._meta
+    table = opts.db_table
+
+    equal, ranged = [], []
+    for column, lookup in _conditions(query.where, table):
+        if lookup in EQUALITY_LOOKUPS:
+            equal.append(column)
+        elif lookup == "in":
+            equal.append(column)
+        elif lookup in RANGE_LOOKUPS:
+            ranged.append(column)
+
+    order = []
+    for name in query.order_by:
+        if not isinstance(name, str):
+            continue
+        name = name.lstrip("-")
+        if "__" in name:
+            break
+        field = opts.pk if name == "pk" else opts.get_field(name)
+        if field.primary_key:
+            break
+        order.append(field.column)
+
+    columns = list(dict.fromkeys(equal + (order or ranged[:1])))
+    return columns, len(dict.fromkeys(equal))
+
+
+def existing_indexes(table):
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return {
+        name: info["columns"]
+        for name, info in constraints.items()
+        if info.get("index") or info.get("primary_key") or info.get("unique")
+    }
+
+
+def covered_by(columns, n_equal, indexes):
+    """Name of an index whose leading columns serve `columns` (equalities in any order)."""
+    for name, index_columns in indexes.items():
+        if len(index_columns) < len(columns):
+            continue
+        if set(index_columns[:n_equal]) == set(columns[:n_equal]) and (
+            index_columns[n_equal:len(columns)] == columns[n_equal:]
+        ):
+            return name
+    return None
+
+
+def index_name(table, columns):
+    name = f"{table}_{'_'.join(c.split('_', 1)[-1] for c in columns)}_idx"
+    if len(name) > 64:
+        digest = hashlib.md5(name.encode()).hexdigest()[:8]
+        name = f"{table}_{digest}_idx"
+    return name
+
+
+def create_index_sql(table, name, columns):
+    cols = ", ".join(columns)
+    if connection.vendor == "mysql":
+        # online DDL: no table copy and reads/writes continue while it builds
+        return f"ALTER TABLE {table} ADD INDEX {name} ({cols}), ALGORITHM=INPLACE, LOCK=NONE;"
+    return f"CREATE INDEX {name} ON {table} ({cols});"
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the app's hot queries through EXPLAIN, flag full scans and filesorts, "
+        "and propose composite indexes for the ones no existing index serves."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verbose-plans", action="store_true", help="Print the full EXPLAIN output.")
+
+    def handle(self, *args, **options):
+        proposals = {}
+        unresolved = []
+        for name, qs in hot_queries():
+            table = qs.model._meta.db_table
+            plan = explain(qs)
+            problems = plan_problems(plan)
+            columns, n_equal = candidate_index(qs)
+            covering = covered_by(columns, n_equal, existing_indexes(table)) if columns else None
+
+            status = self.style.WARNING(", ".join(problems)) if problems else self.style.SUCCESS("ok")
+            self.stdout.write(f"{name} [{table}]: {status}")
+            if options["verbose_plans"]:
+                self.stdout.write(f"  SQL: {qs.query}")
+                for line in plan.splitlines():
+                    self.stdout.write(f"    {line}")
+            if covering and problems:
+                # the index is there, the plan still scans or sorts: not served
+                self.stdout.write(self.style.WARNING(
+                    f"  unresolved: {covering} ({', '.join(columns)}) exists but the plan does not use it"
+                ))
+                unresolved.append(name)
+            elif covering:
+                self.stdout.write(f"  served by {covering} ({', '.join(columns)})")
+            elif columns:
+                index = index_name(table, columns)
+                self.stdout.write(f"  proposed: {index} ({', '.join(columns)})")
+                proposals[index] = (table, columns)
+            elif problems:
+                self.stdout.write(self.style.WARNING("  unresolved: no index candidate for these conditions"))
+                unresolved.append(name)
+
+        if proposals:
+            self.stdout.write("")
+            self.stdout.write("Proposed indexes:")
+            for index, (table, columns) in proposals.items():
+                self.stdout.write(f"  {create_index_sql(table, index, columns)}")
+        if unresolved:
+            self.stdout.write("")
+            self.stdout.write(self.style.WARNING(
+                f"Unresolved ({len(unresolved)}), still scanning or sorting: {', '.join(unresolved)}."
+            ))
+            if connection.vendor == "sqlite":
+                self.stdout.write(
+                    "  SQLite's LIKE is case-insensitive and cannot use a BINARY index for prefix "
+                    "(startswith) lookups; check these plans on MySQL."
+                )
+        if not proposals and not unresolved:
+            self.stdout.write(self.style.SUCCESS("No missing indexes."))
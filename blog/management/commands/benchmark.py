@@ -0,0 +1,208 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+
+from blog.counters import view_counter
+from blog.middleware import QueryRecorder, recording
+from blog.models import BlogsDetails, BlogsUsers
+from blog.seeding import EMAIL_DOMAIN, PASSWORD, ensure_schema, seed
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    k = (len(ordered) - 1) * p / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway SQLite database and time the main views through the test client. "
+        "Reports p50/p95/p99 latency, queries per request and peak memory per scenario, "
+        "and writes them as JSON. Run with --settings=myblog.settings_bench."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=1000)
+        parser.add_argument("--comments", type=int, default=10000)
+        parser.add_argument("--alpha", type=float, default=1.1, help="Zipf exponent of post popularity.")
+        parser.add_argument("--viewers", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--cold", action="store_true", help="Clear the cache before every request.")
+        parser.add_argument("--only", nargs="*", help="Run only these scenarios.")
+        parser.add_argument("--reuse", action="store_true", help="Keep an already seeded database.")
+        parser.add_argument("--output", default="bench_results.json")
+        parser.add_argument("--compare", help="Earlier results file to print the change against.")
+
+    # ----------- setup -----------
+    def _prepare(self, options):
+        if connection.vendor != "sqlite":
+            raise CommandError("benchmark seeds its own data; run it with --settings=myblog.settings_bench")
+
+        path = settings.DATABASES["default"]["NAME"]
+        if not options["reuse"] and os.path.exists(path):
+            connection.close()
+            os.remove(path)
+
+        ensure_schema()
+        if not BlogsDetails.objects.exists():
+            self.stdout.write("Seeding...")
+            started = time.perf_counter()
+            seed(
+                posts=options["posts"],
+                comments=options["comments"],
+                alpha=options["alpha"],
+                viewers=options["viewers"],
+                seed=options["seed"],
+            )
+            self.stdout.write(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+    def _client(self, role, **client_options):
+        user = BlogsUsers.objects.filter(bu_role=role, bu_email__endswith=f"@{EMAIL_DOMAIN}").order_by("bu_user_id").first()
+        client = Client(**client_options)
+        response = client.post("/y/login/", {"email": user.bu_email, "password": PASSWORD})
+        if response.status_code != 302:
+            raise CommandError(f"Could not log in as {role}")
+        return client
+
+    def _scenarios(self):
+        published = BlogsDetails.objects.filter(bd_blog_status="Published", bd_is_deleted=0)
+        big = published.order_by("-bd_comment_count").first()
+        small = published.order_by("bd_comment_count", "bd_blog_id").first()
+        category_id = big.bd_category_id
+        viewer, writer, admin = self._client("viewer"), self._client("writer"), self._client("admin")
+        # what the detail page's fetch() sends: the toggles answer with JSON instead of a redirect
+        viewer_json = self._client("viewer", headers={"Accept": "application/json"})
+
+        return {
+            "home": (viewer, "get", "/"),
+            "home_search": (viewer, "get", "/?q=django+cache"),
+            "home_category": (viewer, "get", f"/?cat={category_id}"),
+            "home_search_category": (viewer, "get", f"/?q=query&cat={category_id}"),
+            "detail_big_thread": (viewer, "get", f"/y/blog/{big.bd_slug}/"),
+            "detail_small": (viewer, "get", f"/y/blog/{small.bd_slug}/"),
+            "analytics_admin": (admin, "get", "/y/analytics/?range=365"),
+            "analytics_writer": (writer, "get", "/y/analytics/?range=30"),
+            "bookmarks": (viewer, "get", "/y/bookmarks/"),
+            "like_toggle": (viewer, "post", f"/y/blog/{big.bd_blog_id}/like/"),
+            "bookmark_toggle": (viewer, "post", f"/y/blog/{big.bd_blog_id}/bookmark/"),
+            "like_toggle_json": (viewer_json, "post", f"/y/blog/{big.bd_blog_id}/like/"),
+            "bookmark_toggle_json": (viewer_json, "post", f"/y/blog/{big.bd_blog_id}/bookmark/"),
+        }
+
+    # ----------- measuring -----------
+    def _request(self, client, method, url, cold):
+        if cold:
+            cache.clear()
+        # like the instrumentation middleware: also counts the blog/parallel.py pool threads
+        with recording(QueryRecorder()) as recorder:
+            started = time.perf_counter()
+            response = getattr(client, method)(url)
+            elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            raise CommandError(f"{method.upper()} {url} returned {response.status_code}")
+        return elapsed, recorder.count
+
+    def _run(self, client, method, url, options):
+        for _ in range(options["warmup"]):
+            self._request(client, method, url, options["cold"])
+
+        times, queries = [], []
+        for _ in range(options["iterations"]):
+            elapsed, n = self._request(client, method, url, options["cold"])
+            times.append(elapsed * 1000)
+            queries.append(n)
+
+        # memory is traced in a separate pass so it doesn't slow down the timed one
+        tracemalloc.start()
+        for _ in range(min(options["iterations"], 10)):
+            self._request(client, method, url, options["cold"])
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            "url": url,
+            "method": method.upper(),
+            "p50_ms": round(percentile(times, 50), 3),
+            "p95_ms": round(percentile(times, 95), 3),
+            "p99_ms": round(percentile(times, 99), 3),
+            "mean_ms": round(statistics.fmean(times), 3),
+            "queries_mean": round(statistics.fmean(queries), 2),
+            "queries_max": max(queries),
+            "peak_kib": round(peak / 1024, 1),
+        }
+
+    def _meta(self, options):
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=settings.BASE_DIR
+            ).stdout.strip()
+        except OSError:
+            commit = ""
+        return {
+            "at": timezone.now().isoformat(),
+            "commit": commit,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "dataset": {k: options[k] for k in ("posts", "comments", "alpha", "viewers", "seed")},
+            "iterations": options["iterations"],
+            "warmup": options["warmup"],
+            "cold": options["cold"],
+        }
+
+    def handle(self, *args, **options):
+        self._prepare(options)
+        scenarios = self._scenarios()
+        if options["only"]:
+            unknown = set(options["only"]) - set(scenarios)
+            if unknown:
+                raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+            scenarios = {k: v for k, v in scenarios.items() if k in options["only"]}
+
+        results = {}
+        for name, (client, method, url) in scenarios.items():
+            results[name] = self._run(client, method, url, options)
+            r = results[name]
+            self.stdout.write(
+                f"{name:22} p50 {r['p50_ms']:8.2f} ms  p95 {r['p95_ms']:8.2f}  p99 {r['p99_ms']:8.2f}  "
+                f"queries {r['queries_mean']:5.1f}  peak {r['peak_kib']:8.1f} KiB"
+            )
+        # the view buffer would otherwise be flushed at exit into a deleted database
+        view_counter.flush()
+
+        with open(options["output"], "w") as fh:
+            json.dump({"meta": self._meta(options), "scenarios": results}, fh, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+        if options["compare"]:
+            self._compare(options["compare"], results)
+
+    def _compare(self, path, results):
+        with open(path) as fh:
+            before = json.load(fh)["scenarios"]
+        self.stdout.write(f"\nChange against {path}:")
+        for name, r in results.items():
+            old = before.get(name)
+            if not old:
+                continue
+            delta = (r["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100 if old["p50_ms"] else 0.0
+            self.stdout.write(
+                f"{name:22} p50 {old['p50_ms']:8.2f} -> {r['p50_ms']:8.2f} ms ({delta:+.1f}%)  "
+                f"queries {old['queries_mean']:5.1f} -> {r['queries_mean']:5.1f}"
+            )
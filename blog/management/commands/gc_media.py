@@ -0,0 +1,176 @@
+import os
+import posixpath
+import shutil
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.blobs import BLOBS_DIR, TMP_DIR, add_ref, blob_storage, delete_blob, is_blob
+from blog.images import VARIANT_WIDTHS, media_path, media_url, variant_dir
+from blog.models import BlogsDetails, BlogsMediaBlobs, BlogsUsers
+from blog.users import invalidate_user
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete uploaded blobs (media/blobs/) and their variants that no profile picture "
+        "or featured image has used for the grace period. Reference counts pick the "
+        "candidates; each one is checked against the columns before it is deleted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours", type=float, default=getattr(settings, "BLOG_MEDIA_GC_GRACE_HOURS", 24),
+            help="Keep unreferenced blobs this long (uploads not saved yet, pages still cached).",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be deleted.")
+        parser.add_argument(
+            "--reconcile", action="store_true",
+            help="Recompute the reference counts from the columns and pick up blob files without a row.",
+        )
+        parser.add_argument(
+            "--adopt-legacy", action="store_true",
+            help="Move images uploaded before content addressing into the blob store (originals are kept).",
+        )
+
+    def _references(self):
+        """Blob name -> number of rows using it, from the columns themselves."""
+        refs = Counter()
+        for pic in BlogsUsers.objects.exclude(bu_profile_pic="").values_list("bu_profile_pic", flat=True).iterator():
+            if is_blob(pic):
+                refs[pic] += 1
+        for image in (
+            BlogsDetails.objects.exclude(bd_featured_image="").exclude(bd_featured_image__isnull=True)
+            .values_list("bd_featured_image", flat=True).iterator()
+        ):
+            rel = media_path(image)
+            if is_blob(rel):
+                refs[rel] += 1
+        return refs
+
+    def _adopt(self, dry_run):
+        adopted = 0
+        users = (
+            BlogsUsers.objects.exclude(bu_profile_pic="").exclude(bu_profile_pic__isnull=True)
+            .exclude(bu_profile_pic__startswith=f"{BLOBS_DIR}/")
+        )
+        for user_id, pic in list(users.values_list("bu_user_id", "bu_profile_pic")):
+            name = self._store(pic, dry_run)
+            if name and not dry_run:
+                if BlogsUsers.objects.filter(bu_user_id=user_id, bu_profile_pic=pic).update(bu_profile_pic=name):
+                    add_ref(name)
+                invalidate_user(user_id)
+            adopted += bool(name)
+
+        blogs = BlogsDetails.objects.exclude(bd_featured_image="").exclude(bd_featured_image__isnull=True)
+        for blog_id, image in list(blogs.values_list("bd_blog_id", "bd_featured_image")):
+            rel = media_path(image)
+            if not rel or is_blob(rel):
+                continue
+            name = self._store(rel, dry_run)
+            if name and not dry_run:
+                if BlogsDetails.objects.filter(bd_blog_id=blog_id, bd_featured_image=image).update(
+                    bd_featured_image=media_url(name)
+                ):
+                    add_ref(name)
+            adopted += bool(name)
+        return adopted
+
+    def _store(self, rel, dry_run):
+        path = blob_storage.path(rel)
+        if not os.path.isfile(path):
+            self.stderr.write(f"{rel}: missing, left as is")
+            return None
+        if dry_run:
+            self.stdout.write(f"would adopt {rel}")
+            return rel
+        with open(path, "rb") as fh:
+            name = blob_storage.save(rel, File(fh))
+        self.stdout.write(f"{rel} -> {name}")
+        return name
+
+    def _reconcile(self, refs, dry_run):
+        fixed = 0
+        rows = dict(BlogsMediaBlobs.objects.values_list("bmb_name", "bmb_refcount").iterator())
+        for name, stored in rows.items():
+            if stored != refs.get(name, 0):
+                fixed += 1
+                self.stdout.write(f"{name}: {stored} -> {refs.get(name, 0)} refs")
+                if not dry_run:
+                    BlogsMediaBlobs.objects.filter(bmb_name=name).update(
+                        bmb_refcount=refs.get(name, 0), bmb_updated_at=timezone.now()
+                    )
+
+        # files without a row (copied in by hand, or a crash mid-GC): the file's age starts the grace period
+        root = blob_storage.path(BLOBS_DIR)
+        for folder, dirs, files in os.walk(root):
+            if folder == blob_storage.path(TMP_DIR):
+                dirs[:] = []
+                continue
+            for filename in files:
+                if filename.endswith(".gc"):
+                    # moved aside by a GC that stopped before deciding; delete_blob() will decide again
+                    os.replace(os.path.join(folder, filename), os.path.join(folder, filename[:-3]))
+                    filename = filename[:-3]
+                path = os.path.join(folder, filename)
+                name = posixpath.join(BLOBS_DIR, os.path.relpath(path, root).replace(os.sep, "/"))
+                if name in rows:
+                    continue
+                fixed += 1
+                self.stdout.write(f"{name}: no row, {refs.get(name, 0)} refs")
+                if not dry_run:
+                    stat = os.stat(path)
+                    mtime = datetime.fromtimestamp(stat.st_mtime, tz=dt_timezone.utc)
+                    BlogsMediaBlobs.objects.get_or_create(bmb_name=name, defaults={
+                        "bmb_size": stat.st_size, "bmb_refcount": refs.get(name, 0),
+                        "bmb_created_at": mtime, "bmb_updated_at": mtime,
+                    })
+        return fixed
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        cutoff = timezone.now() - timedelta(hours=options["grace_hours"])
+
+        if options["adopt_legacy"]:
+            adopted = self._adopt(dry_run)
+            self.stdout.write(f"Adopted {adopted} legacy images; run process_images to build their variants.")
+
+        refs = self._references()
+        if options["reconcile"]:
+            self.stdout.write(f"Reconciled {self._reconcile(refs, dry_run)} blobs.")
+
+        deleted = freed = 0
+        # materialized: the loop deletes from the table it reads
+        candidates = BlogsMediaBlobs.objects.filter(bmb_refcount__lte=0, bmb_updated_at__lt=cutoff)
+        for name, size, stored in list(candidates.values_list("bmb_name", "bmb_size", "bmb_refcount")):
+            if refs.get(name):
+                # count drifted below the real references: repair instead of deleting
+                self.stderr.write(f"{name}: counted {stored} refs but used {refs[name]} times, kept")
+                if not dry_run:
+                    BlogsMediaBlobs.objects.filter(bmb_name=name).update(bmb_refcount=refs[name])
+                continue
+            if dry_run:
+                self.stdout.write(f"would delete {name}")
+            elif not delete_blob(name, cutoff):
+                continue
+            else:
+                for kind in VARIANT_WIDTHS:
+                    shutil.rmtree(blob_storage.path(variant_dir(name, kind)), ignore_errors=True)
+            deleted += 1
+            freed += size
+
+        # temp files of uploads that died mid-stream
+        tmp_dir = blob_storage.path(TMP_DIR)
+        if os.path.isdir(tmp_dir) and not dry_run:
+            for filename in os.listdir(tmp_dir):
+                path = os.path.join(tmp_dir, filename)
+                if os.path.getmtime(path) < time.time() - options["grace_hours"] * 3600:
+                    os.remove(path)
+
+        verb = "Would delete" if dry_run else "Deleted"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {deleted} unreferenced blobs ({freed / 1024 / 1024:.1f} MB)."))
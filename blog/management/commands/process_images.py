@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import generate_variants, media_path, variant_widths
+from blog.models import BlogsDetails, BlogsUsers
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the resized WebP/JPEG variants of profile pictures and featured images "
+        "that do not have them yet (uploads from before the image pipeline, or jobs "
+        "lost when a worker stopped)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Rebuild variants that already exist.")
+
+    def _images(self):
+        for pic in (
+            BlogsUsers.objects.exclude(bu_profile_pic="").exclude(bu_profile_pic__isnull=True)
+            .values_list("bu_profile_pic", flat=True).iterator()
+        ):
+            yield pic, "profile"
+        for image in (
+            BlogsDetails.objects.exclude(bd_featured_image="").exclude(bd_featured_image__isnull=True)
+            .values_list("bd_featured_image", flat=True).iterator()
+        ):
+            yield image, "featured"
+
+    def handle(self, *args, **options):
+        built = skipped = failed = 0
+        for value, kind in self._images():
+            rel = media_path(value)
+            if not rel:
+                # external URL, nothing of ours to resize
+                continue
+            if variant_widths(rel, kind) and not options["force"]:
+                skipped += 1
+                continue
+            try:
+                widths = generate_variants(rel, kind)
+            except (OSError, ValueError) as e:
+                failed += 1
+                self.stderr.write(f"{rel}: {e}")
+                continue
+            built += 1
+            self.stdout.write(f"{rel}: {', '.join(map(str, widths))}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Built variants for {built} images, {skipped} already had them, {failed} failed."
+        ))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import BlogsDetails, BlogsSearchDocs, BlogsSearchTerms
+from blog.search import index_blog
+
+
+class Command(BaseCommand):
+    help = "Build the blog search index for every non-deleted post (run once after deploying search)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--missing-only",
+            action="store_true",
+            help="Only index posts that have no search_doc row yet.",
+        )
+
+    def handle(self, *args, **options):
+        blogs = BlogsDetails.objects.filter(bd_is_deleted=0).order_by("bd_blog_id")
+        if options["missing_only"]:
+            blogs = blogs.exclude(
+                bd_blog_id__in=BlogsSearchDocs.objects.values("bsd_blog_id")
+            )
+
+        done = 0
+        for blog in blogs.iterator(chunk_size=options["batch_size"]):
+            index_blog(blog)
+            done += 1
+            if done % options["batch_size"] == 0:
+                self.stdout.write(f"indexed {done} posts...")
+
+        # drop index rows of posts that were soft-deleted outside the app
+        BlogsSearchTerms.objects.filter(bst_blog__bd_is_deleted=1).delete()
+        removed, _ = BlogsSearchDocs.objects.filter(bsd_blog__bd_is_deleted=1).delete()
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {done} posts, removed {removed} stale entries."))
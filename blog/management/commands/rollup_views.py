@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Min
+from django.utils import timezone
+
+from blog.counters import view_counter
+from blog.models import BlogsViewStats
+from blog.rollups import resume_day, rollup_views
+
+
+class Command(BaseCommand):
+    help = "Recompute the day/week/month view rollups used by the analytics page."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="How many past days to recompute (default: from the first day not rolled up yet).",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Rebuild everything from the first recorded day.",
+        )
+
+    def handle(self, *args, **options):
+        # anything this process buffered goes in first
+        view_counter.flush()
+
+        if options["all"]:
+            since = BlogsViewStats.objects.aggregate(d=Min("bvs_day"))["d"]
+            if since is None:
+                self.stdout.write("No view stats recorded yet.")
+                return
+        elif options["days"] is not None:
+            since = timezone.localdate() - timedelta(days=options["days"])
+        else:
+            since = resume_day(timezone.localdate())
+
+        rollup_views(since=since)
+        self.stdout.write(self.style.SUCCESS(f"Rolled up views since {since}."))
@@ -0,0 +1,96 @@
+import multiprocessing
+import os
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from blog.jobs import housekeeping, registered_kinds, run_pending, worker_main
+
+HOUSEKEEPING_EVERY = 3600  # seconds
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background jobs (blog/jobs.py): a pool of worker processes claiming due jobs "
+        "from blogs_jobs, restarted if they die. SIGTERM or Ctrl-C stops them gracefully: "
+        "each finishes its current batch first. --once runs everything due in this process "
+        "and exits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=getattr(settings, "BLOG_JOB_WORKERS", 2))
+        parser.add_argument("--kinds", default="", help="Comma-separated job kinds to run (default: all).")
+        parser.add_argument(
+            "--poll", type=float, default=getattr(settings, "BLOG_JOB_POLL_INTERVAL", 1.0),
+            help="Seconds an idle worker waits before looking for jobs again.",
+        )
+        parser.add_argument(
+            "--grace", type=float, default=30,
+            help="Seconds to wait for running batches on shutdown before killing the workers.",
+        )
+        parser.add_argument("--once", action="store_true", help="Run the due jobs here and exit.")
+
+    def handle(self, *args, **options):
+        kinds = [k.strip() for k in options["kinds"].split(",") if k.strip()] or None
+        unknown = set(kinds or ()) - set(registered_kinds())
+        if unknown:
+            raise CommandError(
+                f"Unknown job kinds: {', '.join(sorted(unknown))} (known: {', '.join(registered_kinds())})"
+            )
+
+        if options["once"]:
+            housekeeping()
+            self.stdout.write(self.style.SUCCESS(f"Ran {run_pending(kinds)} jobs."))
+            return
+
+        if "fork" in multiprocessing.get_all_start_methods():
+            ctx, settings_module = multiprocessing.get_context("fork"), None
+        else:
+            ctx, settings_module = multiprocessing.get_context("spawn"), os.environ["DJANGO_SETTINGS_MODULE"]
+        stopping = []
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stopping.append(True))
+
+        def start():
+            p = ctx.Process(
+                target=worker_main, args=(kinds, options["poll"], settings_module), daemon=True,
+            )
+            p.start()
+            return p
+
+        # children must open their own connections
+        connections.close_all()
+        workers = [start() for _ in range(options["processes"])]
+        self.stdout.write(f"Started {len(workers)} workers: {', '.join(str(p.pid) for p in workers)}")
+
+        last_housekeeping = 0
+        while not stopping:
+            for i, p in enumerate(workers):
+                if not p.is_alive():
+                    self.stderr.write(f"Worker {p.pid} exited with {p.exitcode}, restarting")
+                    connections.close_all()
+                    workers[i] = start()
+            if time.monotonic() - last_housekeeping > HOUSEKEEPING_EVERY:
+                try:
+                    housekeeping()
+                except Exception as e:
+                    self.stderr.write(f"Housekeeping failed: {e}")
+                connections.close_all()
+                last_housekeeping = time.monotonic()
+            time.sleep(1)
+
+        self.stdout.write("Stopping: waiting for running batches")
+        for p in workers:
+            p.terminate()
+        deadline = time.monotonic() + options["grace"]
+        for p in workers:
+            p.join(max(0, deadline - time.monotonic()))
+        for p in workers:
+            if p.is_alive():
+                self.stderr.write(f"Worker {p.pid} did not stop in time, killing it")
+                p.kill()
+                p.join()
+        self.stdout.write(self.style.SUCCESS("Workers stopped."))
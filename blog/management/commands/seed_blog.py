@@ -0,0 +1,96 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from blog.models import BlogsDetails
+from blog.seeding import (
+    BATCH_SIZE,
+    CHUNK_POSTS,
+    EMAIL_DOMAIN,
+    PASSWORD,
+    ensure_schema,
+    seed,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with synthetic posts, threaded comments, likes and bookmarks "
+        "(power-law popularity, deterministic from --seed), generated in parallel and "
+        "inserted with bulk_create. For throwaway databases only: it refuses to run unless "
+        "the settings set BLOG_SEEDING_ALLOWED (e.g. --settings=myblog.settings_bench) or --yes is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=100_000)
+        parser.add_argument("--comments", type=int, default=2_000_000)
+        parser.add_argument("--likes", type=int, default=2_000_000)
+        parser.add_argument("--bookmarks", type=int, default=500_000)
+        parser.add_argument("--writers", type=int, default=500)
+        parser.add_argument("--viewers", type=int, default=50_000)
+        parser.add_argument("--categories", type=int, default=20)
+        parser.add_argument("--view-posts", type=int, default=1000, help="Posts that get a year of view stats.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--alpha", type=float, default=1.1, help="Zipf exponent of post popularity.")
+        parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Rows per INSERT.")
+        parser.add_argument("--chunk-posts", type=int, default=CHUNK_POSTS, help="Posts per unit of work.")
+        parser.add_argument("--with-index", action="store_true", help="Also build the search index (slow).")
+        parser.add_argument("--append", action="store_true", help="Seed even if the database already has posts.")
+        parser.add_argument(
+            "--yes",
+            action="store_true",
+            help="Migrate and seed the configured database even though BLOG_SEEDING_ALLOWED is off.",
+        )
+
+    def handle(self, *args, **options):
+        if not (getattr(settings, "BLOG_SEEDING_ALLOWED", False) or options["yes"]):
+            name = connection.settings_dict["NAME"]
+            raise CommandError(
+                f"Refusing to migrate and seed the {connection.vendor} database {name!r}: these settings do "
+                "not mark it as a throwaway database. Use --settings=myblog.settings_bench, or pass --yes."
+            )
+        ensure_schema()
+        if BlogsDetails.objects.exists() and not options["append"]:
+            raise CommandError("The database already has posts; pass --append to add the synthetic data anyway.")
+
+        started = time.perf_counter()
+        last = [started]
+
+        def progress(phase, n):
+            # a line every few seconds is enough on a multi-million row run
+            now = time.perf_counter()
+            if now - last[0] >= 5:
+                last[0] = now
+                self.stdout.write(f"  {phase}: {n:,} rows ({now - started:.0f}s)")
+
+        self.stdout.write(f"Seeding {connection.vendor} database with {options['processes']} process(es)...")
+        inserted = seed(
+            posts=options["posts"],
+            writers=options["writers"],
+            viewers=options["viewers"],
+            categories=options["categories"],
+            comments=options["comments"],
+            likes=options["likes"],
+            bookmarks=options["bookmarks"],
+            view_posts=options["view_posts"],
+            seed=options["seed"],
+            alpha=options["alpha"],
+            processes=options["processes"],
+            batch_size=options["batch_size"],
+            chunk_posts=options["chunk_posts"],
+            index=options["with_index"],
+            progress=progress,
+        )
+
+        elapsed = time.perf_counter() - started
+        total = sum(inserted.values())
+        for table, n in inserted.items():
+            self.stdout.write(f"  {table:20} {n:>12,}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Inserted {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s). "
+            f"Users log in as <role><id>@{EMAIL_DOMAIN} with password {PASSWORD!r}."
+        ))
@@ -0,0 +1,175 @@
+"""
+Per-request SQL instrumentation.
+
+QueryInstrumentationMiddleware records every query a request runs (through
+connection.execute_wrapper, so it works with DEBUG off) and, once the
+response is ready:
+
+- groups the queries by fingerprint (the SQL with whitespace collapsed and
+  IN lists shortened; Django already keeps the parameters out of it) and
+  logs any fingerprint repeated BLOG_QUERY_REPEAT_THRESHOLD times or more,
+  which is what an N+1 loop looks like;
+- checks the query count against the budget of the view (BLOG_QUERY_BUDGETS
+  by URL name, else BLOG_QUERY_BUDGET_DEFAULT) and logs, or raises
+  QueryBudgetExceeded when BLOG_QUERY_BUDGET_ACTION is "raise" (for dev);
+- gives admins an X-Query-Summary header and a small panel on HTML pages.
+
+Turned on by BLOG_QUERY_INSTRUMENTATION (defaults to DEBUG).
+
+The middleware is async-capable, so it does not push async views onto a
+thread in production. While instrumenting, though, an async request is run
+the way Django runs it under a sync middleware (on one thread, with the view
+called through async_to_sync): execute_wrapper is per connection and so per
+thread, and that keeps the request's ORM calls on the recorded thread. The
+extra threads of blog/parallel.py pick the recorder up through
+recording_in_thread(). recording() can be nested (the benchmark command
+records around the middleware): every active recorder sees every query.
+"""
+import contextvars
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.utils.html import escape
+
+logger = logging.getLogger("blog.queries")
+
+_active_recorders = contextvars.ContextVar("blog_query_recorders", default=())
+
+_SPACES_RE = re.compile(r"\s+")
+_IN_LIST_RE = re.compile(r"\bIN \((?:%s, )*%s\)", re.I)
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def fingerprint(sql):
+    sql = _SPACES_RE.sub(" ", sql).strip()
+    sql = _IN_LIST_RE.sub("IN (...)", sql)
+    # literals written into the SQL itself (rare with the ORM, common in raw SQL)
+    return _LITERAL_RE.sub("?", sql)
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.fingerprints = Counter()
+        # queries may come from several threads (blog/parallel.py)
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.total += elapsed
+                self.count += 1
+                self.fingerprints[fingerprint(sql)] += 1
+
+    def repeated(self, threshold):
+        return [(fp, n) for fp, n in self.fingerprints.most_common() if n >= threshold]
+
+
+@contextmanager
+def recording(recorder):
+    """Record the queries of this thread, and of the pool threads it starts meanwhile, into `recorder`."""
+    token = _active_recorders.set(_active_recorders.get() + (recorder,))
+    try:
+        with connection.execute_wrapper(recorder):
+            yield recorder
+    finally:
+        _active_recorders.reset(token)
+
+
+def recording_in_thread():
+    """Record this thread's queries too, if the current request is being recorded."""
+    stack = ExitStack()
+    for recorder in _active_recorders.get():
+        stack.enter_context(connection.execute_wrapper(recorder))
+    return stack
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class QueryInstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = _setting("BLOG_QUERY_INSTRUMENTATION", settings.DEBUG)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        return self._instrumented(request, self.get_response)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        return await sync_to_async(self._instrumented)(request, async_to_sync(self.get_response))
+
+    def _instrumented(self, request, get_response):
+        with recording(QueryRecorder()) as recorder:
+            response = get_response(request)
+
+        view = request.resolver_match.url_name if request.resolver_match else None
+        repeated = recorder.repeated(_setting("BLOG_QUERY_REPEAT_THRESHOLD", 5))
+        for fp, n in repeated:
+            logger.warning("Possible N+1 in %s (%s): %d x %s", view, request.path, n, fp)
+
+        budget = _setting("BLOG_QUERY_BUDGETS", {}).get(view, _setting("BLOG_QUERY_BUDGET_DEFAULT", 30))
+        if recorder.count > budget:
+            message = f"{view} ({request.path}) ran {recorder.count} queries, budget is {budget}"
+            if _setting("BLOG_QUERY_BUDGET_ACTION", "log") == "raise":
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        session = getattr(request, "session", None)
+        if session is not None and session.get("user_role") == "admin":
+            self._annotate(response, recorder, repeated, budget)
+        return response
+
+    def _annotate(self, response, recorder, repeated, budget):
+        summary = f"{recorder.count} queries, {recorder.total * 1000:.1f} ms, {len(repeated)} repeated"
+        response["X-Query-Summary"] = summary
+
+        if response.streaming or "text/html" not in response.get("Content-Type", ""):
+            return
+        content = response.content.decode(response.charset)
+        if "</body>" not in content:
+            return
+
+        color = "#b02a37" if recorder.count > budget else "#212529"
+        rows = "".join(
+            f"<li><b>{n}&times;</b> <code>{escape(fp[:300])}</code></li>" for fp, n in repeated
+        )
+        panel = (
+            f'<div class="query-panel" style="position:fixed;bottom:8px;right:8px;z-index:9999;'
+            f'max-width:50%;font-size:12px;padding:6px 10px;border-radius:6px;opacity:.9;'
+            f'background:{color};color:#fff;">'
+            f"<b>SQL:</b> {escape(summary)} (budget {budget})"
+            f"{'<ul>' + rows + '</ul>' if rows else ''}</div>"
+        )
+        content = content.replace("</body>", panel + "</body>", 1)
+        response.content = content.encode(response.charset)
+        if response.has_header("Content-Length"):
+            response["Content-Length"] = str(len(response.content))
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0007_passwordresettoken"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BlogsSearchDocs",
+            fields=[
+                (
+                    "bsd_blog",
+                    models.OneToOneField(
+                        db_column="bsd_blog_id",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="search_doc",
+                        serialize=False,
+                        to="blog.blogsdetails",
+                    ),
+                ),
+                ("bsd_length", models.IntegerField(default=0)),
+                ("bsd_indexed_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "blogs_search_docs",
+            },
+        ),
+        migrations.CreateModel(
+            name="BlogsSearchTerms",
+            fields=[
+                ("bst_id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("bst_term", models.CharField(max_length=64)),
+                ("bst_tf", models.IntegerField(default=0)),
+                (
+                    "bst_blog",
+                    models.ForeignKey(
+                        db_column="bst_blog_id",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_terms",
+                        to="blog.blogsdetails",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "blogs_search_terms",
+                "unique_together": {("bst_term", "bst_blog")},
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0008_blogssearch"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BlogsViewRollups",
+            fields=[
+                ("bvr_id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("bvr_scope", models.CharField(max_length=20)),
+                ("bvr_period", models.CharField(max_length=5)),
+                ("bvr_start", models.DateField()),
+                ("bvr_views", models.IntegerField(default=0)),
+            ],
+            options={
+                "db_table": "blogs_view_rollups",
+                "unique_together": {("bvr_scope", "bvr_period", "bvr_start")},
+            },
+        ),
+        migrations.CreateModel(
+            name="BlogsViewStats",
+            fields=[
+                ("bvs_id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("bvs_day", models.DateField()),
+                ("bvs_views", models.IntegerField(default=0)),
+                (
+                    "bvs_blog",
+                    models.ForeignKey(
+                        db_column="bvs_blog_id",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="view_stats",
+                        to="blog.blogsdetails",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "blogs_view_stats",
+                "indexes": [
+                    models.Index(fields=["bvs_day"], name="blogs_view_stats_day_idx")
+                ],
+                "unique_together": {("bvs_blog", "bvs_day")},
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+# blogs_details is not managed by Django, so the counter columns are added
+# with plain SQL. The table may not exist at all (e.g. a fresh SQLite test
+# database), in which case there is nothing to alter.
+
+from django.db import migrations, models
+
+COLUMNS = ("bd_like_count", "bd_bookmark_count", "bd_comment_count")
+
+
+def add_columns(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if "blogs_details" not in connection.introspection.table_names(cursor):
+            return
+        existing = {
+            col.name
+            for col in connection.introspection.get_table_description(cursor, "blogs_details")
+        }
+    for column in COLUMNS:
+        if column not in existing:
+            schema_editor.execute(
+                f"ALTER TABLE blogs_details ADD COLUMN {column} integer NOT NULL DEFAULT 0"
+            )
+
+
+def drop_columns(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if "blogs_details" not in connection.introspection.table_names(cursor):
+            return
+        existing = {
+            col.name
+            for col in connection.introspection.get_table_description(cursor, "blogs_details")
+        }
+    for column in COLUMNS:
+        if column in existing:
+            schema_editor.execute(f"ALTER TABLE blogs_details DROP COLUMN {column}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0009_blogsviewstats"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(add_columns, drop_columns),
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name="blogsdetails",
+                    name=column,
+                    field=models.IntegerField(default=0),
+                )
+                for column in COLUMNS
+            ],
+        ),
+    ]
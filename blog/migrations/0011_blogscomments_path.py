@@ -0,0 +1,184 @@
+# blogs_comments is not managed by Django, so the tree columns and their
+# index are added with plain SQL (skipped when the table does not exist),
+# then existing comments get their paths and reply counts filled in.
+
+from collections import Counter
+
+from django.db import migrations, models
+
+SEGMENT_WIDTH = 6
+MAX_DEPTH = 255 // SEGMENT_WIDTH
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+COLUMNS = (
+    ("bc_path", "varchar(255) NOT NULL DEFAULT ''"),
+    ("bc_depth", "integer NOT NULL DEFAULT 0"),
+    ("bc_reply_count", "integer NOT NULL DEFAULT 0"),
+)
+INDEX_NAME = "blogs_comments_blog_path_idx"
+
+
+def _segment(comment_id):
+    out = ""
+    while comment_id:
+        comment_id, r = divmod(comment_id, 36)
+        out = DIGITS[r] + out
+    return out.rjust(SEGMENT_WIDTH, "0")
+
+
+def _describe(schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if "blogs_comments" not in connection.introspection.table_names(cursor):
+            return None, None
+        columns = {
+            col.name
+            for col in connection.introspection.get_table_description(
+                cursor, "blogs_comments"
+            )
+        }
+        indexes = set(
+            connection.introspection.get_constraints(cursor, "blogs_comments")
+        )
+    return columns, indexes
+
+
+def add_columns(apps, schema_editor):
+    columns, indexes = _describe(schema_editor)
+    if columns is None:
+        return
+    for name, ddl in COLUMNS:
+        if name not in columns:
+            schema_editor.execute(f"ALTER TABLE blogs_comments ADD COLUMN {name} {ddl}")
+    if INDEX_NAME not in indexes:
+        schema_editor.execute(
+            f"CREATE INDEX {INDEX_NAME} ON blogs_comments (bc_blog_id, bc_path)"
+        )
+
+
+def drop_columns(apps, schema_editor):
+    columns, indexes = _describe(schema_editor)
+    if columns is None:
+        return
+    if INDEX_NAME in indexes:
+        if schema_editor.connection.vendor == "mysql":
+            schema_editor.execute(f"DROP INDEX {INDEX_NAME} ON blogs_comments")
+        else:
+            schema_editor.execute(f"DROP INDEX {INDEX_NAME}")
+    for name, _ in COLUMNS:
+        if name in columns:
+            schema_editor.execute(f"ALTER TABLE blogs_comments DROP COLUMN {name}")
+
+
+# posts whose comments are read, and whose paths are written, per round
+BACKFILL_BLOGS_PER_CHUNK = 500
+UPDATE_BATCH_SIZE = 1000
+
+
+def _blog_paths(rows):
+    """(path, depth, reply count, id) for the comments of one post, in id order."""
+    paths, depths, parents = {}, {}, {}
+    replies = Counter()
+    for comment_id, parent_id, status, is_deleted in rows:
+        # too deep (or parent missing): hang the reply on the nearest ancestor that fits
+        while parent_id and (
+            parent_id not in paths or depths[parent_id] >= MAX_DEPTH - 1
+        ):
+            parent_id = parents.get(parent_id)
+        parents[comment_id] = parent_id
+        if parent_id:
+            paths[comment_id] = paths[parent_id] + _segment(comment_id)
+            depths[comment_id] = depths[parent_id] + 1
+            if status == "Approved" and not is_deleted:
+                replies[parent_id] += 1
+        else:
+            paths[comment_id] = _segment(comment_id)
+            depths[comment_id] = 0
+    return [
+        (path, depths[comment_id], replies[comment_id], comment_id)
+        for comment_id, path in paths.items()
+    ]
+
+
+def _write_paths(cursor, updates):
+    for start in range(0, len(updates), UPDATE_BATCH_SIZE):
+        cursor.executemany(
+            "UPDATE blogs_comments SET bc_path = %s, bc_depth = %s, bc_reply_count = %s "
+            "WHERE bc_comment_id = %s",
+            updates[start : start + UPDATE_BATCH_SIZE],
+        )
+
+
+def _backfill_rows(cursor, where, params):
+    cursor.execute(
+        "SELECT bc_blog_id, bc_comment_id, bc_parent_id, bc_status, bc_is_deleted "
+        f"FROM blogs_comments WHERE {where} ORDER BY bc_blog_id, bc_comment_id",
+        params,
+    )
+    by_blog = {}
+    for blog_id, *row in cursor.fetchall():
+        by_blog.setdefault(blog_id, []).append(row)
+    updates = []
+    for rows in by_blog.values():
+        updates.extend(_blog_paths(rows))
+    _write_paths(cursor, updates)
+
+
+def backfill_paths(apps, schema_editor):
+    columns, _ = _describe(schema_editor)
+    if columns is None:
+        return
+    connection = schema_editor.connection
+
+    # The historical BlogsComments has no FK fields (unmanaged), so use SQL.
+    # Parents are always older than their replies: one pass per post in id order works.
+    # Only BACKFILL_BLOGS_PER_CHUNK posts' comments are in memory at a time.
+    with connection.cursor() as cursor:
+        last = None
+        while True:
+            cursor.execute(
+                "SELECT DISTINCT bc_blog_id FROM blogs_comments WHERE bc_blog_id IS NOT NULL"
+                + ("" if last is None else " AND bc_blog_id > %s")
+                + f" ORDER BY bc_blog_id LIMIT {BACKFILL_BLOGS_PER_CHUNK}",
+                [] if last is None else [last],
+            )
+            blog_ids = [row[0] for row in cursor.fetchall()]
+            if not blog_ids:
+                break
+            _backfill_rows(cursor, "bc_blog_id >= %s AND bc_blog_id <= %s", [blog_ids[0], blog_ids[-1]])
+            last = blog_ids[-1]
+        # comments without a post form one more group
+        _backfill_rows(cursor, "bc_blog_id IS NULL", [])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0010_blogsdetails_counters"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(add_columns, drop_columns),
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name="blogscomments",
+                    name="bc_path",
+                    field=models.CharField(default="", max_length=255),
+                ),
+                migrations.AddField(
+                    model_name="blogscomments",
+                    name="bc_depth",
+                    field=models.IntegerField(default=0),
+                ),
+                migrations.AddField(
+                    model_name="blogscomments",
+                    name="bc_reply_count",
+                    field=models.IntegerField(default=0),
+                ),
+            ],
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+    ]
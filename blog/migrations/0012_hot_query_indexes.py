@@ -0,0 +1,134 @@
+# Composite indexes for the hot filters found by `manage.py advise_indexes`.
+#
+# blogs_details and blogs_comments are not managed by Django, so their
+# indexes are created with plain SQL (blog/migrations/_indexes.py): skipped
+# when the table is missing or already has an index of that name, and built
+# online on MySQL. blogs_bookmarks is managed and gets a normal AddIndex.
+
+from django.db import migrations, models
+
+from blog.migrations import _indexes
+
+UNMANAGED_INDEXES = (
+    (
+        "blogs_details",
+        "bd_feed_idx",
+        ("bd_blog_status", "bd_is_deleted", "bd_published_at", "bd_updated_at"),
+    ),
+    (
+        "blogs_details",
+        "bd_feed_cat_idx",
+        (
+            "bd_category_id",
+            "bd_blog_status",
+            "bd_is_deleted",
+            "bd_published_at",
+            "bd_updated_at",
+        ),
+    ),
+    (
+        "blogs_details",
+        "bd_drafts_idx",
+        ("bd_blog_status", "bd_is_deleted", "bd_updated_at"),
+    ),
+    (
+        "blogs_details",
+        "bd_user_posts_idx",
+        ("bd_user_id", "bd_is_deleted", "bd_blog_status", "bd_updated_at"),
+    ),
+    (
+        "blogs_comments",
+        "bc_roots_idx",
+        ("bc_blog_id", "bc_depth", "bc_status", "bc_created_at"),
+    ),
+)
+
+
+def create_indexes(apps, schema_editor):
+    _indexes.create_indexes(schema_editor, UNMANAGED_INDEXES)
+
+
+def drop_indexes(apps, schema_editor):
+    _indexes.drop_indexes(schema_editor, UNMANAGED_INDEXES)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0011_blogscomments_path"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(create_indexes, drop_indexes),
+            ],
+            state_operations=[
+                # created with plain SQL by 0011
+                migrations.AddIndex(
+                    model_name="blogscomments",
+                    index=models.Index(
+                        fields=["bc_blog", "bc_path"],
+                        name="blogs_comments_blog_path_idx",
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="blogscomments",
+                    index=models.Index(
+                        fields=["bc_blog", "bc_depth", "bc_status", "bc_created_at"],
+                        name="bc_roots_idx",
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="blogsdetails",
+                    index=models.Index(
+                        fields=[
+                            "bd_blog_status",
+                            "bd_is_deleted",
+                            "bd_published_at",
+                            "bd_updated_at",
+                        ],
+                        name="bd_feed_idx",
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="blogsdetails",
+                    index=models.Index(
+                        fields=[
+                            "bd_category_id",
+                            "bd_blog_status",
+                            "bd_is_deleted",
+                            "bd_published_at",
+                            "bd_updated_at",
+                        ],
+                        name="bd_feed_cat_idx",
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="blogsdetails",
+                    index=models.Index(
+                        fields=["bd_blog_status", "bd_is_deleted", "bd_updated_at"],
+                        name="bd_drafts_idx",
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="blogsdetails",
+                    index=models.Index(
+                        fields=[
+                            "bd_user_id",
+                            "bd_is_deleted",
+                            "bd_blog_status",
+                            "bd_updated_at",
+                        ],
+                        name="bd_user_posts_idx",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="blogsbookmarks",
+            index=models.Index(
+                fields=["bb_user", "bb_created_at"], name="bb_user_created_idx"
+            ),
+        ),
+    ]
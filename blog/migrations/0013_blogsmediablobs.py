@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0012_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BlogsMediaBlobs",
+            fields=[
+                ("bmb_id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("bmb_name", models.CharField(max_length=255, unique=True)),
+                ("bmb_size", models.BigIntegerField(default=0)),
+                ("bmb_refcount", models.IntegerField(default=0)),
+                (
+                    "bmb_created_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "bmb_updated_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+            options={
+                "db_table": "blogs_media_blobs",
+                "indexes": [
+                    models.Index(
+                        fields=["bmb_refcount", "bmb_updated_at"], name="bmb_gc_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:15
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0013_blogsmediablobs"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BlogsJobs",
+            fields=[
+                ("bj_id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("bj_kind", models.CharField(max_length=50)),
+                ("bj_payload", models.JSONField(default=dict)),
+                ("bj_priority", models.SmallIntegerField(default=0)),
+                ("bj_status", models.CharField(default="queued", max_length=10)),
+                (
+                    "bj_dedup_key",
+                    models.CharField(
+                        blank=True, max_length=191, null=True, unique=True
+                    ),
+                ),
+                ("bj_attempts", models.SmallIntegerField(default=0)),
+                ("bj_max_attempts", models.SmallIntegerField(default=5)),
+                ("bj_run_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "bj_locked_by",
+                    models.CharField(blank=True, max_length=64, null=True),
+                ),
+                ("bj_locked_at", models.DateTimeField(blank=True, null=True)),
+                ("bj_last_error", models.TextField(blank=True, null=True)),
+                (
+                    "bj_created_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("bj_finished_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "db_table": "blogs_jobs",
+                "indexes": [
+                    models.Index(
+                        fields=["bj_status", "bj_priority", "bj_run_at"],
+                        name="bj_claim_idx",
+                    ),
+                    models.Index(fields=["bj_locked_by"], name="bj_locked_by_idx"),
+                ],
+            },
+        ),
+    ]
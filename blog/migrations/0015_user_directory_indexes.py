@@ -0,0 +1,60 @@
+# Indexes for the admin user directory (blog/directory.py): exact role and
+# status filters, and prefix search on first and last name (the email
+# already has its unique index).
+#
+# blogs_users is not managed by Django, so, as in 0012, the indexes are
+# created with plain SQL (blog/migrations/_indexes.py), skipped when the
+# table or a column is missing or the index already exists, and built
+# online on MySQL.
+
+from django.db import migrations, models
+
+from blog.migrations import _indexes
+
+UNMANAGED_INDEXES = (
+    ("blogs_users", "bu_role_status_idx", ("bu_role", "bu_status")),
+    ("blogs_users", "bu_status_idx", ("bu_status",)),
+    ("blogs_users", "bu_first_name_idx", ("bu_first_name",)),
+    ("blogs_users", "bu_last_name_idx", ("bu_last_name",)),
+)
+
+
+def create_indexes(apps, schema_editor):
+    _indexes.create_indexes(schema_editor, UNMANAGED_INDEXES)
+
+
+def drop_indexes(apps, schema_editor):
+    _indexes.drop_indexes(schema_editor, UNMANAGED_INDEXES)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0014_blogsjobs"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(create_indexes, drop_indexes),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name="blogsusers",
+                    index=models.Index(fields=["bu_role", "bu_status"], name="bu_role_status_idx"),
+                ),
+                migrations.AddIndex(
+                    model_name="blogsusers",
+                    index=models.Index(fields=["bu_status"], name="bu_status_idx"),
+                ),
+                migrations.AddIndex(
+                    model_name="blogsusers",
+                    index=models.Index(fields=["bu_first_name"], name="bu_first_name_idx"),
+                ),
+                migrations.AddIndex(
+                    model_name="blogsusers",
+                    index=models.Index(fields=["bu_last_name"], name="bu_last_name_idx"),
+                ),
+            ],
+        ),
+    ]
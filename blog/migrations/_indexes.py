@@ -0,0 +1,53 @@
+"""
+Plain-SQL indexes on the unmanaged tables, shared by migrations 0012 and 0015.
+
+Each index is (table, name, columns). It is skipped when the table or one of
+the columns is missing, or when an index of that name already exists (or is
+already gone, when dropping). On MySQL it is built online (ALGORITHM=INPLACE,
+LOCK=NONE), so reads and writes continue meanwhile.
+
+The leading underscore keeps Django's migration loader from taking this
+module for a migration.
+"""
+
+
+def _existing(schema_editor, table):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if table not in connection.introspection.table_names(cursor):
+            return None, None
+        columns = {
+            col.name
+            for col in connection.introspection.get_table_description(cursor, table)
+        }
+        indexes = set(connection.introspection.get_constraints(cursor, table))
+    return columns, indexes
+
+
+def create_indexes(schema_editor, unmanaged_indexes):
+    mysql = schema_editor.connection.vendor == "mysql"
+    for table, name, columns in unmanaged_indexes:
+        existing_columns, indexes = _existing(schema_editor, table)
+        if existing_columns is None or name in indexes:
+            continue
+        if not set(columns) <= existing_columns:
+            continue
+        cols = ", ".join(columns)
+        if mysql:
+            schema_editor.execute(
+                f"ALTER TABLE {table} ADD INDEX {name} ({cols}), ALGORITHM=INPLACE, LOCK=NONE"
+            )
+        else:
+            schema_editor.execute(f"CREATE INDEX {name} ON {table} ({cols})")
+
+
+def drop_indexes(schema_editor, unmanaged_indexes):
+    mysql = schema_editor.connection.vendor == "mysql"
+    for table, name, columns in unmanaged_indexes:
+        existing_columns, indexes = _existing(schema_editor, table)
+        if existing_columns is None or name not in indexes:
+            continue
+        if mysql:
+            schema_editor.execute(f"DROP INDEX {name} ON {table}")
+        else:
+            schema_editor.execute(f"DROP INDEX {name}")
@@ -97,10 +97,21 @@ class BlogsComments(models.Model):
     bc_status = models.CharField(max_length=8)
     bc_parent = models.ForeignKey('self', models.DO_NOTHING, blank=True, null=True)
     bc_is_deleted = models.IntegerField()
+    # materialized path: one fixed-width base36 segment per ancestor plus this
+    # comment (see blog/comments.py), so a whole subtree is a prefix range
+    bc_path = models.CharField(max_length=255, default="")
+    bc_depth = models.IntegerField(default=0)
+    bc_reply_count = models.IntegerField(default=0)  # direct approved, not deleted replies
 
     class Meta:
         managed = False
         db_table = 'blogs_comments'
+        # created by migrations 0011/0012 with plain SQL (unmanaged table);
+        # `manage.py advise_indexes` checks the hot queries against them
+        indexes = [
+            models.Index(fields=["bc_blog", "bc_path"], name="blogs_comments_blog_path_idx"),
+            models.Index(fields=["bc_blog", "bc_depth", "bc_status", "bc_created_at"], name="bc_roots_idx"),
+        ]
 
 
 class BlogsDetails(models.Model):
@@ -119,10 +130,25 @@ class BlogsDetails(models.Model):
     bd_category_id = models.IntegerField(blank=True, null=True)
     bd_is_deleted = models.IntegerField()
     bd_views = models.IntegerField()
+    # denormalized engagement counters, kept in step by the views and
+    # repaired by `manage.py reconcile_counters`
+    bd_like_count = models.IntegerField(default=0)
+    bd_bookmark_count = models.IntegerField(default=0)
+    bd_comment_count = models.IntegerField(default=0)  # approved, not deleted
 
     class Meta:
         managed = False
         db_table = 'blogs_details'
+        # created by migration 0012 with plain SQL (unmanaged table)
+        indexes = [
+            models.Index(fields=["bd_blog_status", "bd_is_deleted", "bd_published_at", "bd_updated_at"], name="bd_feed_idx"),
+            models.Index(
+                fields=["bd_category_id", "bd_blog_status", "bd_is_deleted", "bd_published_at", "bd_updated_at"],
+                name="bd_feed_cat_idx",
+            ),
+            models.Index(fields=["bd_blog_status", "bd_is_deleted", "bd_updated_at"], name="bd_drafts_idx"),
+            models.Index(fields=["bd_user_id", "bd_is_deleted", "bd_blog_status", "bd_updated_at"], name="bd_user_posts_idx"),
+        ]
 
 
 class BlogsUsers(models.Model):
@@ -143,6 +169,14 @@ class BlogsUsers(models.Model):
     class Meta:
         managed = False
         db_table = 'blogs_users'
+        # created by migration 0015 with plain SQL (unmanaged table); the
+        # user directory filters and prefix-searches on them (blog/directory.py)
+        indexes = [
+            models.Index(fields=["bu_role", "bu_status"], name="bu_role_status_idx"),
+            models.Index(fields=["bu_status"], name="bu_status_idx"),
+            models.Index(fields=["bu_first_name"], name="bu_first_name_idx"),
+            models.Index(fields=["bu_last_name"], name="bu_last_name_idx"),
+        ]
 
 
 class DjangoAdminLog(models.Model):
@@ -234,6 +268,7 @@ class BlogsBookmarks(models.Model):
     class Meta:
         db_table = "blogs_bookmarks"
         unique_together = ("bb_blog", "bb_user")
+        indexes = [models.Index(fields=["bb_user", "bb_created_at"], name="bb_user_created_idx")]
 
     def __str__(self):
         return f"{self.bb_user_id} bookmarked {self.bb_blog_id}"
@@ -261,4 +296,138 @@ class PasswordResetToken(models.Model):
         db_table = "password_reset_token"
 
     def is_expired(self):
-        return timezone.now() > self.prt_expires_at
\ No newline at end of file
+        return timezone.now() > self.prt_expires_at
+
+class BlogsSearchDocs(models.Model):
+    bsd_blog = models.OneToOneField(
+        "BlogsDetails",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        db_column="bsd_blog_id",
+        related_name="search_doc"
+    )
+    # weighted token count of the post, used for BM25 length normalisation
+    bsd_length = models.IntegerField(default=0)
+    bsd_indexed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "blogs_search_docs"
+
+    def __str__(self):
+        return f"{self.bsd_blog_id} ({self.bsd_length} tokens)"
+
+
+class BlogsSearchTerms(models.Model):
+    bst_id = models.BigAutoField(primary_key=True)
+    bst_term = models.CharField(max_length=64)
+    bst_blog = models.ForeignKey(
+        "BlogsDetails",
+        on_delete=models.CASCADE,
+        db_column="bst_blog_id",
+        related_name="search_terms"
+    )
+    # weighted term frequency (title/slug/excerpt hits count more than body hits)
+    bst_tf = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "blogs_search_terms"
+        unique_together = ("bst_term", "bst_blog")
+
+    def __str__(self):
+        return f"{self.bst_term} -> {self.bst_blog_id}"
+
+
+class BlogsViewStats(models.Model):
+    """Views of one post on one day, filled from the buffered view counter."""
+    bvs_id = models.BigAutoField(primary_key=True)
+    bvs_blog = models.ForeignKey(
+        "BlogsDetails",
+        on_delete=models.CASCADE,
+        db_column="bvs_blog_id",
+        related_name="view_stats"
+    )
+    bvs_day = models.DateField()
+    bvs_views = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "blogs_view_stats"
+        unique_together = ("bvs_blog", "bvs_day")
+        indexes = [models.Index(fields=["bvs_day"], name="blogs_view_stats_day_idx")]
+
+    def __str__(self):
+        return f"{self.bvs_blog_id} @ {self.bvs_day}: {self.bvs_views}"
+
+
+class BlogsViewRollups(models.Model):
+    """
+    Pre-aggregated view totals for the analytics chart.
+    bvr_scope is "all" (whole site) or "user:<id>" (one writer's posts),
+    bvr_period is "day", "week" (starts Monday) or "month" (starts on the 1st).
+    """
+    bvr_id = models.BigAutoField(primary_key=True)
+    bvr_scope = models.CharField(max_length=20)
+    bvr_period = models.CharField(max_length=5)
+    bvr_start = models.DateField()
+    bvr_views = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "blogs_view_rollups"
+        unique_together = ("bvr_scope", "bvr_period", "bvr_start")
+
+    def __str__(self):
+        return f"{self.bvr_scope} {self.bvr_period} {self.bvr_start}: {self.bvr_views}"
+
+
+class BlogsMediaBlobs(models.Model):
+    """
+    One uploaded file under media/blobs/, stored once however many rows use it
+    (blog/blobs.py). bmb_refcount counts the bu_profile_pic and
+    bd_featured_image values pointing at it; bmb_updated_at is the last time it
+    was uploaded again or its count changed, which starts the GC grace period.
+    """
+    bmb_id = models.BigAutoField(primary_key=True)
+    bmb_name = models.CharField(max_length=255, unique=True)
+    bmb_size = models.BigIntegerField(default=0)
+    bmb_refcount = models.IntegerField(default=0)
+    bmb_created_at = models.DateTimeField(default=timezone.now)
+    bmb_updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "blogs_media_blobs"
+        indexes = [models.Index(fields=["bmb_refcount", "bmb_updated_at"], name="bmb_gc_idx")]
+
+    def __str__(self):
+        return f"{self.bmb_name} ({self.bmb_refcount} refs)"
+
+
+class BlogsJobs(models.Model):
+    """
+    A background job run by `manage.py run_workers` (blog/jobs.py).
+    Higher bj_priority runs first; bj_dedup_key is unique while the job is
+    queued or running and cleared once it finishes, so the same work is not
+    queued twice but can be queued again later.
+    """
+    bj_id = models.BigAutoField(primary_key=True)
+    bj_kind = models.CharField(max_length=50)
+    bj_payload = models.JSONField(default=dict)
+    bj_priority = models.SmallIntegerField(default=0)
+    bj_status = models.CharField(max_length=10, default="queued")  # queued, running, done, failed
+    bj_dedup_key = models.CharField(max_length=191, unique=True, null=True, blank=True)
+    bj_attempts = models.SmallIntegerField(default=0)
+    bj_max_attempts = models.SmallIntegerField(default=5)
+    bj_run_at = models.DateTimeField(default=timezone.now)
+    bj_locked_by = models.CharField(max_length=64, null=True, blank=True)
+    bj_locked_at = models.DateTimeField(null=True, blank=True)
+    bj_last_error = models.TextField(null=True, blank=True)
+    bj_created_at = models.DateTimeField(default=timezone.now)
+    bj_finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "blogs_jobs"
+        indexes = [
+            models.Index(fields=["bj_status", "bj_priority", "bj_run_at"], name="bj_claim_idx"),
+            models.Index(fields=["bj_locked_by"], name="bj_locked_by_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.bj_kind} #{self.bj_id} ({self.bj_status})"
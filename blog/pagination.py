@@ -0,0 +1,165 @@
+"""
+Keyset (cursor) pagination.
+
+Instead of OFFSET n + COUNT(*), each page remembers the sort key of its
+first/last row and the next query continues with WHERE key < cursor, so
+page 5,000 costs the same as page 1. Cursors are signed, opaque tokens.
+
+All keys are sorted descending. MySQL and SQLite both put NULLs last in
+DESC order (and first in ASC), which the cursor conditions below rely on;
+the last key must be unique and non-null (normally the primary key).
+"""
+from django.core import signing
+from django.db.models import Q
+
+
+class KeysetPage:
+    def __init__(self, object_list, *, next_token=None, prev_token=None, total=None):
+        self.object_list = object_list
+        self.next_token = next_token
+        self.prev_token = prev_token
+        # only filled when the caller asked for an exact count
+        self.total = total
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_token is not None
+
+    def has_previous(self):
+        return self.prev_token is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    def __init__(self, queryset, keys, per_page, *, salt="blog.pagination"):
+        self.queryset = queryset
+        self.keys = tuple(keys)
+        self.per_page = per_page
+        self.salt = salt
+
+    # ----------- cursor tokens -----------
+    def _value(self, row, key):
+        return row[key] if isinstance(row, dict) else getattr(row, key)
+
+    def _encode(self, direction, row):
+        values = []
+        for key in self.keys:
+            v = self._value(row, key)
+            values.append(v.isoformat() if hasattr(v, "isoformat") else v)
+        return signing.dumps({"d": direction, "v": values}, salt=self.salt, compress=True)
+
+    def _decode(self, token):
+        try:
+            data = signing.loads(token, salt=self.salt)
+            direction, raw = data["d"], data["v"]
+        except (signing.BadSignature, KeyError, TypeError):
+            return None, None
+        if direction not in ("n", "p") or len(raw) != len(self.keys):
+            return None, None
+
+        opts = self.queryset.model._meta
+        values = [
+            None if v is None else opts.get_field(key).to_python(v)
+            for key, v in zip(self.keys, raw)
+        ]
+        return direction, values
+
+    # ----------- WHERE conditions -----------
+    def _after(self, values):
+        """Rows that come after `values` in DESC, NULLS LAST order."""
+        cond = Q()
+        for i, key in enumerate(self.keys):
+            v = values[i]
+            if v is None:
+                step = None  # nothing sorts after NULL on this key
+            else:
+                step = Q(**{f"{key}__lt": v}) | Q(**{f"{key}__isnull": True})
+            if step is not None:
+                cond |= self._equal_prefix(values, i) & step
+        return cond
+
+    def _before(self, values):
+        """Rows that come before `values` in DESC, NULLS LAST order."""
+        cond = Q()
+        for i, key in enumerate(self.keys):
+            v = values[i]
+            if v is None:
+                step = Q(**{f"{key}__isnull": False})
+            else:
+                step = Q(**{f"{key}__gt": v})
+            cond |= self._equal_prefix(values, i) & step
+        return cond
+
+    def _equal_prefix(self, values, upto):
+        cond = Q()
+        for key, v in zip(self.keys[:upto], values[:upto]):
+            cond &= Q(**{f"{key}__isnull": True}) if v is None else Q(**{key: v})
+        return cond
+
+    # ----------- paging -----------
+    def _ordered(self, direction, values):
+        qs = self.queryset
+        if direction == "p":
+            return qs.filter(self._before(values)).order_by(*self.keys)
+        if direction == "n":
+            qs = qs.filter(self._after(values))
+        return qs.order_by(*[f"-{k}" for k in self.keys])
+
+    def page_queryset(self, token=None):
+        """The query page() runs for `token` (used by the index advisor)."""
+        direction, values = self._decode(token) if token else (None, None)
+        return self._ordered(direction, values)[: self.per_page + 1]
+
+    def page(self, token=None, *, with_total=False):
+        direction, values = self._decode(token) if token else (None, None)
+        qs = self._ordered(direction, values)
+
+        rows = list(qs[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+
+        if direction == "p":
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, direction == "n"
+
+        return KeysetPage(
+            rows,
+            next_token=self._encode("n", rows[-1]) if rows and has_next else None,
+            prev_token=self._encode("p", rows[0]) if rows and has_previous else None,
+            total=self.queryset.count() if with_total else None,
+        )
+
+
+def page_links(request, page_obj, param="cursor"):
+    """
+    Query strings for the Previous/Next links of a page, keeping the other
+    GET params (q, cat, ...). Works for KeysetPage and for Django's Page
+    (ranked search results are still paged by number). `param` is the GET
+    name of the cursor token.
+    """
+    params = request.GET.copy()
+    params.pop(param, None)
+    params.pop("page", None)
+
+    def build(**extra):
+        p = params.copy()
+        for k, v in extra.items():
+            p[k] = v
+        return p.urlencode()
+
+    if isinstance(page_obj, KeysetPage):
+        prev_qs = build(**{param: page_obj.prev_token}) if page_obj.has_previous() else None
+        next_qs = build(**{param: page_obj.next_token}) if page_obj.has_next() else None
+    else:
+        prev_qs = build(page=page_obj.previous_page_number()) if page_obj.has_previous() else None
+        next_qs = build(page=page_obj.next_page_number()) if page_obj.has_next() else None
+    return {"prev_qs": prev_qs, "next_qs": next_qs}
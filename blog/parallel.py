@@ -0,0 +1,69 @@
+"""
+Independent queries of an async view, run at the same time.
+
+The async ORM (aget, acount, ...) hands every query of a request to the same
+thread, so awaiting several of them with asyncio.gather still runs them one
+after another. gather_sync() instead runs plain sync callables on a small
+thread pool. Each pool thread has its own database connection, so the
+queries really overlap. BLOG_ASYNC_QUERY_THREADS bounds both the threads and
+the extra connections per process.
+
+Pool threads keep their connection between calls, which makes the pool a
+small fixed set of connections. Reconnecting on every call would cost more
+than the overlap gains. A connection is closed once it has failed and no
+longer answers, or once it is BLOG_ASYNC_QUERY_CONN_MAX_AGE seconds old
+(keep this below the server's idle timeout). Queries run in the pool are
+also seen by the SQL instrumentation middleware when it is on.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from .middleware import recording_in_thread
+
+CONN_MAX_AGE = getattr(settings, "BLOG_ASYNC_QUERY_CONN_MAX_AGE", 300)
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "BLOG_ASYNC_QUERY_THREADS", 8),
+    thread_name_prefix="blog-query",
+)
+# per pool thread: alias -> (raw connection, opened at)
+_opened = threading.local()
+
+
+def _recycle_connections():
+    opened = _opened.__dict__.setdefault("by_alias", {})
+    now = time.monotonic()
+    for conn in connections.all(initialized_only=True):
+        if conn.connection is None:
+            continue
+        raw, since = opened.get(conn.alias, (None, now))
+        if raw is not conn.connection:
+            raw, since = conn.connection, now
+        if now - since >= CONN_MAX_AGE or (conn.errors_occurred and not conn.is_usable()):
+            conn.close()
+            opened.pop(conn.alias, None)
+        else:
+            opened[conn.alias] = (raw, since)
+
+
+def _call(fn):
+    try:
+        with recording_in_thread():
+            return fn()
+    finally:
+        _recycle_connections()
+
+
+async def gather_sync(*funcs):
+    """Run the sync callables concurrently; returns their results in order."""
+    return await asyncio.gather(*(
+        # sync_to_async copies the context (and so the active query recorder) into the thread
+        sync_to_async(_call, thread_sensitive=False, executor=_executor)(fn)
+        for fn in funcs
+    ))
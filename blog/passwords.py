@@ -0,0 +1,190 @@
+"""
+Password hashing off the request thread.
+
+make_password/check_password cost hundreds of milliseconds of PBKDF2 each;
+run inline, a burst of logins takes the CPU from every other page the
+worker serves. The auth views call hash_password() and verify_password()
+instead, which run the hasher in a small process pool:
+
+- BLOG_PASSWORD_HASH_WORKERS processes (0 runs the hasher inline, e.g. in
+  tests) bound the CPU hashing can take;
+- at most BLOG_PASSWORD_HASH_MAX_PENDING hashes may be running or queued per
+  web process. A request waits up to BLOG_PASSWORD_HASH_WAIT seconds for a
+  slot and otherwise gets HashingBusy, which the views turn into a 503 with
+  Retry-After: excess logins are shed instead of queued without limit.
+  A hash that takes longer than BLOG_PASSWORD_HASH_TIMEOUT, or a pool whose
+  worker died, is reported as HashingBusy too, rather than as a 500.
+
+verify_password() also returns a fresh hash when the stored one uses an
+older hasher or fewer iterations than the current settings, so the caller
+can store it and hashing cost follows PASSWORD_HASHERS over time.
+
+ahash_password() and averify_password() are the same for async views
+(y_login, y_register): the event loop awaits the pool's future instead of
+a request thread blocking on it.
+"""
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+logger = logging.getLogger(__name__)
+
+
+class HashingBusy(Exception):
+    """No hashing slot became free in time."""
+
+
+# ----------- run in the worker processes -----------
+def _init_worker(settings_module):
+    import os
+
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    django.setup()
+
+
+def _hash(password):
+    return make_password(password)
+
+
+def _verify(password, encoded):
+    """(matches, new hash if the stored one should be upgraded)."""
+    upgraded = []
+    ok = check_password(password, encoded, setter=lambda raw: upgraded.append(make_password(raw)))
+    return ok, (upgraded[0] if ok and upgraded else None)
+
+
+# ----------- the pool -----------
+class PasswordHasherPool:
+    def __init__(self, workers, max_pending, wait, timeout):
+        self.workers = workers
+        self.wait = wait
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # not fork: the web process may have threads holding locks
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(settings.SETTINGS_MODULE,),
+                )
+            return self._executor
+
+    def _reset(self, broken):
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _acquire(self):
+        if not self._slots.acquire(timeout=self.wait):
+            logger.warning("Password hashing saturated, shedding a request")
+            raise HashingBusy()
+
+    def _submit(self, fn, *args):
+        """(executor, future) for fn(*args) on the pool; the caller already holds a slot."""
+        executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            # a worker died (OOM kill etc.); start a new pool once
+            self._reset(executor)
+            executor = self._get_executor()
+            future = executor.submit(fn, *args)
+        future.add_done_callback(lambda f: self._slots.release())
+        return executor, future
+
+    def _start(self, fn, *args):
+        """(executor, future) for fn(*args); the caller holds a slot, released here on failure."""
+        try:
+            return self._submit(fn, *args)
+        except BrokenProcessPool as e:
+            self._slots.release()
+            logger.error("Password hashing pool could not be restarted: %s", e)
+            raise HashingBusy() from e
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _broken(self, executor, error):
+        logger.error("Password hashing worker died: %s", error)
+        self._reset(executor)
+        return HashingBusy()
+
+    def _timed_out(self):
+        # the hash keeps its slot until it finishes, so a stuck pool sheds load
+        logger.warning("Password hashing took longer than %ss", self.timeout)
+        return HashingBusy()
+
+    def run(self, fn, *args):
+        self._acquire()
+        if not self.workers:
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+        executor, future = self._start(fn, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout as e:
+            raise self._timed_out() from e
+        except BrokenProcessPool as e:
+            raise self._broken(executor, e) from e
+
+    async def arun(self, fn, *args):
+        # acquiring may wait up to self.wait seconds, so not on the event loop
+        await asyncio.to_thread(self._acquire)
+        if not self.workers:
+            try:
+                return await asyncio.to_thread(fn, *args)
+            finally:
+                self._slots.release()
+        executor, future = self._start(fn, *args)
+        try:
+            # shielded: a timeout must not cancel the hash, which keeps its slot until done
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.timeout)
+        except asyncio.TimeoutError as e:
+            raise self._timed_out() from e
+        except BrokenProcessPool as e:
+            raise self._broken(executor, e) from e
+
+
+password_hasher = PasswordHasherPool(
+    workers=getattr(settings, "BLOG_PASSWORD_HASH_WORKERS", 2),
+    max_pending=getattr(settings, "BLOG_PASSWORD_HASH_MAX_PENDING", 16),
+    wait=getattr(settings, "BLOG_PASSWORD_HASH_WAIT", 2),
+    timeout=getattr(settings, "BLOG_PASSWORD_HASH_TIMEOUT", 10),
+)
+
+
+def hash_password(password):
+    return password_hasher.run(_hash, password)
+
+
+def verify_password(password, encoded):
+    """(matches, upgraded hash or None). Raises HashingBusy under overload."""
+    return password_hasher.run(_verify, password, encoded)
+
+
+async def ahash_password(password):
+    return await password_hasher.arun(_hash, password)
+
+
+async def averify_password(password, encoded):
+    """(matches, upgraded hash or None). Raises HashingBusy under overload."""
+    return await password_hasher.arun(_verify, password, encoded)
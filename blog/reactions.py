@@ -0,0 +1,122 @@
+"""
+Like and bookmark toggles.
+
+The toggle views used to load the post, check exists(), then create() or
+delete(): up to four queries, and two quick clicks could both see "not
+liked yet". Now toggle() runs in one transaction:
+
+- a conditional INSERT ... SELECT adds the row only if the post exists, is
+  published and the user has no row yet. It checks the post and the
+  current state and writes, all in the same statement;
+- if it inserted nothing, one DELETE removes the user's row, again only
+  from a published, not deleted post. If that deletes nothing too, there is
+  no such published post, and a draft keeps its likes as they are;
+- the counter on blogs_details moves with it (adjust_counter), and the new
+  count is read back for the response.
+
+A concurrent duplicate insert hits the unique key; the loser reports the
+state the winner left. Concurrent INSERT ... SELECT ... NOT EXISTS
+statements can also deadlock on InnoDB's gap locks (error 1213); the
+victim's transaction is rolled back, so it is run once more. The views answer fetch() callers with JSON
+({"active", "count"}), so a like no longer reloads the whole detail page.
+"""
+from collections import namedtuple
+
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.utils import timezone
+
+from .counters import adjust_counter
+from .fragments import bump_bookmarks_version, bump_likes_version
+
+Reaction = namedtuple("Reaction", "active count slug")
+
+MYSQL_DEADLOCK = 1213
+
+# kind -> (model name, column prefix, counter on blogs_details)
+KINDS = {
+    "like": ("BlogsLikes", "bl", "bd_like_count"),
+    "bookmark": ("BlogsBookmarks", "bb", "bd_bookmark_count"),
+}
+
+
+def _model(kind):
+    from django.apps import apps
+
+    name, prefix, counter = KINDS[kind]
+    return apps.get_model("blog", name), prefix, counter
+
+
+def _insert_sql(model, prefix):
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    blog, user, created = (qn(model._meta.get_field(f"{prefix}_{f}").column) for f in ("blog", "user", "created_at"))
+    return f"""
+        INSERT INTO {table} ({blog}, {user}, {created})
+        SELECT bd_blog_id, %s, %s FROM blogs_details
+        WHERE bd_blog_id = %s AND bd_is_deleted = 0 AND bd_blog_status = 'Published'
+          AND NOT EXISTS (SELECT 1 FROM {table} WHERE {blog} = %s AND {user} = %s)
+    """
+
+
+def _state(model, prefix, counter, blog_id, user_id):
+    from .models import BlogsDetails
+
+    count, slug = BlogsDetails.objects.filter(bd_blog_id=blog_id).values_list(counter, "bd_slug").first()
+    active = model.objects.filter(**{f"{prefix}_blog_id": blog_id, f"{prefix}_user_id": user_id}).exists()
+    return Reaction(active, count, slug)
+
+
+def _is_deadlock(error):
+    return connection.vendor == "mysql" and bool(error.args) and error.args[0] == MYSQL_DEADLOCK
+
+
+def _published(blog_id):
+    from .models import BlogsDetails
+
+    return BlogsDetails.objects.filter(
+        bd_blog_id=blog_id, bd_is_deleted=0, bd_blog_status="Published",
+    ).values("bd_blog_id")
+
+
+def _toggle(kind, blog_id, user_id):
+    from .models import BlogsDetails
+
+    model, prefix, counter = _model(kind)
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(_insert_sql(model, prefix), [user_id, now, blog_id, blog_id, user_id])
+            inserted = cursor.rowcount
+        if inserted:
+            delta = 1
+        else:
+            # the row is there (or the post is not): a single DELETE, no related rows to
+            # collect, and only while the post is published - a draft's likes stay put
+            deleted, _ = model.objects.filter(**{
+                f"{prefix}_blog_id__in": _published(blog_id), f"{prefix}_user_id": user_id,
+            }).delete()
+            if not deleted:
+                return None
+            delta = -1
+
+        adjust_counter(blog_id, counter, delta)
+        bump_likes_version(blog_id)
+        if kind == "bookmark":
+            bump_bookmarks_version(user_id)
+        count, slug = BlogsDetails.objects.filter(bd_blog_id=blog_id).values_list(counter, "bd_slug").first()
+    return Reaction(delta > 0, count, slug)
+
+
+def toggle(kind, blog_id, user_id):
+    """Flip the user's like/bookmark of a post; returns a Reaction, or None if there is no such published post."""
+    # a retry is only possible when the deadlock rolled back nothing but our own transaction
+    attempts = 1 if connection.in_atomic_block else 2
+    for attempt in range(attempts):
+        try:
+            return _toggle(kind, blog_id, user_id)
+        except IntegrityError:
+            # a concurrent toggle of the same user inserted first
+            return _state(*_model(kind), blog_id, user_id)
+        except OperationalError as e:
+            if attempt + 1 == attempts or not _is_deadlock(e):
+                raise
@@ -0,0 +1,146 @@
+"""
+View rollups for y_analytics.
+
+blogs_view_stats holds views per post per day (written by the view counter).
+rollup_views() turns the recent part of it into blogs_view_rollups rows per
+scope ("all" and "user:<id>") for days, weeks and months, so the analytics
+chart reads at most a few dozen pre-aggregated rows for any window.
+
+The job is incremental and idempotent: it recomputes the days since the
+last one it rolled up (and the weeks/months containing them), replacing
+whatever was there. The newest "all" day row is that high-water mark: any
+recorded day after it was missed (no rollup ran for a while, or never),
+and the next run starts from the first of them instead of leaving them out
+of the chart. At least ROLLUP_LOOKBACK_DAYS are always redone, for views
+that were still buffered in a worker. It
+runs from the request_finished hook at most every BLOG_VIEW_ROLLUP_INTERVAL
+seconds and can also be run by hand or from cron with `manage.py rollup_views`.
+"""
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min, Sum
+from django.utils import timezone
+
+from .models import BlogsViewRollups, BlogsViewStats
+
+SCOPE_ALL = "all"
+
+# window (days) -> period the chart reads for it
+CHART_PERIODS = {7: "day", 30: "day", 90: "week", 365: "month"}
+
+ROLLUP_LOOKBACK_DAYS = 2
+
+
+def user_scope(user_id):
+    return f"user:{user_id}"
+
+
+def period_start(day, period):
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _replace(period, starts, totals):
+    BlogsViewRollups.objects.filter(bvr_period=period, bvr_start__in=starts).delete()
+    BlogsViewRollups.objects.bulk_create(
+        [
+            BlogsViewRollups(bvr_scope=scope, bvr_period=period, bvr_start=start, bvr_views=views)
+            for (scope, start), views in totals.items()
+            if views
+        ],
+        batch_size=500,
+    )
+
+
+def resume_day(today):
+    """First day the next rollup has to recompute: the lookback, or the first missed day."""
+    since = today - timedelta(days=ROLLUP_LOOKBACK_DAYS)
+    last = BlogsViewRollups.objects.filter(bvr_scope=SCOPE_ALL, bvr_period="day").aggregate(d=Max("bvr_start"))["d"]
+    stats = BlogsViewStats.objects.all()
+    if last is not None:
+        stats = stats.filter(bvs_day__gt=last)
+    missed = stats.aggregate(d=Min("bvs_day"))["d"]
+    return min(since, missed) if missed else since
+
+
+def rollup_views(since=None):
+    """Recompute rollups from `since` (default: resume_day) up to today."""
+    today = timezone.localdate()
+    since = since or resume_day(today)
+    days = [since + timedelta(days=i) for i in range((today - since).days + 1)]
+
+    day_totals = Counter()
+    rows = (
+        BlogsViewStats.objects
+        .filter(bvs_day__gte=since, bvs_day__lte=today)
+        .values("bvs_day", "bvs_blog__bd_user_id")
+        .annotate(views=Sum("bvs_views"))
+    )
+    for row in rows:
+        day_totals[(SCOPE_ALL, row["bvs_day"])] += row["views"]
+        if row["bvs_blog__bd_user_id"]:
+            day_totals[(user_scope(row["bvs_blog__bd_user_id"]), row["bvs_day"])] += row["views"]
+
+    with transaction.atomic():
+        _replace("day", days, day_totals)
+
+        # weeks and months are summed from the (much smaller) per-scope day rows
+        for period in ("week", "month"):
+            starts = sorted({period_start(d, period) for d in days})
+            totals = Counter()
+            day_rows = BlogsViewRollups.objects.filter(
+                bvr_period="day", bvr_start__gte=starts[0], bvr_start__lte=today
+            ).values_list("bvr_scope", "bvr_start", "bvr_views")
+            for scope, start, views in day_rows:
+                totals[(scope, period_start(start, period))] += views
+            _replace(period, starts, totals)
+
+
+_last_rollup = time.monotonic()
+_rollup_lock = threading.Lock()
+
+
+def maybe_rollup_views():
+    global _last_rollup
+    interval = getattr(settings, "BLOG_VIEW_ROLLUP_INTERVAL", 300)
+    with _rollup_lock:
+        if time.monotonic() - _last_rollup < interval:
+            return
+        _last_rollup = time.monotonic()
+    rollup_views()
+
+
+def views_chart(scope, window):
+    """
+    Rows of {"day": <period start>, "views": n} covering the last `window`
+    days, using the period CHART_PERIODS picks for that window.
+    """
+    period = CHART_PERIODS[window]
+    today = timezone.localdate()
+    first = period_start(today - timedelta(days=window - 1), period)
+
+    stored = dict(
+        BlogsViewRollups.objects
+        .filter(bvr_scope=scope, bvr_period=period, bvr_start__gte=first)
+        .values_list("bvr_start", "bvr_views")
+    )
+
+    chart = []
+    start = first
+    while start <= today:
+        chart.append({"day": start, "views": stored.get(start, 0)})
+        if period == "month":
+            start = (start + timedelta(days=32)).replace(day=1)
+        elif period == "week":
+            start += timedelta(days=7)
+        else:
+            start += timedelta(days=1)
+    return chart
@@ -0,0 +1,212 @@
+"""
+Full-text search for blog posts.
+
+Every post is tokenised into blogs_search_terms (one row per term per post)
+plus one blogs_search_docs row holding its length. A query then only reads
+the posting rows for its own terms (an indexed range scan on bst_term)
+instead of running LIKE '%q%' over every post body, and results are ranked
+with BM25 in Python. Plain ORM only, so it behaves the same on MySQL and
+SQLite.
+
+A post matches when it has every word of the query (as a term, or a term
+starting with it, see MIN_PREFIX_LENGTH); rank() and match_filter() agree
+on that. Prefix matches are a range on bst_term (term >= w AND term <
+w + U+FFFF) rather than LIKE 'w%', which neither SQLite nor MySQL (LIKE
+BINARY) serves from the term index. Terms are lowercased, so the range is
+exact. BM25 also needs the number of indexed posts and their average
+length; those are cached for STATS_TIMEOUT seconds rather than
+aggregated over blogs_search_docs on every query.
+
+A short query word can prefix-match a large share of the index ("dat"
+matches "data", "database", "date", ...). So each word contributes at most
+MAX_POSTINGS_PER_WORD postings, those with the highest term frequency, and
+the Python side never scores more than that per word. A post that only
+has a word a few times, among more than that many posts that have it
+often, can miss that word's share of its score.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Avg, Count, Q
+
+from .models import BlogsDetails, BlogsSearchDocs, BlogsSearchTerms
+
+
+# (field, weight) - a hit in the title counts 3x a hit in the body
+FIELD_WEIGHTS = (
+    ("bd_blog_title", 3),
+    ("bd_slug", 2),
+    ("bd_excerpt", 2),
+    ("bd_blog_content", 1),
+)
+
+# BM25 tuning (standard defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+MAX_TERM_LENGTH = 64
+# query words at least this long also match longer terms ("djan" -> "django")
+MIN_PREFIX_LENGTH = 3
+# postings scored per query word, best term frequency first
+MAX_POSTINGS_PER_WORD = 1000
+# upper bound appended to a prefix for its range lookup
+PREFIX_END = "\uffff"
+
+STATS_KEY = "blog:search:stats"
+STATS_TIMEOUT = getattr(settings, "BLOG_SEARCH_STATS_TIMEOUT", 300)
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have if in into is it its "
+    "of on or so that the their then there these this to was were will with".split()
+)
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def tokenize(text):
+    """Lowercase word tokens of `text` without stopwords."""
+    return [
+        t[:MAX_TERM_LENGTH]
+        for t in _TOKEN_RE.findall((text or "").lower())
+        if t not in STOPWORDS
+    ]
+
+
+def _term_frequencies(blog):
+    tf = Counter()
+    for field, weight in FIELD_WEIGHTS:
+        for term in tokenize(getattr(blog, field)):
+            tf[term] += weight
+    return tf
+
+
+# ----------- INDEX MAINTENANCE -----------
+def index_blog(blog):
+    """(Re)build the postings of one post. Soft-deleted posts are removed instead."""
+    if blog.bd_is_deleted:
+        unindex_blog(blog.bd_blog_id)
+        return
+
+    tf = _term_frequencies(blog)
+    with transaction.atomic():
+        BlogsSearchTerms.objects.filter(bst_blog_id=blog.bd_blog_id).delete()
+        BlogsSearchTerms.objects.bulk_create(
+            [
+                BlogsSearchTerms(bst_blog_id=blog.bd_blog_id, bst_term=term, bst_tf=count)
+                for term, count in tf.items()
+            ],
+            batch_size=500,
+        )
+        BlogsSearchDocs.objects.update_or_create(
+            bsd_blog_id=blog.bd_blog_id,
+            defaults={"bsd_length": sum(tf.values())},
+        )
+
+
+def unindex_blog(blog_id):
+    with transaction.atomic():
+        BlogsSearchTerms.objects.filter(bst_blog_id=blog_id).delete()
+        BlogsSearchDocs.objects.filter(bsd_blog_id=blog_id).delete()
+
+
+# ----------- QUERYING -----------
+def term_filter(w):
+    """Postings of one query word: the exact term, or a term range for prefix words."""
+    if len(w) >= MIN_PREFIX_LENGTH:
+        return Q(bst_term__gte=w, bst_term__lt=w + PREFIX_END)
+    return Q(bst_term=w)
+
+
+def _all_words(words, blog_field):
+    cond = Q()
+    for w in words:
+        postings = BlogsSearchTerms.objects.filter(term_filter(w)).values("bst_blog_id")
+        cond &= Q(**{f"{blog_field}__in": postings})
+    return cond
+
+
+def match_filter(q, blog_field="bd_blog_id"):
+    """
+    Q restricting `blog_field` to posts that contain every word of `q`, one
+    indexed subquery on blogs_search_terms per word. For lists that keep
+    their own order (bookmarks) rather than ranking. None if `q` has no
+    searchable words.
+    """
+    words = list(dict.fromkeys(tokenize(q)))
+    if not words:
+        return None
+    return _all_words(words, blog_field)
+
+
+def corpus_stats():
+    """(number of indexed posts, their average length), cached for STATS_TIMEOUT."""
+    stats = cache.get(STATS_KEY)
+    if stats is None:
+        agg = BlogsSearchDocs.objects.aggregate(n=Count("bsd_blog_id"), avgdl=Avg("bsd_length"))
+        stats = (agg["n"] or 0, agg["avgdl"] or 1.0)
+        cache.set(STATS_KEY, stats, STATS_TIMEOUT)
+    return stats
+
+
+def rank(q, blogs_qs):
+    """
+    Return the ids of posts in `blogs_qs` that have every word of `q`, best
+    match first. `blogs_qs` carries the caller's filters (status, category,
+    owner, ...).
+    """
+    words = list(dict.fromkeys(tokenize(q)))
+    if not words:
+        return []
+
+    candidates = blogs_qs.filter(_all_words(words, "bd_blog_id")).values("bd_blog_id")
+    postings = []
+    for w in words:
+        postings.extend(
+            BlogsSearchTerms.objects
+            .filter(term_filter(w), bst_blog__in=candidates)
+            .order_by("-bst_tf", "bst_id")
+            .values_list("bst_blog_id", "bst_term", "bst_tf", "bst_blog__search_doc__bsd_length")
+            [:MAX_POSTINGS_PER_WORD]
+        )
+    # a term matched by two words ("dja", "djang") is scored once
+    postings = list(dict.fromkeys(postings))
+    if not postings:
+        return []
+
+    matched_terms = {term for _, term, _, _ in postings}
+    df = dict(
+        BlogsSearchTerms.objects
+        .filter(bst_term__in=matched_terms)
+        .values("bst_term")
+        .annotate(df=Count("bst_id"))
+        .values_list("bst_term", "df")
+    )
+    n_docs, avgdl = corpus_stats()
+
+    scores = defaultdict(float)
+    for blog_id, term, tf, length in postings:
+        n_t = df.get(term, 0)
+        idf = math.log(1 + (n_docs - n_t + 0.5) / (n_t + 0.5))
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * (length or avgdl) / avgdl)
+        scores[blog_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+    return sorted(scores, key=lambda blog_id: (-scores[blog_id], -blog_id))
+
+
+def search_page(q, blogs_qs, page_number, per_page):
+    """
+    Paginate ranked search results. The page's object_list holds
+    BlogsDetails rows in rank order; only that page is loaded.
+    """
+    paginator = Paginator(rank(q, blogs_qs), per_page)
+    page_obj = paginator.get_page(page_number)
+
+    ids = list(page_obj.object_list)
+    blogs = BlogsDetails.objects.in_bulk(ids)
+    page_obj.object_list = [blogs[i] for i in ids if i in blogs]
+    return page_obj
@@ -0,0 +1,366 @@
+"""
+Synthetic data for benchmarks and local testing (`manage.py seed_blog`,
+`manage.py benchmark`).
+
+The data is shaped like production rather than uniform:
+
+- post popularity follows a Zipf (power-law) curve, so a few posts get most
+  of the comments, likes and bookmarks and the long tail gets almost none;
+- a share of replies continue the newest comment of the thread, which
+  builds the deep reply chains real discussions have.
+
+Everything is deterministic from the seed. The plan (ids, how many rows each
+post gets) is computed up front in the parent process; the rows are then
+generated in fixed chunks of posts, each with its own Random(seed:phase:chunk),
+so the output does not depend on how many processes do the work. Rows carry
+explicit primary keys, so comment paths are known before the insert and
+bulk_create works the same on SQLite and MySQL (which does not return ids).
+
+Passwords: a small pool of make_password() hashes of PASSWORD is computed
+once and shared round-robin, instead of hashing once per user.
+
+ensure_schema() prepares an empty database: migrations, then the unmanaged
+blogs_* tables with their indexes.
+"""
+import multiprocessing
+import random
+from datetime import timedelta
+from itertools import accumulate, islice
+
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from .comments import MAX_DEPTH, path_segment
+from .models import (
+    BlogsBookmarks,
+    BlogsCategories,
+    BlogsComments,
+    BlogsDetails,
+    BlogsLikes,
+    BlogsUsers,
+    BlogsViewStats,
+)
+from .rollups import rollup_views
+from .search import index_blog
+
+PASSWORD = "bench-pass-123"
+EMAIL_DOMAIN = "seed.local"
+
+BATCH_SIZE = 5000  # rows per INSERT; Django lowers it where the backend needs
+CHUNK_POSTS = 2000  # posts per unit of work
+PASSWORD_POOL = 4
+
+WORDS = (
+    "django python query index cache cursor thread comment feed search ranking "
+    "latency throughput memory profile budget shard replica schema migration "
+    "async worker queue batch stream token session cookie template render "
+    "image storage upload weekly update release notes guide tutorial deep dive"
+).split()
+
+
+def ensure_schema():
+    """Migrate, then create any unmanaged blogs_* table (and its indexes) that is missing."""
+    call_command("migrate", verbosity=0)
+    existing = set(connection.introspection.table_names())
+    with connection.schema_editor() as editor:
+        for model in apps.get_app_config("blog").get_models():
+            table = model._meta.db_table
+            if model._meta.managed or not table.startswith("blogs_") or table in existing:
+                continue
+            editor.create_model(model)
+            # create_model skips the indexes of unmanaged models
+            for index in model._meta.indexes:
+                editor.execute(index.create_sql(model, editor))
+
+
+def _next_id(model):
+    last = model.objects.order_by("-pk").values_list("pk", flat=True).first()
+    return (last or 0) + 1
+
+
+def _sentence(rng, n):
+    return " ".join(rng.choices(WORDS, k=n))
+
+
+def _spread(total, weights, rng, cap=None):
+    """Split `total` over `weights` with stochastic rounding (sum is ~total)."""
+    scale = total / (sum(weights) or 1)
+    out = []
+    for w in weights:
+        expected = w * scale
+        n = int(expected) + (rng.random() < expected - int(expected))
+        out.append(min(n, cap) if cap is not None else n)
+    return out
+
+
+class SeedPlan:
+    """Ids and per-post row counts, computed once in the parent process."""
+
+    def __init__(self, *, posts, writers, viewers, categories, comments, likes, bookmarks,
+                 view_posts, seed, alpha=1.1, reply_rate=0.45, chain_rate=0.5, chunk_posts=CHUNK_POSTS):
+        self.seed = seed
+        self.posts = posts
+        self.reply_rate = reply_rate
+        self.chain_rate = chain_rate
+        self.chunk_posts = chunk_posts
+        self.now = timezone.now()
+        self.today = timezone.localdate()
+
+        self.first_user = _next_id(BlogsUsers)
+        self.admin = self.first_user
+        self.first_writer = self.admin + 1
+        self.first_viewer = self.first_writer + writers
+        self.writers = writers
+        self.viewers = viewers
+        self.first_category = _next_id(BlogsCategories)
+        self.categories = categories
+        self.first_post = _next_id(BlogsDetails)
+        self.first_comment = _next_id(BlogsComments)
+
+        rng = random.Random(f"{seed}:plan")
+        # rank 0 is the most popular post; ranks are shuffled over the posts
+        ranks = list(range(posts))
+        rng.shuffle(ranks)
+        self.ranks = ranks
+        weights = [1.0 / (r + 1) ** alpha for r in ranks]
+
+        self.comment_counts = _spread(comments, weights, rng)
+        self.like_counts = _spread(likes, weights, rng, cap=viewers)
+        self.bookmark_counts = _spread(bookmarks, weights, rng, cap=viewers)
+        # first comment id of every post
+        self.comment_offsets = [self.first_comment + n for n in accumulate([0] + self.comment_counts[:-1])]
+        self.view_posts = view_posts
+
+    def chunks(self):
+        return [(start, min(start + self.chunk_posts, self.posts)) for start in range(0, self.posts, self.chunk_posts)]
+
+    def rng(self, phase, chunk_start):
+        return random.Random(f"{self.seed}:{phase}:{chunk_start}")
+
+
+# ----------- ROW GENERATORS (one chunk of posts each) -----------
+# generators, so a chunk holding one very popular post never sits in memory whole
+def _post_rows(plan, start, end):
+    rng = plan.rng("posts", start)
+    for i in range(start, end):
+        blog_id = plan.first_post + i
+        published = rng.random() < 0.9
+        at = plan.now - timedelta(minutes=rng.randrange(365 * 24 * 60))
+        yield BlogsDetails(
+            bd_blog_id=blog_id,
+            bd_blog_title=_sentence(rng, 5).capitalize(),
+            bd_slug=f"seeded-post-{blog_id}",
+            bd_blog_content=_sentence(rng, 300),
+            bd_excerpt=_sentence(rng, 15),
+            bd_date_added=at.date(),
+            bd_updated_at=at,
+            bd_published_at=at if published else None,
+            bd_user_id=plan.first_writer + rng.randrange(plan.writers),
+            bd_blog_status="Published" if published else "Draft",
+            bd_category_id=plan.first_category + rng.randrange(plan.categories),
+            bd_is_deleted=0,
+            bd_views=0,
+            bd_comment_count=plan.comment_counts[i],
+            bd_like_count=plan.like_counts[i],
+            bd_bookmark_count=plan.bookmark_counts[i],
+        )
+
+
+def _thread_shape(plan, rng, n):
+    """Parent index (or -1) and depth of each of n comments, plus reply counts."""
+    parents, depths, replies = [], [], [0] * n
+    for k in range(n):
+        parent = -1
+        if k and rng.random() < plan.reply_rate:
+            # continuing the newest comment builds deep chains
+            parent = k - 1 if rng.random() < plan.chain_rate else rng.randrange(k)
+            if depths[parent] >= MAX_DEPTH - 1:
+                parent = -1
+        parents.append(parent)
+        depths.append(depths[parent] + 1 if parent >= 0 else 0)
+        if parent >= 0:
+            replies[parent] += 1
+    return parents, depths, replies
+
+
+def _comment_rows(plan, start, end):
+    rng = plan.rng("comments", start)
+    for i in range(start, end):
+        blog_id = plan.first_post + i
+        first = plan.comment_offsets[i]
+        parents, depths, replies = _thread_shape(plan, rng, plan.comment_counts[i])
+        paths = []
+        at = plan.now - timedelta(days=90)
+        for k, parent in enumerate(parents):
+            comment_id = first + k
+            paths.append((paths[parent] if parent >= 0 else "") + path_segment(comment_id))
+            at += timedelta(seconds=rng.randrange(1, 600))
+            yield BlogsComments(
+                bc_comment_id=comment_id,
+                bc_blog_id=blog_id,
+                bc_user_id=plan.first_viewer + rng.randrange(plan.viewers),
+                bc_comment=_sentence(rng, rng.randrange(5, 40)),
+                bc_created_at=at,
+                bc_status="Approved",
+                bc_parent_id=first + parent if parent >= 0 else None,
+                bc_is_deleted=0,
+                bc_path=paths[k],
+                bc_depth=depths[k],
+                bc_reply_count=replies[k],
+            )
+
+
+def _pair_rows(plan, start, end, phase, model, counts, blog_field, user_field):
+    rng = plan.rng(phase, start)
+    for i in range(start, end):
+        for v in rng.sample(range(plan.viewers), counts[i]):
+            yield model(**{blog_field: plan.first_post + i, user_field: plan.first_viewer + v})
+
+
+def _view_rows(plan, start, end):
+    # daily views for the view_posts most popular posts, every third day of a year
+    rng = plan.rng("views", start)
+    for i in range(start, end):
+        if plan.ranks[i] >= plan.view_posts:
+            continue
+        daily = max(1, 500 // (plan.ranks[i] + 1))
+        for d in range(0, 365, 3):
+            yield BlogsViewStats(
+                bvs_blog_id=plan.first_post + i,
+                bvs_day=plan.today - timedelta(days=d),
+                bvs_views=rng.randrange(daily, daily * 2 + 1),
+            )
+
+
+PHASES = {
+    "posts": (BlogsDetails, _post_rows),
+    "comments": (BlogsComments, _comment_rows),
+    "likes": (BlogsLikes, lambda plan, s, e: _pair_rows(
+        plan, s, e, "likes", BlogsLikes, plan.like_counts, "bl_blog_id", "bl_user_id"
+    )),
+    "bookmarks": (BlogsBookmarks, lambda plan, s, e: _pair_rows(
+        plan, s, e, "bookmarks", BlogsBookmarks, plan.bookmark_counts, "bb_blog_id", "bb_user_id"
+    )),
+    "views": (BlogsViewStats, _view_rows),
+}
+
+
+# ----------- WORKERS -----------
+# set in the parent before forking so the (large) plan is shared, not pickled per task
+_plan = None
+
+
+def _prepare_connection():
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            # bulk load: let SQLite skip fsyncs and wait for the other processes' writes
+            cursor.execute("PRAGMA synchronous = OFF")
+            cursor.execute("PRAGMA busy_timeout = 60000")
+
+
+def _run_chunk(task):
+    phase, start, end, batch_size = task
+    _prepare_connection()
+    model, rows = PHASES[phase]
+    rows = rows(_plan, start, end)
+    total = 0
+    with transaction.atomic():
+        while batch := list(islice(rows, batch_size)):
+            model.objects.bulk_create(batch, batch_size=batch_size)
+            total += len(batch)
+    return phase, total
+
+
+def _run_phase(phase, plan, processes, batch_size, progress):
+    tasks = [(phase, s, e, batch_size) for s, e in plan.chunks()]
+    total = 0
+    if processes > 1:
+        # children must open their own connections
+        connections.close_all()
+        with multiprocessing.get_context("fork").Pool(processes) as pool:
+            for _, n in pool.imap_unordered(_run_chunk, tasks):
+                total += n
+                progress(phase, total)
+    else:
+        for task in tasks:
+            total += _run_chunk(task)[1]
+            progress(phase, total)
+    return total
+
+
+def seed(*, posts=1000, writers=20, viewers=200, categories=8, comments=10000, likes=20000,
+         bookmarks=5000, view_posts=200, seed=42, processes=1, batch_size=BATCH_SIZE,
+         chunk_posts=CHUNK_POSTS, alpha=1.1, index=True, progress=None):
+    """Generate a dataset; returns {table: rows inserted}."""
+    global _plan
+    progress = progress or (lambda phase, n: None)
+    if processes > 1 and "fork" not in multiprocessing.get_all_start_methods():
+        processes = 1
+
+    plan = SeedPlan(
+        posts=posts, writers=writers, viewers=viewers, categories=categories, comments=comments,
+        likes=likes, bookmarks=bookmarks, view_posts=view_posts, seed=seed, alpha=alpha,
+        chunk_posts=chunk_posts,
+    )
+    _plan = plan
+    _prepare_connection()
+    now = plan.now
+    inserted = {}
+
+    # ----------- users and categories (small, parent process) -----------
+    hashes = [make_password(PASSWORD) for _ in range(PASSWORD_POOL)]
+    users = []
+    for n in range(1 + writers + viewers):
+        user_id = plan.first_user + n
+        role = "admin" if n == 0 else "writer" if n <= writers else "viewer"
+        users.append(BlogsUsers(
+            bu_user_id=user_id,
+            bu_first_name=role.title(),
+            bu_last_name=str(user_id),
+            bu_email=f"{role}{user_id}@{EMAIL_DOMAIN}",
+            bu_username=f"{role}{user_id}",
+            bu_password_hash=hashes[n % PASSWORD_POOL],
+            bu_role=role,
+            bu_status="Active",
+            bu_created_at=now,
+            bu_updated_at=now,
+        ))
+    with transaction.atomic():
+        BlogsUsers.objects.bulk_create(users, batch_size=batch_size)
+        BlogsCategories.objects.bulk_create(
+            [
+                BlogsCategories(
+                    bc_category_id=plan.first_category + i,
+                    bc_category_name=f"Category {plan.first_category + i}",
+                    bc_slug=f"seeded-category-{plan.first_category + i}",
+                    bc_category_status="Active",
+                    bc_sort_order=i,
+                    bc_created_at=now,
+                    bc_updated_at=now,
+                )
+                for i in range(categories)
+            ],
+            batch_size=batch_size,
+        )
+    inserted["blogs_users"] = len(users)
+    inserted["blogs_categories"] = categories
+
+    # ----------- posts first (foreign keys), then everything that points at them -----------
+    for phase, table in (
+        ("posts", "blogs_details"),
+        ("comments", "blogs_comments"),
+        ("likes", "blogs_likes"),
+        ("bookmarks", "blogs_bookmarks"),
+        ("views", "blogs_view_stats"),
+    ):
+        inserted[table] = _run_phase(phase, plan, processes, batch_size, progress)
+
+    rollup_views(since=plan.today - timedelta(days=365))
+    if index:
+        for post in BlogsDetails.objects.filter(bd_blog_id__gte=plan.first_post).iterator(chunk_size=500):
+            index_blog(post)
+    _plan = None
+    return inserted
@@ -0,0 +1,78 @@
+"""
+Unique slug allocation for posts and categories.
+
+Instead of probing base, base-2, base-3, ... with one exists() query each,
+the base itself and all slugs starting with "<base>-" are read in one
+query and the next free suffix is picked. The prefix is a range ("<base>-"
+<= slug < "<base>.", "." being the character after "-") so both parts are
+probes of the unique slug index; startswith would be a LIKE, which scans
+it. Slugs that merely share the prefix ("poster" for "post") are not read.
+Two concurrent creates can still pick the same slug; the unique index
+rejects the second one and create_with_unique_slug() allocates again.
+"""
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+# room kept at the end of a long base for "-<n>"
+SUFFIX_ROOM = 8
+MAX_ATTEMPTS = 5
+
+
+def _fit(base, max_length):
+    if len(base) <= max_length - SUFFIX_ROOM:
+        return base
+    return base[: max_length - SUFFIX_ROOM].rstrip("-")
+
+
+def _taken_suffixes(base, slugs):
+    """Suffix numbers used by `base` among `slugs` (the bare base counts as 1)."""
+    pattern = re.compile(rf"^{re.escape(base)}(?:-(\d+))?$")
+    taken = set()
+    for slug in slugs:
+        m = pattern.match(slug)
+        if m:
+            taken.add(int(m.group(1)) if m.group(1) else 1)
+    return taken
+
+
+def _with_suffix(base, n):
+    return base if n == 1 else f"{base}-{n}"
+
+
+def _next_free(taken, start=1):
+    n = start
+    while n in taken:
+        n += 1
+    return n
+
+
+def _base_filter(field, base):
+    """The base itself and its "<base>-..." slugs."""
+    return Q(**{field: base}) | Q(**{f"{field}__gte": f"{base}-", f"{field}__lt": f"{base}."})
+
+
+def allocate_slug(model, field, base):
+    """The first free slug among base, base-2, base-3, ... in one query."""
+    base = _fit(base, model._meta.get_field(field).max_length)
+    existing = model.objects.filter(_base_filter(field, base)).values_list(field, flat=True)
+    taken = _taken_suffixes(base, existing)
+    return _with_suffix(base, _next_free(taken))
+
+
+def create_with_unique_slug(model, field, base, create):
+    """
+    Call create(slug) with a freshly allocated slug, allocating again if the
+    unique index says another request took it first. Other integrity errors
+    (and the last failed attempt) are raised.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        slug = allocate_slug(model, field, base)
+        try:
+            with transaction.atomic():
+                return create(slug)
+        except IntegrityError:
+            if attempt == MAX_ATTEMPTS - 1 or not model.objects.filter(**{field: slug}).exists():
+                raise
+
@@ -0,0 +1,41 @@
+from django import template
+from django.utils.html import format_html
+
+from blog.images import media_path, media_url, srcset, variant_path, variant_widths
+
+register = template.Library()
+
+
+@register.simple_tag
+def picture(value, kind, sizes, default_width=None, **attrs):
+    """
+    <picture> for an uploaded image: WebP and JPEG srcsets of its variants
+    for `kind` ("profile" or "featured"), with `sizes` telling the browser
+    how wide the slot is. Falls back to a
+    plain <img> of the original while the variants are being built, and for
+    external URLs.
+
+        {% picture b.bd_featured_image "featured" "(min-width: 992px) 33vw, 100vw" alt="cover" class="card-img-top" %}
+    """
+    rel = media_path(value)
+    widths = variant_widths(rel, kind) if rel else None
+    attrs.setdefault("loading", "lazy")
+    attrs.setdefault("decoding", "async")
+    extra = format_html(
+        "".join(f' {name.replace("_", "-")}="{{}}"' for name in attrs),
+        *attrs.values(),
+    )
+
+    if not widths:
+        src = media_url(rel) if rel else value
+        return format_html('<img src="{}"{}>', src, extra)
+
+    # src for browsers without srcset: the variant closest to the expected slot
+    fallback = min(widths, key=lambda w: abs(w - int(default_width or widths[len(widths) // 2])))
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}"{}></picture>',
+        srcset(rel, kind, widths, "webp"), sizes,
+        media_url(variant_path(rel, kind, fallback, "jpg")), srcset(rel, kind, widths, "jpg"), sizes,
+        extra,
+    )
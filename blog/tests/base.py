@@ -0,0 +1,75 @@
+"""
+Shared fixtures for the blog tests. They run on SQLite, with the unmanaged
+blogs_* tables created by myblog.test_runner:
+
+    python manage.py test blog --settings=myblog.settings_test
+"""
+from django.apps import apps
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from blog.counters import view_counter
+from blog.models import BlogsDetails, BlogsUsers
+
+
+def make_user(email, role="viewer", **fields):
+    fields.setdefault("bu_password_hash", "x")
+    fields.setdefault("bu_status", "Active")
+    fields.setdefault("bu_first_name", email.split("@")[0])
+    return BlogsUsers.objects.create(bu_email=email, bu_role=role, bu_updated_at=timezone.now(), **fields)
+
+
+def make_post(slug, status="Published", **fields):
+    now = timezone.now()
+    fields.setdefault("bd_updated_at", now)
+    if status == "Published":
+        fields.setdefault("bd_published_at", now)
+    fields.setdefault("bd_blog_title", slug.replace("-", " ").title())
+    fields.setdefault("bd_is_deleted", 0)
+    fields.setdefault("bd_views", 0)
+    return BlogsDetails.objects.create(
+        bd_slug=slug, bd_blog_status=status, bd_date_added=now.date(), **fields,
+    )
+
+
+def login(client, user):
+    session = client.session
+    session["user_id"] = user.bu_user_id
+    session["user_role"] = user.bu_role
+    session["user_email"] = user.bu_email
+    session.save()
+
+
+class BlogTestCase(TestCase):
+    def setUp(self):
+        # version stamps, fragments and viewed filters live in the caches
+        cache.clear()
+        caches["viewed"].clear()
+
+
+class BlogTransactionTestCase(TransactionTestCase):
+    """
+    For the async views: gather_sync runs their queries on pool threads with
+    their own connections, which cannot see a TestCase's uncommitted rows.
+    The rows are committed here, and removed again after each test (Django
+    only flushes the managed tables; blog.models also maps django_* tables
+    as unmanaged, which are left alone).
+    """
+
+    def setUp(self):
+        cache.clear()
+        caches["viewed"].clear()
+
+    def tearDown(self):
+        # buffered views of the pages the test read
+        view_counter.flush()
+        tables = [
+            model._meta.db_table
+            for model in apps.get_app_config("blog").get_models()
+            if not model._meta.managed and model._meta.db_table.startswith("blogs_")
+        ]
+        with connection.constraint_checks_disabled(), connection.cursor() as cursor:
+            for table in tables:
+                cursor.execute(f"DELETE FROM {table}")
@@ -0,0 +1,15 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from .base import BlogTestCase
+
+
+class AdviseIndexesTests(BlogTestCase):
+    def test_hot_queries_are_served_by_indexes(self):
+        out = StringIO()
+        call_command("advise_indexes", stdout=out)
+        report = out.getvalue()
+        self.assertIn("search postings [blogs_search_terms]: ok", report)
+        self.assertNotIn("unresolved", report.lower())
+        self.assertIn("No missing indexes.", report)
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+
+from asgiref.sync import iscoroutinefunction
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from blog import views
+from blog.models import BlogsBookmarks, BlogsLikes
+from blog.parallel import gather_sync
+
+from .base import BlogTransactionTestCase, login, make_post, make_user
+
+
+class GatherSyncTests(SimpleTestCase):
+    def test_results_come_back_in_order(self):
+        results = asyncio.run(gather_sync(lambda: 1, lambda: 2, lambda: 3))
+        self.assertEqual(results, [1, 2, 3])
+
+    def test_callables_overlap(self):
+        # each call waits for the other: run one after another, the barrier times out
+        barrier = threading.Barrier(2, timeout=5)
+
+        def meet():
+            barrier.wait()
+            return threading.current_thread().name
+
+        names = asyncio.run(gather_sync(meet, meet))
+        self.assertEqual(len(set(names)), 2)
+        self.assertTrue(all(name.startswith("blog-query") for name in names))
+
+
+class AsyncViewTests(BlogTransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.writer = make_user("writer@example.com", role="writer")
+        self.viewer = make_user("viewer@example.com")
+        self.post = make_post("first-post", bd_user_id=self.writer.pk, bd_like_count=1)
+        self.other = make_post("other-post", bd_user_id=self.viewer.pk, bd_views=7)
+
+    def test_views_and_decorators_stay_async(self):
+        for view in (views.y_home, views.y_blog_detail, views.y_bookmarks, views.y_analytics):
+            self.assertTrue(iscoroutinefunction(view), view.__name__)
+
+    def test_anonymous_readers_are_sent_to_login(self):
+        for url in ("/", "/y/blog/first-post/", "/y/bookmarks/", "/y/analytics/"):
+            self.assertRedirects(self.client.get(url), "/y/login/", fetch_redirect_response=False)
+
+    def test_analytics_needs_a_writer_or_admin(self):
+        login(self.client, self.viewer)
+        self.assertRedirects(self.client.get("/y/analytics/"), "/", fetch_redirect_response=False)
+
+    def test_home_lists_the_published_posts(self):
+        make_post("draft-post", status="Draft")
+        login(self.client, self.viewer)
+        response = self.client.get("/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {blog.bd_slug for blog in response.context["page_obj"]}, {"first-post", "other-post"},
+        )
+
+    def test_detail_carries_the_viewers_reactions(self):
+        BlogsLikes.objects.create(bl_blog=self.post, bl_user=self.viewer)
+        login(self.client, self.viewer)
+        response = self.client.get("/y/blog/first-post/")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.post.bd_blog_title)
+        self.assertTrue(response.context["user_liked"])
+        self.assertFalse(response.context["user_bookmarked"])
+        self.assertEqual(response.context["like_count"], 1)
+
+    def test_bookmarks_list_the_viewers_posts(self):
+        BlogsBookmarks.objects.create(bb_blog=self.other, bb_user=self.viewer, bb_created_at=timezone.now())
+        login(self.client, self.viewer)
+        response = self.client.get("/y/bookmarks/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([b.bb_blog.bd_slug for b in response.context["page_obj"]], ["other-post"])
+
+    def test_analytics_of_a_writer_cover_only_their_posts(self):
+        login(self.client, self.writer)
+        response = self.client.get("/y/analytics/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["total_published"], 1)
+        self.assertEqual(response.context["total_views"], 0)
+        self.assertEqual([b.bd_slug for b in response.context["top_viewed"]], ["first-post"])
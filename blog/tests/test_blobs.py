@@ -0,0 +1,85 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.blobs import add_ref, blob_storage, delete_blob, release
+from blog.models import BlogsMediaBlobs
+
+from .base import BlogTestCase, make_user
+
+
+class BlobStoreTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def save(self, data, name="upload.png"):
+        return blob_storage.save(name, ContentFile(data))
+
+    def age(self, name, hours=48):
+        BlogsMediaBlobs.objects.filter(bmb_name=name).update(
+            bmb_updated_at=timezone.now() - timedelta(hours=hours)
+        )
+
+    def test_identical_uploads_share_one_blob(self):
+        first = self.save(b"same bytes")
+        second = self.save(b"same bytes", "other-name.png")
+        third = self.save(b"other bytes")
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, third)
+        self.assertRegex(first, r"^blobs/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.png$")
+        self.assertEqual(BlogsMediaBlobs.objects.count(), 2)
+        with blob_storage.open(first) as fh:
+            self.assertEqual(fh.read(), b"same bytes")
+
+    def test_refcounts(self):
+        name = self.save(b"avatar")
+        add_ref(name)
+        add_ref(name)
+        release(name)
+        self.assertEqual(BlogsMediaBlobs.objects.get(bmb_name=name).bmb_refcount, 1)
+        # paths from before content addressing are not counted
+        add_ref("profile_pics/old.png")
+
+    def test_delete_blob_respects_refs_and_grace_period(self):
+        name = self.save(b"orphan")
+        cutoff = timezone.now() - timedelta(hours=24)
+        self.assertFalse(delete_blob(name, cutoff))  # uploaded just now
+        self.assertTrue(blob_storage.exists(name))
+
+        self.age(name)
+        add_ref(name)
+        self.age(name)
+        self.assertFalse(delete_blob(name, cutoff))  # referenced
+        self.assertTrue(blob_storage.exists(name))
+
+        release(name)
+        self.age(name)
+        self.assertTrue(delete_blob(name, cutoff))
+        self.assertFalse(blob_storage.exists(name))
+        self.assertFalse(BlogsMediaBlobs.objects.filter(bmb_name=name).exists())
+
+    def test_gc_keeps_blobs_still_in_use_despite_a_drifted_count(self):
+        used = self.save(b"in use")
+        unused = self.save(b"not in use")
+        make_user("pic@example.com", bu_profile_pic=used)
+        self.age(used)
+        self.age(unused)
+
+        call_command("gc_media", stdout=StringIO(), stderr=StringIO())
+
+        self.assertTrue(blob_storage.exists(used))
+        self.assertEqual(BlogsMediaBlobs.objects.get(bmb_name=used).bmb_refcount, 1)
+        self.assertFalse(blob_storage.exists(unused))
+        self.assertFalse(BlogsMediaBlobs.objects.filter(bmb_name=unused).exists())
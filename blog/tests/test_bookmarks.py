@@ -0,0 +1,49 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+
+from blog.models import BlogsBookmarks
+from blog.search import index_blog
+
+from .base import BlogTransactionTestCase, login, make_post, make_user
+
+
+class BookmarksPageTests(BlogTransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.viewer = make_user("reader@example.com")
+        base = timezone.now()
+        self.posts = [make_post(f"saved-{i}", bd_blog_content="long body " * 100) for i in range(10)]
+        for i, post in enumerate(self.posts):
+            # ties on bb_created_at, broken by bb_id
+            BlogsBookmarks.objects.create(
+                bb_user=self.viewer, bb_blog=post, bb_created_at=base - timedelta(minutes=i // 3),
+            )
+        login(self.client, self.viewer)
+
+    def test_bookmarks_page_is_keyset_paginated(self):
+        with mock.patch("blog.views.BOOKMARKS_PER_PAGE", 4):
+            seen, url = [], "/y/bookmarks/"
+            while url:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                seen += [bm.bb_id for bm in response.context["bookmarks"]]
+                url = response.context["next_qs"] and f"/y/bookmarks/?{response.context['next_qs']}"
+        expected = list(
+            BlogsBookmarks.objects.filter(bb_user=self.viewer)
+            .order_by("-bb_created_at", "-bb_id").values_list("bb_id", flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_cards_do_not_load_the_post_body(self):
+        response = self.client.get("/y/bookmarks/")
+        bookmark = next(iter(response.context["bookmarks"]))
+        self.assertIn("bd_blog_content", bookmark.bb_blog.get_deferred_fields())
+
+    def test_search_goes_through_the_index(self):
+        wanted = make_post("django-tips", bd_blog_title="Django tips")
+        BlogsBookmarks.objects.create(bb_user=self.viewer, bb_blog=wanted, bb_created_at=timezone.now())
+        index_blog(wanted)
+        response = self.client.get("/y/bookmarks/?q=djan")
+        self.assertEqual([bm.bb_blog.bd_slug for bm in response.context["bookmarks"]], ["django-tips"])
@@ -0,0 +1,47 @@
+from unittest import mock
+
+from django.utils import timezone
+
+from blog.categories import CategoryRegistry, bump_categories_version
+from blog.models import BlogsCategories
+
+from .base import BlogTestCase
+
+
+class CategoryRegistryTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.registry = CategoryRegistry()
+        self.add("Python", sort=2)
+        self.add("Archive", sort=1, status="Inactive")
+        self.add("Django", sort=2)
+
+    def add(self, name, sort=0, status="Active"):
+        now = timezone.now()
+        return BlogsCategories.objects.create(
+            bc_category_name=name, bc_slug=name.lower(), bc_sort_order=sort, bc_category_status=status,
+            bc_created_at=now, bc_updated_at=now,
+        )
+
+    def test_snapshot_orders(self):
+        snapshot = self.registry.get()
+        self.assertEqual([c.bc_category_name for c in snapshot.all], ["Archive", "Django", "Python"])
+        self.assertEqual([c.bc_category_name for c in snapshot.active], ["Django", "Python"])
+        self.assertEqual([c.bc_category_name for c in snapshot.by_name], ["Archive", "Django", "Python"])
+
+    def test_snapshot_is_reused_until_the_version_moves(self):
+        snapshot = self.registry.get()
+        self.add("Go")
+        with self.assertNumQueries(0):
+            self.assertIs(self.registry.get(), snapshot)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_categories_version()
+        self.assertIn("Go", [c.bc_category_name for c in self.registry.get().all])
+
+    def test_snapshot_expires_after_max_age(self):
+        snapshot = self.registry.get()
+        later = self.registry._loaded_at + 61
+        with self.settings(BLOG_CATEGORY_REGISTRY_MAX_AGE=60):
+            with mock.patch("blog.categories.time.monotonic", return_value=later):
+                self.assertIsNot(self.registry.get(), snapshot)
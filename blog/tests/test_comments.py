@@ -0,0 +1,106 @@
+from unittest import mock
+
+from blog.comments import (
+    INLINE_REPLIES, MAX_DEPTH, SEGMENT_WIDTH, create_comment, path_segment, replies_page, soft_delete_comment,
+    thread_page,
+)
+from blog.models import BlogsComments, BlogsDetails
+
+from .base import BlogTestCase, make_post, make_user
+
+
+class CommentTestCase(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user("commenter@example.com")
+        self.post = make_post("discussed")
+
+    def comment(self, text, parent=None):
+        return create_comment(self.post, self.user.pk, text, parent=parent)
+
+
+class CommentPathTests(CommentTestCase):
+    def test_paths_depths_and_reply_counts(self):
+        root = self.comment("root")
+        reply = self.comment("reply", root)
+        nested = self.comment("nested", reply)
+
+        self.assertEqual(root.bc_path, path_segment(root.pk))
+        self.assertEqual(reply.bc_path, root.bc_path + path_segment(reply.pk))
+        self.assertEqual(nested.bc_path, reply.bc_path + path_segment(nested.pk))
+        self.assertEqual([c.bc_depth for c in (root, reply, nested)], [0, 1, 2])
+        self.assertEqual(BlogsComments.objects.get(pk=root.pk).bc_reply_count, 1)
+        self.assertEqual(BlogsDetails.objects.get(pk=self.post.pk).bd_comment_count, 3)
+
+    def test_path_segments_are_fixed_width_and_sort_numerically(self):
+        self.assertEqual(len(path_segment(1)), SEGMENT_WIDTH)
+        self.assertLess(path_segment(35), path_segment(36))
+        self.assertLess(path_segment(999), path_segment(1000))
+
+    def test_replies_past_max_depth_attach_to_deepest_ancestor_that_fits(self):
+        parent = self.comment("0")
+        for i in range(MAX_DEPTH + 3):
+            parent = self.comment(str(i + 1), parent)
+        depths = BlogsComments.objects.values_list("bc_depth", flat=True)
+        self.assertEqual(max(depths), MAX_DEPTH - 1)
+        self.assertTrue(all(len(p) <= 255 for p in BlogsComments.objects.values_list("bc_path", flat=True)))
+
+    def test_soft_delete_updates_counts_once(self):
+        root = self.comment("root")
+        reply = self.comment("reply", root)
+        soft_delete_comment(reply)
+        soft_delete_comment(reply)
+        self.assertEqual(BlogsComments.objects.get(pk=root.pk).bc_reply_count, 0)
+        self.assertEqual(BlogsDetails.objects.get(pk=self.post.pk).bd_comment_count, 1)
+
+
+class ThreadPageTests(CommentTestCase):
+    def test_roots_newest_first_each_followed_by_its_replies(self):
+        first = self.comment("first")
+        second = self.comment("second")
+        reply = self.comment("reply", first)
+        nested = self.comment("nested", reply)
+
+        rows, page = thread_page(self.post)
+        self.assertEqual([c.pk for c in rows], [second.pk, first.pk, reply.pk, nested.pk])
+        self.assertFalse(page.has_next())
+
+    def test_deleted_comment_with_replies_stays_as_placeholder(self):
+        root = self.comment("root")
+        reply = self.comment("reply", root)
+        lonely = self.comment("lonely")
+        soft_delete_comment(root)
+        soft_delete_comment(lonely)
+
+        rows, _ = thread_page(self.post)
+        self.assertEqual([c.pk for c in rows], [root.pk, reply.pk])
+
+    def test_reply_cap_is_per_root(self):
+        busy = self.comment("busy")
+        for i in range(INLINE_REPLIES + 5):
+            self.comment(f"reply {i}", busy)
+        quiet = self.comment("quiet")
+        answer = self.comment("answer", quiet)
+
+        # a page-wide cap of INLINE_REPLIES would leave nothing for "quiet"
+        with mock.patch("blog.comments.ROOTS_PER_PAGE", 1), self.assertNumQueries(2):
+            rows, page = thread_page(self.post)
+        self.assertEqual([c.pk for c in rows], [quiet.pk, answer.pk])
+
+        rows, _ = thread_page(self.post, page.next_token)
+        self.assertEqual(rows[0].pk, busy.pk)
+        self.assertEqual(len(rows), 1 + INLINE_REPLIES)
+        self.assertEqual(rows[0].hidden_replies, 5)
+        self.assertEqual(rows[0].more_after, rows[-1].bc_path)
+
+    def test_show_more_continues_after_the_last_shown_reply(self):
+        root = self.comment("root")
+        replies = [self.comment(f"reply {i}", root) for i in range(INLINE_REPLIES + 3)]
+        rows, _ = thread_page(self.post)
+
+        with mock.patch("blog.comments.REPLIES_PER_PAGE", 2):
+            more, next_after = replies_page(root, after=rows[0].more_after)
+            self.assertEqual([c.pk for c in more], [r.pk for r in replies[INLINE_REPLIES:INLINE_REPLIES + 2]])
+            more, next_after = replies_page(root, after=next_after)
+        self.assertEqual([c.pk for c in more], [replies[-1].pk])
+        self.assertIsNone(next_after)
@@ -0,0 +1,53 @@
+from .base import BlogTransactionTestCase, login, make_post, make_user
+
+
+class ConditionalGetTests(BlogTransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.viewer = make_user("viewer@example.com")
+        self.post = make_post("cached-post")
+        login(self.client, self.viewer)
+
+    def revalidate(self, url):
+        # the CSRF cookie is part of the tag: pages with a form set it on the first visit
+        self.client.get(url)
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("private", first["Cache-Control"])
+        self.assertIn("no-cache", first["Cache-Control"])
+        return first["ETag"], self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+    def test_unchanged_pages_are_not_modified(self):
+        for url in ("/", "/y/blog/cached-post/", "/y/bookmarks/", "/y/profile/"):
+            with self.subTest(url=url):
+                _, response = self.revalidate(url)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b"")
+
+    def test_a_comment_changes_the_detail_etag(self):
+        etag, _ = self.revalidate("/y/blog/cached-post/")
+        self.client.post("/y/blog/cached-post/", {"comment": "first!"})
+        # the flash message of the comment is shown in full
+        self.assertEqual(self.client.get("/y/blog/cached-post/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        response = self.client.get("/y/blog/cached-post/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_a_bookmark_changes_the_detail_and_bookmarks_etags(self):
+        detail, _ = self.revalidate("/y/blog/cached-post/")
+        bookmarks, _ = self.revalidate("/y/bookmarks/")
+        self.client.post(f"/y/blog/{self.post.pk}/bookmark/", HTTP_ACCEPT="application/json")
+        self.assertEqual(self.client.get("/y/blog/cached-post/", HTTP_IF_NONE_MATCH=detail).status_code, 200)
+        self.assertEqual(self.client.get("/y/bookmarks/", HTTP_IF_NONE_MATCH=bookmarks).status_code, 200)
+
+    def test_a_profile_edit_changes_the_profile_etag(self):
+        etag, _ = self.revalidate("/y/profile/")
+        self.client.post("/y/profile/edit/", {"first_name": "Renamed"}, follow=True)
+        response = self.client.get("/y/profile/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Renamed")
+
+    def test_etags_differ_per_user(self):
+        etag, _ = self.revalidate("/y/blog/cached-post/")
+        login(self.client, make_user("other@example.com"))
+        self.assertEqual(self.client.get("/y/blog/cached-post/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
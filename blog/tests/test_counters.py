@@ -0,0 +1,59 @@
+from importlib import import_module
+from types import SimpleNamespace
+
+from django.db import connection
+from django.utils import timezone
+
+from blog.counters import adjust_counter, reconcile_counters
+from blog.models import BlogsBookmarks, BlogsComments, BlogsDetails, BlogsLikes
+
+from .base import BlogTestCase, make_post, make_user
+
+backfill_migration = import_module("blog.migrations.0016_backfill_engagement_counters")
+
+
+class EngagementCounterTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user("reader@example.com")
+        self.post = make_post("counted")
+        self.quiet = make_post("quiet")
+        BlogsLikes.objects.create(bl_blog=self.post, bl_user=self.user)
+        BlogsBookmarks.objects.create(bb_blog=self.post, bb_user=self.user)
+        for status, deleted in (("Approved", 0), ("Approved", 0), ("Approved", 1), ("Pending", 0)):
+            BlogsComments.objects.create(
+                bc_blog=self.post, bc_user=self.user, bc_comment="hi", bc_status=status, bc_is_deleted=deleted,
+                bc_created_at=timezone.now(),
+            )
+
+    def counters(self, post):
+        return BlogsDetails.objects.filter(pk=post.pk).values_list(
+            "bd_like_count", "bd_bookmark_count", "bd_comment_count"
+        ).get()
+
+    def test_adjust_counter_never_goes_negative(self):
+        adjust_counter(self.quiet.pk, "bd_like_count", 2)
+        adjust_counter(self.quiet.pk, "bd_like_count", -3)
+        self.assertEqual(self.counters(self.quiet), (0, 0, 0))
+        with self.assertRaises(ValueError):
+            adjust_counter(self.quiet.pk, "bd_views", 1)
+
+    def test_reconcile_repairs_drift(self):
+        BlogsDetails.objects.filter(pk=self.quiet.pk).update(bd_like_count=4)
+        reported = []
+        checked, drifted = reconcile_counters(batch_size=1, dry_run=True, report=lambda *r: reported.append(r))
+        self.assertEqual((checked, drifted), (2, 2))
+        self.assertEqual(self.counters(self.post), (0, 0, 0))
+        self.assertIn((self.post.pk, (0, 0, 0), (1, 1, 2)), reported)
+
+        reconcile_counters(batch_size=1)
+        self.assertEqual(self.counters(self.post), (1, 1, 2))
+        self.assertEqual(self.counters(self.quiet), (0, 0, 0))
+        self.assertEqual(reconcile_counters(), (2, 0))
+
+    def test_migration_backfills_in_sql(self):
+        BlogsDetails.objects.filter(pk=self.quiet.pk).update(bd_bookmark_count=9)
+        # RunPython only uses the editor's connection
+        backfill_migration.backfill(None, SimpleNamespace(connection=connection))
+        self.assertEqual(self.counters(self.post), (1, 1, 2))
+        self.assertEqual(self.counters(self.quiet), (0, 0, 0))
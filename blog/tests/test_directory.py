@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.db import connection
+
+from blog.directory import directory_queryset, search_filter
+from blog.migrations import _indexes
+from blog.models import BlogsUsers
+
+from .base import BlogTestCase, login, make_user
+
+
+class DirectoryQueryTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        make_user("john@example.com", bu_first_name="John", bu_last_name="Smith")
+        make_user("joan@example.com", role="writer", bu_first_name="Joan", bu_last_name="Doe")
+        make_user("ann@example.com", role="admin", bu_first_name="Ann", bu_last_name="Johnson", bu_status="Inactive")
+
+    def emails(self, *args):
+        return sorted(directory_queryset(*args).values_list("bu_email", flat=True))
+
+    def test_prefix_search(self):
+        self.assertEqual(self.emails("jo"), ["ann@example.com", "joan@example.com", "john@example.com"])
+        self.assertEqual(self.emails("john smith"), ["john@example.com"])
+        self.assertEqual(self.emails("ann@"), ["ann@example.com"])
+        # not a substring match
+        self.assertEqual(self.emails("ohn"), [])
+
+    def test_empty_query_matches_everyone(self):
+        self.assertIsNone(search_filter("   "))
+        self.assertEqual(len(self.emails("")), 3)
+
+    def test_exact_role_and_status(self):
+        self.assertEqual(self.emails("", "writer"), ["joan@example.com"])
+        self.assertEqual(self.emails("", None, "Inactive"), ["ann@example.com"])
+        # unknown values are ignored rather than matching nothing
+        self.assertEqual(len(self.emails("", "owner", "Banned")), 3)
+
+    def test_rows_are_lean(self):
+        user = directory_queryset().first()
+        self.assertLessEqual({"bu_bio", "bu_password_hash"}, user.get_deferred_fields())
+
+
+class DirectoryPageTests(BlogTestCase):
+    def test_admin_pages_through_the_directory(self):
+        admin = make_user("admin@example.com", role="admin")
+        for i in range(4):
+            make_user(f"user{i}@example.com")
+        login(self.client, admin)
+
+        with mock.patch("blog.views.DIRECTORY_PER_PAGE", 3):
+            first = self.client.get("/y/users/")
+            self.assertEqual(first.status_code, 200)
+            second = self.client.get(f"/y/users/?{first.context['next_qs']}")
+        seen = [u.bu_user_id for u in first.context["users"]] + [u.bu_user_id for u in second.context["users"]]
+        self.assertEqual(seen, sorted(BlogsUsers.objects.values_list("bu_user_id", flat=True), reverse=True))
+
+    def test_viewers_are_turned_away(self):
+        login(self.client, make_user("viewer@example.com"))
+        self.assertEqual(self.client.get("/y/users/").status_code, 302)
+
+
+class UnmanagedIndexTests(BlogTestCase):
+    def schema_editor(self):
+        cursor = connection.cursor()
+        self.addCleanup(cursor.close)
+        return SimpleNamespace(connection=connection, execute=cursor.execute)
+
+    def index_names(self):
+        with connection.cursor() as cursor:
+            return set(connection.introspection.get_constraints(cursor, "blogs_users"))
+
+    def test_create_and_drop_skip_what_they_cannot_do(self):
+        indexes = (
+            ("blogs_users", "bu_test_idx", ("bu_role", "bu_email")),
+            ("blogs_users", "bu_missing_column_idx", ("bu_no_such_column",)),
+            ("blogs_no_such_table", "bu_missing_table_idx", ("bu_role",)),
+        )
+        editor = self.schema_editor()
+        _indexes.create_indexes(editor, indexes)
+        _indexes.create_indexes(editor, indexes)  # already there: skipped
+        names = self.index_names()
+        self.assertIn("bu_test_idx", names)
+        self.assertNotIn("bu_missing_column_idx", names)
+
+        _indexes.drop_indexes(editor, indexes)
+        _indexes.drop_indexes(editor, indexes)
+        self.assertNotIn("bu_test_idx", self.index_names())
@@ -0,0 +1,70 @@
+from blog.feed import bump_feed_generation, cached_feed, feed_generation, feed_validator, normalize_feed_params
+from blog.fragments import fragment_stats
+from blog.models import BlogsDetails
+from blog.search import index_blog
+
+from .base import BlogTestCase, BlogTransactionTestCase, login, make_post, make_user
+
+
+class CachedFeedTests(BlogTestCase):
+    def test_params_are_normalized(self):
+        self.assertEqual(normalize_feed_params("  Django   ORM ", " 3 "), ("django orm", "3"))
+        self.assertEqual(normalize_feed_params(None, "3; drop"), ("", ""))
+
+    def test_one_build_per_role_and_params(self):
+        builds = []
+
+        def build():
+            builds.append(1)
+            return {"n": len(builds)}
+
+        self.assertEqual(cached_feed("viewer", "", "", None, build), {"n": 1})
+        self.assertEqual(cached_feed("viewer", "", "", "", build), {"n": 1})
+        self.assertEqual(cached_feed("admin", "", "", None, build), {"n": 2})
+        self.assertEqual(cached_feed("viewer", "", "2", None, build), {"n": 3})
+
+    def test_bumping_the_generation_drops_every_entry(self):
+        builds = []
+        cached_feed("viewer", "", "", None, lambda: builds.append(1) or {})
+        validator = feed_validator()
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_feed_generation()
+        self.assertNotEqual(feed_validator(), validator)
+        cached_feed("viewer", "", "", None, lambda: builds.append(1) or {})
+        self.assertEqual(len(builds), 2)
+
+
+class HomeFeedTests(BlogTransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.writer = make_user("writer@example.com", role="writer")
+        make_post("first-post", bd_blog_title="First post")
+        login(self.client, make_user("viewer@example.com"))
+
+    def misses(self):
+        return fragment_stats.snapshot().get("home_feed", {}).get("misses", 0)
+
+    def test_repeat_visits_hit_the_cache(self):
+        misses = self.misses()
+        self.assertContains(self.client.get("/"), "First post")
+        self.assertContains(self.client.get("/?cursor="), "First post")
+        self.assertEqual(self.misses(), misses + 1)
+
+    def test_creating_a_post_refreshes_the_feed(self):
+        self.client.get("/")
+        generation = feed_generation()
+        login(self.client, self.writer)
+        response = self.client.post("/y/blog/new/", {
+            "title": "Second post", "content": "Body", "status": "Published",
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertNotEqual(feed_generation(), generation)
+        self.assertContains(self.client.get("/"), "Second post")
+        self.assertTrue(BlogsDetails.objects.filter(bd_slug="second-post").exists())
+
+    def test_equivalent_searches_share_an_entry(self):
+        index_blog(BlogsDetails.objects.get(bd_slug="first-post"))
+        misses = self.misses()
+        self.assertContains(self.client.get("/?q=First"), "First post")
+        self.assertContains(self.client.get("/?q=++first+"), "First post")
+        self.assertEqual(self.misses(), misses + 1)
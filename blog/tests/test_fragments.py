@@ -0,0 +1,77 @@
+from django.utils import timezone
+
+from blog.comments import create_comment, soft_delete_comment
+from blog.fragments import bump_comments_version, cached_fragment, comments_version, fragment_stats, get_version
+from blog.models import BlogsDetails
+
+from .base import BlogTestCase, BlogTransactionTestCase, login, make_post, make_user
+
+
+class FragmentCacheTests(BlogTestCase):
+    def test_render_runs_once_per_version(self):
+        calls = []
+
+        def render():
+            calls.append(1)
+            return f"<p>{len(calls)}</p>"
+
+        self.assertEqual(cached_fragment("t", (1, "v1"), render), "<p>1</p>")
+        self.assertEqual(cached_fragment("t", (1, "v1"), render), "<p>1</p>")
+        self.assertEqual(cached_fragment("t", (1, "v2"), render), "<p>2</p>")
+        self.assertEqual(len(calls), 2)
+
+    def test_versions_start_from_the_clock_and_move_after_commit(self):
+        post = make_post("versioned")
+        before = comments_version(post.pk)
+        self.assertEqual(get_version(f"blog:frag:comments-version:{post.pk}"), before)
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            bump_comments_version(post.pk)
+        self.assertEqual(comments_version(post.pk), before)
+        for callback in callbacks:
+            callback()
+        self.assertGreater(comments_version(post.pk), before)
+
+    def test_comment_changes_bump_the_thread_version(self):
+        post = make_post("discussed")
+        user = make_user("reader@example.com")
+        versions = [comments_version(post.pk)]
+        with self.captureOnCommitCallbacks(execute=True):
+            comment = create_comment(post, user.pk, "hello")
+        versions.append(comments_version(post.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            soft_delete_comment(comment)
+        versions.append(comments_version(post.pk))
+        self.assertEqual(versions, sorted(set(versions)))
+
+
+class DetailFragmentTests(BlogTransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = make_post("cached", bd_blog_content="<p>Original body</p>")
+        self.viewer = make_user("viewer@example.com")
+        login(self.client, self.viewer)
+
+    def stats(self, name):
+        return fragment_stats.snapshot().get(name, {"hits": 0, "misses": 0})
+
+    def test_second_view_is_served_from_the_fragments(self):
+        before = self.stats("blog_body")["hits"], self.stats("blog_comments")["hits"]
+        self.client.get("/y/blog/cached/")
+        response = self.client.get("/y/blog/cached/")
+        self.assertContains(response, "Original body")
+        self.assertEqual(
+            (self.stats("blog_body")["hits"], self.stats("blog_comments")["hits"]),
+            (before[0] + 1, before[1] + 1),
+        )
+
+    def test_edits_and_new_comments_show_up(self):
+        self.client.get("/y/blog/cached/")
+        BlogsDetails.objects.filter(pk=self.post.pk).update(
+            bd_blog_content="<p>Edited body</p>", bd_updated_at=timezone.now(),
+        )
+        create_comment(self.post, self.viewer.pk, "A brand new comment")
+
+        response = self.client.get("/y/blog/cached/")
+        self.assertContains(response, "Edited body")
+        self.assertContains(response, "A brand new comment")
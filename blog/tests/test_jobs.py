@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+from django.core import mail
+from django.utils import timezone
+
+from blog import jobs
+from blog.mail import queue_mail
+from blog.models import BlogsJobs, PasswordResetToken
+
+from .base import BlogTestCase, make_user
+
+_failures = {}  # payload "n" -> remaining failures of the "test-flaky" job
+
+
+@jobs.job("test-flaky", batch_size=3)
+def _flaky(payloads):
+    errors = []
+    for payload in payloads:
+        left = _failures.get(payload["n"], 0)
+        _failures[payload["n"]] = left - 1
+        errors.append("boom" if left > 0 else None)
+    return errors
+
+
+class JobQueueTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        _failures.clear()
+
+    def test_claim_takes_one_kind_by_priority_up_to_batch_size(self):
+        low = [jobs.enqueue("test-flaky", {"n": i}) for i in range(4)]
+        high = jobs.enqueue("test-flaky", {"n": 9}, priority=5)
+
+        claimed = jobs.claim("worker-a")
+        self.assertEqual([j.pk for j in claimed], [high] + low[:2])
+        self.assertTrue(all(j.bj_status == "running" and j.bj_attempts == 1 for j in claimed))
+        # a second worker only gets what is left
+        self.assertEqual([j.pk for j in jobs.claim("worker-b")], low[2:])
+        self.assertEqual(jobs.claim("worker-c"), [])
+
+    def test_delayed_jobs_wait(self):
+        jobs.enqueue("test-flaky", {"n": 1}, delay=60)
+        self.assertEqual(jobs.claim("worker"), [])
+
+    def test_failed_job_is_retried_with_backoff_then_fails(self):
+        _failures[1] = 10
+        job_id = jobs.enqueue("test-flaky", {"n": 1}, max_attempts=2)
+
+        self.assertEqual(jobs.run_batch(jobs.claim("worker")), 0)
+        job = BlogsJobs.objects.get(pk=job_id)
+        self.assertEqual((job.bj_status, job.bj_attempts, job.bj_last_error), ("queued", 1, "boom"))
+        self.assertGreater(job.bj_run_at, timezone.now())
+
+        BlogsJobs.objects.filter(pk=job_id).update(bj_run_at=timezone.now())
+        jobs.run_batch(jobs.claim("worker"))
+        job = BlogsJobs.objects.get(pk=job_id)
+        self.assertEqual((job.bj_status, job.bj_attempts), ("failed", 2))
+        self.assertIsNotNone(job.bj_finished_at)
+
+    def test_partial_batch_failure(self):
+        _failures[2] = 1
+        ids = [jobs.enqueue("test-flaky", {"n": n}) for n in (1, 2, 3)]
+        self.assertEqual(jobs.run_batch(jobs.claim("worker")), 2)
+        statuses = dict(BlogsJobs.objects.filter(pk__in=ids).values_list("pk", "bj_status"))
+        self.assertEqual([statuses[i] for i in ids], ["done", "queued", "done"])
+
+    def test_backoff_doubles_within_jitter(self):
+        for attempts in (1, 2, 3):
+            seconds = jobs.backoff(attempts)
+            full = jobs.BACKOFF * 2 ** (attempts - 1)
+            self.assertTrue(full / 2 <= seconds <= full)
+
+    def test_dedup_key_returns_the_pending_job(self):
+        first = jobs.enqueue("test-flaky", {"n": 1}, dedup_key="same")
+        self.assertEqual(jobs.enqueue("test-flaky", {"n": 2}, dedup_key="same"), first)
+        jobs.run_pending(["test-flaky"])
+        # finished jobs free their key
+        self.assertNotEqual(jobs.enqueue("test-flaky", {"n": 3}, dedup_key="same"), first)
+
+    def test_stale_running_job_is_claimed_again(self):
+        job_id = jobs.enqueue("test-flaky", {"n": 1})
+        jobs.claim("dead-worker")
+        self.assertEqual(jobs.claim("worker"), [])
+
+        stale = timezone.now() - timedelta(seconds=jobs.LOCK_TIMEOUT + 1)
+        BlogsJobs.objects.filter(pk=job_id).update(bj_locked_at=stale)
+        claimed = jobs.claim("worker")
+        self.assertEqual([(j.pk, j.bj_attempts) for j in claimed], [(job_id, 2)])
+        # the dead worker's late result does not touch the job it lost
+        dead = BlogsJobs(pk=job_id, bj_kind="test-flaky", bj_payload={"n": 1},
+                        bj_locked_by="dead-worker:gone", bj_attempts=1)
+        jobs.run_batch([dead])
+        self.assertEqual(BlogsJobs.objects.get(pk=job_id).bj_status, "running")
+
+    def test_unknown_kind_is_rejected(self):
+        with self.assertRaises(ValueError):
+            jobs.enqueue("no-such-kind", {})
+
+    def test_queued_mail_is_sent_by_the_worker(self):
+        queue_mail("Hello", "Body", ["someone@example.com"])
+
+
+class PasswordResetMailTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user("reader@example.com")
+
+    def request_reset(self):
+        self.client.post("/y/forgot-password/", {"email": "reader@example.com"})
+
+    def test_each_request_mails_its_own_link(self):
+        self.request_reset()
+        self.request_reset()
+        tokens = list(PasswordResetToken.objects.filter(prt_user=self.user).values_list("prt_token", flat=True))
+        self.assertEqual(len(tokens), 2)
+
+        self.assertEqual(jobs.run_pending(["email"]), 2)
+        bodies = [m.body for m in mail.outbox]
+        for token in tokens:
+            self.assertTrue(any(token in body for body in bodies), token)
+
+    def test_unknown_email_queues_nothing(self):
+        self.client.post("/y/forgot-password/", {"email": "nobody@example.com"})
+        self.assertFalse(BlogsJobs.objects.exists())
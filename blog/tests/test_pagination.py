@@ -0,0 +1,84 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+
+from blog.feed import FEED_KEYS
+from blog.models import BlogsDetails
+from blog.pagination import KeysetPaginator
+
+from .base import BlogTestCase, login, make_post, make_user
+
+
+class KeysetPaginatorTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        base = timezone.now().replace(microsecond=0)
+        # ties on both timestamps and unpublished (NULL) rows, which sort last
+        for i in range(11):
+            make_post(
+                f"post-{i}",
+                bd_published_at=None if i % 4 == 0 else base - timedelta(hours=i // 3),
+                bd_updated_at=base - timedelta(minutes=i % 2),
+            )
+        rows = list(BlogsDetails.objects.values(*FEED_KEYS))
+        rows.sort(key=lambda r: (r["bd_published_at"] is not None, r["bd_published_at"] or base,
+                                 r["bd_updated_at"], r["bd_blog_id"]), reverse=True)
+        self.expected = [r["bd_blog_id"] for r in rows]
+        self.paginator = KeysetPaginator(BlogsDetails.objects.all(), FEED_KEYS, 3)
+
+    def walk_forward(self):
+        pages, page = [], self.paginator.page()
+        while True:
+            pages.append(page)
+            if not page.has_next():
+                return pages
+            page = self.paginator.page(page.next_token)
+
+    def test_forward_walk_visits_every_row_once_in_order(self):
+        pages = self.walk_forward()
+        self.assertEqual([b.bd_blog_id for p in pages for b in p], self.expected)
+        self.assertEqual([len(p) for p in pages], [3, 3, 3, 2])
+        self.assertFalse(pages[0].has_previous())
+
+    def test_previous_tokens_return_the_same_pages(self):
+        pages = self.walk_forward()
+        page = pages[-1]
+        for expected in reversed(pages[:-1]):
+            page = self.paginator.page(page.prev_token)
+            self.assertEqual([b.bd_blog_id for b in page], [b.bd_blog_id for b in expected])
+        self.assertFalse(page.has_previous())
+
+    def test_bad_token_falls_back_to_first_page(self):
+        first = [b.bd_blog_id for b in self.paginator.page()]
+        tampered = self.paginator.page().next_token[:-2] + "xx"
+        self.assertEqual([b.bd_blog_id for b in self.paginator.page(tampered)], first)
+        other = KeysetPaginator(BlogsDetails.objects.all(), FEED_KEYS, 3, salt="elsewhere")
+        self.assertEqual([b.bd_blog_id for b in other.page(self.paginator.page().next_token)], first)
+
+    def test_each_page_is_one_query(self):
+        token = self.paginator.page().next_token
+        with self.assertNumQueries(1):
+            list(self.paginator.page(token))
+
+
+class DashboardPagingTests(BlogTestCase):
+    def test_writer_pages_through_own_drafts(self):
+        writer = make_user("writer@example.com", role="writer")
+        other = make_user("other@example.com", role="writer")
+        now = timezone.now()
+        mine = [
+            make_post(f"draft-{i}", status="Draft", bd_user_id=writer.pk, bd_updated_at=now - timedelta(minutes=i)).pk
+            for i in range(5)
+        ]
+        make_post("not-mine", status="Draft", bd_user_id=other.pk)
+        login(self.client, writer)
+
+        seen, url = [], "/y/dashboard/"
+        with mock.patch("blog.views.KeysetPaginator", lambda qs, keys, _: KeysetPaginator(qs, keys, 2)):
+            while url:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                seen += [b.bd_blog_id for b in response.context["drafts"]]
+                url = response.context["next_qs"] and f"/y/dashboard/?{response.context['next_qs']}"
+        self.assertEqual(seen, mine)
@@ -0,0 +1,163 @@
+import asyncio
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, check_password, make_password
+from django.test import override_settings
+
+from blog.models import BlogsUsers
+from blog.passwords import (
+    HashingBusy, PasswordHasherPool, ahash_password, averify_password, hash_password, verify_password,
+)
+
+from .base import BlogTestCase, make_user
+
+
+class FastPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = 1
+
+
+# stored hashes use MD5 (settings_test), the preferred hasher is newer
+UPGRADE_HASHERS = [
+    "blog.tests.test_passwords.FastPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.MD5PasswordHasher",
+]
+
+
+def _square(n):
+    return n * n
+
+
+class PasswordHashingTests(BlogTestCase):
+    def test_round_trip(self):
+        encoded = hash_password("s3cret")
+        self.assertEqual(verify_password("s3cret", encoded), (True, None))
+        self.assertEqual(verify_password("wrong", encoded), (False, None))
+
+    def test_async_round_trip(self):
+        encoded = asyncio.run(ahash_password("s3cret"))
+        self.assertEqual(asyncio.run(averify_password("s3cret", encoded)), (True, None))
+        self.assertEqual(asyncio.run(averify_password("wrong", encoded)), (False, None))
+
+    def test_old_hash_is_upgraded(self):
+        old = make_password("s3cret")
+        with override_settings(PASSWORD_HASHERS=UPGRADE_HASHERS):
+            ok, upgraded = verify_password("s3cret", old)
+            self.assertTrue(ok)
+            self.assertTrue(upgraded.startswith("pbkdf2_sha256$1$"))
+            self.assertTrue(check_password("s3cret", upgraded))
+
+            # no upgrade for a wrong password
+            self.assertEqual(verify_password("wrong", old), (False, None))
+
+
+class PasswordHasherPoolTests(BlogTestCase):
+    def pool(self, **kwargs):
+        options = {"workers": 1, "max_pending": 2, "wait": 0, "timeout": 0.05, **kwargs}
+        return PasswordHasherPool(**options)
+
+    def with_executor(self, pool, future):
+        executor = mock.Mock()
+        executor.submit.return_value = future
+        pool._get_executor = mock.Mock(return_value=executor)
+        return executor
+
+    def test_inline_pool_sheds_when_saturated(self):
+        pool = self.pool(workers=0, max_pending=1)
+        pool._slots.acquire()
+        with self.assertRaises(HashingBusy):
+            pool.run(_square, 3)
+        with self.assertRaises(HashingBusy):
+            asyncio.run(pool.arun(_square, 3))
+
+        pool._slots.release()
+        self.assertEqual(pool.run(_square, 3), 9)
+        self.assertEqual(asyncio.run(pool.arun(_square, 4)), 16)
+
+    def test_result_from_the_pool(self):
+        pool = self.pool()
+        future = Future()
+        future.set_result(9)
+        self.with_executor(pool, future)
+        self.assertEqual(pool.run(_square, 3), 9)
+        self.assertEqual(asyncio.run(pool.arun(_square, 3)), 9)
+
+    def test_slow_hash_is_busy_and_keeps_its_slot(self):
+        for run in (lambda p: p.run(_square, 3), lambda p: asyncio.run(p.arun(_square, 3))):
+            pool = self.pool(max_pending=1)
+            future = Future()
+            self.with_executor(pool, future)
+            with self.assertRaises(HashingBusy):
+                run(pool)
+            self.assertFalse(future.cancelled())
+
+            # still hashing: the next request is shed
+            with self.assertRaises(HashingBusy):
+                run(pool)
+
+            future.set_result(9)
+            self.assertTrue(pool._slots.acquire(blocking=False))
+
+    def test_dead_worker_is_busy_and_resets_the_pool(self):
+        for run in (lambda p: p.run(_square, 3), lambda p: asyncio.run(p.arun(_square, 3))):
+            pool = self.pool()
+            future = Future()
+            future.set_exception(BrokenProcessPool("worker died"))
+            executor = self.with_executor(pool, future)
+            pool._executor = executor
+            with self.assertRaises(HashingBusy):
+                run(pool)
+            self.assertIsNone(pool._executor)
+            executor.shutdown.assert_called_once()
+
+    def test_pool_that_cannot_restart_releases_the_slot(self):
+        pool = self.pool(max_pending=1)
+        executor = self.with_executor(pool, None)
+        executor.submit.side_effect = BrokenProcessPool("no workers")
+        with self.assertRaises(HashingBusy):
+            asyncio.run(pool.arun(_square, 3))
+        self.assertTrue(pool._slots.acquire(blocking=False))
+
+
+class LoginTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user("reader@example.com", bu_password_hash=make_password("s3cret"))
+
+    def test_login_sets_the_session(self):
+        response = self.client.post("/y/login/", {"email": "reader@example.com", "password": "s3cret"})
+        self.assertRedirects(response, "/", fetch_redirect_response=False)
+        self.assertEqual(self.client.session["user_id"], self.user.bu_user_id)
+        self.assertEqual(self.client.session["user_role"], "viewer")
+        self.assertIsNotNone(BlogsUsers.objects.get(pk=self.user.pk).bu_last_login)
+
+    def test_wrong_password(self):
+        response = self.client.post(
+            "/y/login/", {"email": "reader@example.com", "password": "nope"}, follow=True,
+        )
+        self.assertRedirects(response, "/y/login/")
+        self.assertContains(response, "Invalid email or password")
+        self.assertNotIn("user_id", self.client.session)
+
+    def test_login_stores_the_upgraded_hash(self):
+        with override_settings(PASSWORD_HASHERS=UPGRADE_HASHERS):
+            self.client.post("/y/login/", {"email": "reader@example.com", "password": "s3cret"})
+        self.assertTrue(BlogsUsers.objects.get(pk=self.user.pk).bu_password_hash.startswith("pbkdf2_sha256$1$"))
+
+    def test_saturated_hasher_answers_503(self):
+        with mock.patch("blog.views.averify_password", side_effect=HashingBusy):
+            response = self.client.post("/y/login/", {"email": "reader@example.com", "password": "s3cret"})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "5")
+        self.assertNotIn("user_id", self.client.session)
+
+    def test_register_hashes_and_logs_in(self):
+        response = self.client.post("/y/register/", {
+            "name": "New Reader", "email": "new@example.com",
+            "password": "s3cret", "confirm_password": "s3cret",
+        })
+        self.assertRedirects(response, "/", fetch_redirect_response=False)
+        user = BlogsUsers.objects.get(bu_email="new@example.com")
+        self.assertTrue(check_password("s3cret", user.bu_password_hash))
+        self.assertEqual(self.client.session["user_id"], user.bu_user_id)
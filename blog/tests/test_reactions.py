@@ -0,0 +1,48 @@
+from blog.models import BlogsDetails, BlogsLikes
+from blog.reactions import toggle
+
+from .base import BlogTestCase, login, make_post, make_user
+
+
+class ToggleTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.viewer = make_user("viewer@example.com")
+        self.post = make_post("published")
+
+    def test_like_and_unlike(self):
+        on = toggle("like", self.post.pk, self.viewer.pk)
+        self.assertEqual((on.active, on.count, on.slug), (True, 1, "published"))
+        off = toggle("like", self.post.pk, self.viewer.pk)
+        self.assertEqual((off.active, off.count), (False, 0))
+        self.assertFalse(BlogsLikes.objects.exists())
+
+    def test_bookmark_counts_per_user(self):
+        other = make_user("other@example.com")
+        toggle("bookmark", self.post.pk, self.viewer.pk)
+        self.assertEqual(toggle("bookmark", self.post.pk, other.pk).count, 2)
+        self.assertEqual(BlogsDetails.objects.get(pk=self.post.pk).bd_bookmark_count, 2)
+
+    def test_unpublished_or_missing_post_keeps_existing_reactions(self):
+        draft = make_post("draft", status="Draft", bd_like_count=1)
+        BlogsLikes.objects.create(bl_blog=draft, bl_user=self.viewer)
+
+        self.assertIsNone(toggle("like", draft.pk, self.viewer.pk))
+        self.assertIsNone(toggle("like", 999999, self.viewer.pk))
+        self.assertTrue(BlogsLikes.objects.filter(bl_blog=draft, bl_user=self.viewer).exists())
+        self.assertEqual(BlogsDetails.objects.get(pk=draft.pk).bd_like_count, 1)
+
+    def test_json_endpoint(self):
+        login(self.client, self.viewer)
+        url = f"/y/blog/{self.post.pk}/like/"
+        response = self.client.post(url, HTTP_ACCEPT="application/json")
+        self.assertEqual(response.json(), {"active": True, "count": 1})
+
+        draft = make_post("draft", status="Draft")
+        response = self.client.post(f"/y/blog/{draft.pk}/like/", HTTP_ACCEPT="application/json")
+        self.assertEqual(response.status_code, 409)
+
+        writer = make_user("writer@example.com", role="writer")
+        login(self.client, writer)
+        self.assertEqual(self.client.post(url, HTTP_ACCEPT="application/json").status_code, 403)
+
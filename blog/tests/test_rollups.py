@@ -0,0 +1,77 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import BlogsViewRollups, BlogsViewStats
+from blog.rollups import ROLLUP_LOOKBACK_DAYS, SCOPE_ALL, period_start, resume_day, rollup_views, user_scope, views_chart
+
+from .base import BlogTestCase, make_post, make_user
+
+
+class RollupTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.localdate()
+        self.writer = make_user("writer@example.com", role="writer")
+        self.post = make_post("mine", bd_user_id=self.writer.pk)
+        self.anonymous = make_post("nobodys")
+
+    def record(self, post, days_ago, views):
+        BlogsViewStats.objects.create(bvs_blog=post, bvs_day=self.today - timedelta(days=days_ago), bvs_views=views)
+
+    def rollup(self, scope, period):
+        return dict(
+            BlogsViewRollups.objects.filter(bvr_scope=scope, bvr_period=period).values_list("bvr_start", "bvr_views")
+        )
+
+    def test_days_weeks_and_months_per_scope(self):
+        self.record(self.post, 0, 3)
+        self.record(self.anonymous, 0, 2)
+        self.record(self.post, 1, 4)
+        rollup_views()
+
+        yesterday = self.today - timedelta(days=1)
+        self.assertEqual(self.rollup(SCOPE_ALL, "day"), {self.today: 5, yesterday: 4})
+        self.assertEqual(self.rollup(user_scope(self.writer.pk), "day"), {self.today: 3, yesterday: 4})
+        weeks = self.rollup(SCOPE_ALL, "week")
+        self.assertEqual(sum(weeks.values()), 9)
+        self.assertIn(period_start(self.today, "week"), weeks)
+        self.assertEqual(sum(self.rollup(SCOPE_ALL, "month").values()), 9)
+
+    def test_rerunning_replaces_instead_of_adding(self):
+        self.record(self.post, 0, 3)
+        rollup_views()
+        BlogsViewStats.objects.filter(bvs_blog=self.post).update(bvs_views=7)
+        rollup_views()
+        self.assertEqual(self.rollup(SCOPE_ALL, "day"), {self.today: 7})
+
+    def test_first_run_rolls_up_everything_recorded(self):
+        self.record(self.post, 40, 1)
+        self.assertEqual(resume_day(self.today), self.today - timedelta(days=40))
+        rollup_views()
+        self.assertEqual(self.rollup(SCOPE_ALL, "day"), {self.today - timedelta(days=40): 1})
+
+    def test_missed_days_are_caught_up(self):
+        self.record(self.post, 10, 1)
+        rollup_views()
+        # no rollup ran while these came in
+        self.record(self.post, 6, 2)
+        self.record(self.post, 5, 3)
+        self.assertEqual(resume_day(self.today), self.today - timedelta(days=6))
+        rollup_views()
+        self.assertEqual(sum(self.rollup(SCOPE_ALL, "day").values()), 6)
+        # caught up: back to the usual lookback
+        self.assertEqual(resume_day(self.today), self.today - timedelta(days=ROLLUP_LOOKBACK_DAYS))
+
+    def test_chart_fills_empty_periods(self):
+        self.record(self.post, 2, 4)
+        call_command("rollup_views", stdout=StringIO())
+
+        chart = views_chart(SCOPE_ALL, 7)
+        self.assertEqual(len(chart), 7)
+        self.assertEqual(chart[-1]["day"], self.today)
+        self.assertEqual([row["views"] for row in chart], [0, 0, 0, 0, 4, 0, 0])
+        self.assertEqual(sum(row["views"] for row in views_chart(user_scope(self.writer.pk), 90)), 4)
+        self.assertEqual(views_chart(user_scope(999), 30)[-1]["views"], 0)
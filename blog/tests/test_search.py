@@ -0,0 +1,74 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import BlogsDetails, BlogsSearchDocs, BlogsSearchTerms
+from blog.search import corpus_stats, index_blog, match_filter, rank, tokenize, unindex_blog
+
+from .base import BlogTestCase, make_post
+
+
+class SearchTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.title_hit = make_post("django-tips", bd_blog_title="Django tips",
+                                   bd_blog_content="Notes on caching.")
+        self.body_hit = make_post("misc", bd_blog_title="Misc",
+                                  bd_blog_content="A django post about caching and queries.")
+        self.other = make_post("flask", bd_blog_title="Flask", bd_blog_content="Routing in flask.")
+        for post in (self.title_hit, self.body_hit, self.other):
+            index_blog(post)
+        self.published = BlogsDetails.objects.filter(bd_blog_status="Published")
+
+    def test_tokenize_lowercases_and_drops_stopwords(self):
+        self.assertEqual(tokenize("The Django ORM, and SQL_joins"), ["django", "orm", "sql", "joins"])
+
+    def test_title_hits_rank_first(self):
+        self.assertEqual(rank("django", self.published), [self.title_hit.pk, self.body_hit.pk])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(rank("django queries", self.published), [self.body_hit.pk])
+        self.assertEqual(rank("django routing", self.published), [])
+        self.assertEqual(rank("the and", self.published), [])
+
+    def test_long_words_match_as_prefix_short_ones_exactly(self):
+        self.assertEqual(rank("djan", self.published), [self.title_hit.pk, self.body_hit.pk])
+        go = make_post("go", bd_blog_title="Go", bd_blog_content="Go basics.")
+        gopher = make_post("gopher", bd_blog_title="Gopher", bd_blog_content="The mascot.")
+        index_blog(go)
+        index_blog(gopher)
+        self.assertEqual(rank("go", self.published), [go.pk])
+
+    def test_caller_filters_are_kept(self):
+        BlogsDetails.objects.filter(pk=self.title_hit.pk).update(bd_blog_status="Draft")
+        self.assertEqual(rank("django", self.published), [self.body_hit.pk])
+
+    def test_prefix_lookup_is_a_range_not_like(self):
+        with CaptureQueriesContext(connection) as ctx:
+            rank("djan caching", self.published)
+            list(self.published.filter(match_filter("djan caching")))
+        sql = " ".join(q["sql"] for q in ctx.captured_queries)
+        self.assertNotIn(" LIKE ", sql.upper())
+
+    def test_match_filter_agrees_with_rank(self):
+        for q in ("django", "djan caching", "django routing", "flask"):
+            matched = set(self.published.filter(match_filter(q)).values_list("pk", flat=True))
+            self.assertEqual(matched, set(rank(q, self.published)), q)
+        self.assertIsNone(match_filter("the"))
+
+    def test_reindex_and_soft_delete(self):
+        self.other.bd_blog_content = "Now about django."
+        index_blog(self.other)
+        self.assertIn(self.other.pk, rank("django", self.published))
+
+        self.other.bd_is_deleted = 1
+        index_blog(self.other)
+        self.assertFalse(BlogsSearchTerms.objects.filter(bst_blog=self.other).exists())
+        unindex_blog(self.body_hit.pk)
+        self.assertFalse(BlogsSearchDocs.objects.filter(bsd_blog=self.body_hit).exists())
+        self.assertEqual(rank("django", self.published), [self.title_hit.pk])
+
+    def test_corpus_stats_are_cached(self):
+        n_docs, _ = corpus_stats()
+        self.assertEqual(n_docs, 3)
+        with self.assertNumQueries(0):
+            corpus_stats()
@@ -0,0 +1,35 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+
+from blog.models import BlogsComments, BlogsDetails, BlogsUsers
+
+from .base import BlogTransactionTestCase, make_post
+
+SMALL = dict(
+    posts=20, comments=60, likes=30, bookmarks=10, writers=2, viewers=5, categories=3, view_posts=2,
+    processes=1, stdout=StringIO(),
+)
+
+
+class SeedBlogTests(BlogTransactionTestCase):
+    # seed_blog runs migrate and the schema editor, which cannot run inside a TestCase transaction
+    @override_settings(BLOG_SEEDING_ALLOWED=False)
+    def test_refuses_a_database_not_marked_as_throwaway(self):
+        with self.assertRaisesMessage(CommandError, "Refusing to migrate and seed"):
+            call_command("seed_blog", **SMALL)
+        self.assertFalse(BlogsDetails.objects.exists())
+
+    def test_refuses_to_add_to_existing_posts_without_append(self):
+        make_post("real-post")
+        with self.assertRaisesMessage(CommandError, "--append"):
+            call_command("seed_blog", **SMALL)
+
+    def test_seeds_deterministic_rows(self):
+        call_command("seed_blog", **SMALL)
+        self.assertEqual(BlogsDetails.objects.count(), 20)
+        self.assertEqual(BlogsUsers.objects.filter(bu_role="writer").count(), 2)
+        comments = list(BlogsComments.objects.order_by("pk").values_list("bc_path", "bc_depth"))
+        self.assertTrue(comments)
+        self.assertTrue(all(len(path) == 6 * (depth + 1) for path, depth in comments))
@@ -0,0 +1,63 @@
+from unittest import mock
+
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import BlogsDetails
+from blog.slugs import SUFFIX_ROOM, allocate_slug, create_with_unique_slug
+
+from .base import BlogTestCase, make_post
+
+
+class SlugTests(BlogTestCase):
+    def allocate(self, base):
+        return allocate_slug(BlogsDetails, "bd_slug", base)
+
+    def test_free_base_is_used_as_is(self):
+        self.assertEqual(self.allocate("hello"), "hello")
+
+    def test_next_free_suffix(self):
+        for slug in ("hello", "hello-2", "hello-4"):
+            make_post(slug)
+        self.assertEqual(self.allocate("hello"), "hello-3")
+
+    def test_similar_slugs_do_not_count(self):
+        for slug in ("hello-world", "helloween", "hello-2-you"):
+            make_post(slug)
+        self.assertEqual(self.allocate("hello"), "hello")
+        make_post("hello")
+        self.assertEqual(self.allocate("hello"), "hello-2")
+
+    def test_long_bases_leave_room_for_the_suffix(self):
+        slug = self.allocate("x" * 400)
+        self.assertEqual(len(slug), 255 - SUFFIX_ROOM)
+
+    def test_one_indexed_query(self):
+        make_post("hello")
+        with CaptureQueriesContext(connection) as ctx:
+            self.allocate("hello")
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertNotIn(" LIKE ", ctx.captured_queries[0]["sql"].upper())
+
+    def test_create_retries_when_the_slug_is_taken_meanwhile(self):
+        attempts = []
+
+        def allocate_then_lose_the_race(model, field, base):
+            slug = allocate_slug(model, field, base)
+            if not attempts:
+                # another request takes the slug between allocation and insert
+                make_post(slug)
+            attempts.append(slug)
+            return slug
+
+        with mock.patch("blog.slugs.allocate_slug", allocate_then_lose_the_race):
+            post = create_with_unique_slug(BlogsDetails, "bd_slug", "race", make_post)
+        self.assertEqual(attempts, ["race", "race-2"])
+        self.assertEqual(post.bd_slug, "race-2")
+
+    def test_other_integrity_errors_are_raised(self):
+        def insert(slug):
+            raise IntegrityError("something else")
+
+        with self.assertRaises(IntegrityError):
+            create_with_unique_slug(BlogsDetails, "bd_slug", "broken", insert)
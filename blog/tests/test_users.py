@@ -0,0 +1,70 @@
+from django.test import RequestFactory
+
+from blog.models import BlogsUsers
+from blog.users import CurrentUserMiddleware, UserCache, invalidate_user, user_cache
+
+from .base import BlogTestCase, login, make_user
+
+
+class UserCacheTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.users = UserCache(size=2, ttl=60)
+        self.user = make_user("reader@example.com")
+
+    def test_row_is_loaded_once(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.users.get(self.user.pk), self.user)
+            self.assertEqual(self.users.get(self.user.pk), self.user)
+
+    def test_no_user(self):
+        with self.assertNumQueries(1):
+            self.assertIsNone(self.users.get(None))
+            self.assertIsNone(self.users.get(self.user.pk + 100))
+            self.assertIsNone(self.users.get(self.user.pk + 100))
+
+    def test_entries_expire(self):
+        users = UserCache(size=2, ttl=0)
+        with self.assertNumQueries(2):
+            users.get(self.user.pk)
+            users.get(self.user.pk)
+
+    def test_least_recently_used_entry_is_dropped(self):
+        others = [make_user(f"other{i}@example.com") for i in range(2)]
+        self.users.get(self.user.pk)
+        for other in others:
+            self.users.get(other.pk)
+        with self.assertNumQueries(1):
+            self.users.get(others[1].pk)
+            self.users.get(self.user.pk)
+
+    def test_a_version_bump_reloads_the_row(self):
+        self.users.get(self.user.pk)
+        BlogsUsers.objects.filter(pk=self.user.pk).update(bu_first_name="Renamed")
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_user(self.user.pk)
+        self.assertEqual(self.users.get(self.user.pk).bu_first_name, "Renamed")
+
+
+class CurrentUserTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user("reader@example.com")
+        user_cache.forget(self.user.pk)
+
+    def test_current_user_is_lazy(self):
+        request = RequestFactory().get("/")
+        request.session = {"user_id": self.user.pk}
+        middleware = CurrentUserMiddleware(lambda r: r)
+        with self.assertNumQueries(0):
+            middleware(request)
+        with self.assertNumQueries(1):
+            self.assertEqual(request.current_user.bu_email, "reader@example.com")
+
+    def test_profile_edit_is_seen_on_the_next_page(self):
+        login(self.client, self.user)
+        self.assertContains(self.client.get("/y/profile/"), "reader")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/y/profile/edit/", {"first_name": "Renamed", "last_name": "Reader"})
+        self.assertContains(self.client.get("/y/profile/"), "Renamed")
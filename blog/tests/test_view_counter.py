@@ -0,0 +1,72 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+
+from blog.counters import ViewCounter
+from blog.models import BlogsDetails, BlogsViewStats
+
+from .base import BlogTestCase, make_post
+
+
+class ViewCounterTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.counter = ViewCounter(interval=60, max_pending=3)
+        self.post = make_post("read", bd_views=10)
+        self.other = make_post("also-read")
+
+    def views(self, post):
+        return BlogsDetails.objects.get(pk=post.pk).bd_views
+
+    def test_views_are_buffered_until_flushed(self):
+        with self.assertNumQueries(0):
+            self.counter.incr(self.post.pk)
+            self.counter.incr(self.post.pk)
+        self.assertEqual(self.counter.pending(self.post.pk), 2)
+        self.assertEqual(self.views(self.post), 10)
+
+        self.assertEqual(self.counter.flush(), 2)
+        self.assertEqual(self.views(self.post), 12)
+        self.assertEqual(self.counter.pending(self.post.pk), 0)
+        self.assertEqual(self.counter.flush(), 0)
+
+    def test_flush_adds_to_per_day_stats(self):
+        today = timezone.localdate()
+        yesterday = today - timedelta(days=1)
+        self.counter.incr(self.post.pk, day=yesterday)
+        self.counter.incr(self.post.pk, 2)
+        self.counter.incr(self.other.pk)
+        self.counter.flush()
+        self.counter.incr(self.post.pk)
+        self.counter.flush()
+
+        stats = dict(BlogsViewStats.objects.filter(bvs_blog=self.post).values_list("bvs_day", "bvs_views"))
+        self.assertEqual(stats, {yesterday: 1, today: 3})
+        self.assertEqual(self.views(self.post), 14)
+        self.assertEqual(self.views(self.other), 1)
+
+    def test_due_after_interval_or_when_buffer_is_full(self):
+        self.assertFalse(self.counter.is_due())
+        self.counter.incr(self.post.pk)
+        self.assertFalse(self.counter.is_due())
+        with mock.patch("blog.counters.time.monotonic", return_value=self.counter._last_flush + 61):
+            self.assertTrue(self.counter.is_due())
+
+        self.counter.incr(self.other.pk)
+        self.counter.incr(make_post("third").pk)
+        self.assertTrue(self.counter.is_due())
+        self.counter.maybe_flush()
+        self.assertFalse(self.counter.is_due())
+
+    def test_failed_flush_keeps_the_views(self):
+        self.counter.incr(self.post.pk, 5)
+        with mock.patch.object(ViewCounter, "_write_daily", side_effect=RuntimeError("db down")):
+            with self.assertRaises(RuntimeError):
+                self.counter.flush()
+        self.assertEqual(self.views(self.post), 10)
+        self.assertEqual(self.counter.pending(self.post.pk), 5)
+
+        self.counter.flush()
+        self.assertEqual(self.views(self.post), 15)
+        self.assertEqual(BlogsViewStats.objects.get(bvs_blog=self.post).bvs_views, 5)
@@ -0,0 +1,65 @@
+from datetime import date
+from unittest import mock
+
+from django.test import override_settings
+
+from blog.checks import check_viewed_cache
+from blog.counters import view_counter
+from blog.viewed import BITS, _add, mark_viewed
+
+from .base import BlogTestCase, BlogTransactionTestCase, login, make_post, make_user
+
+
+class MarkViewedTests(BlogTestCase):
+    def test_first_view_of_the_day_counts(self):
+        self.assertTrue(mark_viewed(1, 10))
+        self.assertFalse(mark_viewed(1, 10))
+        self.assertTrue(mark_viewed(1, 11))
+        self.assertTrue(mark_viewed(2, 10))
+
+    def test_a_new_day_starts_a_new_filter(self):
+        with mock.patch("blog.viewed.timezone.localdate", return_value=date(2024, 5, 1)):
+            self.assertTrue(mark_viewed(1, 10))
+            self.assertFalse(mark_viewed(1, 10))
+        with mock.patch("blog.viewed.timezone.localdate", return_value=date(2024, 5, 2)):
+            self.assertTrue(mark_viewed(1, 10))
+
+    def test_filter_size_is_fixed(self):
+        bits = None
+        for blog_id in range(2000):
+            bits, _ = _add(bits, blog_id, date(2024, 5, 1))
+        self.assertEqual(len(bits), BITS // 8)
+
+
+class ViewedCacheCheckTests(BlogTestCase):
+    def test_per_process_cache_is_a_warning(self):
+        self.assertEqual([m.id for m in check_viewed_cache(None)], ["blog.W001"])
+        self.assertFalse(check_viewed_cache(None)[0].is_serious())
+
+    @override_settings(BLOG_VIEWED_REQUIRE_SHARED=True)
+    def test_per_process_cache_is_an_error_when_shared_is_required(self):
+        self.assertEqual([m.id for m in check_viewed_cache(None)], ["blog.E002"])
+
+    def test_shared_cache_passes(self):
+        with mock.patch("blog.viewed.is_shared", return_value=True):
+            self.assertEqual(check_viewed_cache(None), [])
+
+    def test_missing_alias_is_an_error(self):
+        with mock.patch("blog.viewed.CACHE_ALIAS", "missing"):
+            self.assertEqual([m.id for m in check_viewed_cache(None)], ["blog.E001"])
+
+
+class DetailViewCountTests(BlogTransactionTestCase):
+    def test_a_reader_is_counted_once_a_day(self):
+        post = make_post("read-twice")
+        reader = make_user("reader@example.com")
+        login(self.client, reader)
+
+        self.client.get("/y/blog/read-twice/")
+        self.client.get("/y/blog/read-twice/")
+        self.assertEqual(view_counter.pending(post.pk), 1)
+        self.assertNotIn("viewed_blogs", self.client.session)
+
+        login(self.client, make_user("other@example.com"))
+        self.client.get("/y/blog/read-twice/")
+        self.assertEqual(view_counter.pending(post.pk), 2)
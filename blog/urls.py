@@ -33,9 +33,11 @@ urlpatterns = [
 
     path("y/comment/<int:comment_id>/edit/", views.y_comment_edit, name="y_comment_edit"),
     path("y/comment/<int:comment_id>/delete/", views.y_comment_delete, name="y_comment_delete"),
+    path("y/comment/<int:comment_id>/replies/", views.y_comment_replies, name="y_comment_replies"),
 
     path("y/blog/<int:blog_id>/like/", views.y_blog_like_toggle, name="y_blog_like_toggle"),
     path("y/analytics/", views.y_analytics, name="y_analytics"),
+    path("y/admin/cache-stats/", views.y_cache_stats, name="y_cache_stats"),
 
     path("y/bookmarks/", views.y_bookmarks, name="y_bookmarks"),
     path("y/blog/<int:blog_id>/bookmark/", views.y_blog_bookmark_toggle, name="y_blog_bookmark_toggle"),
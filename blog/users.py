@@ -0,0 +1,107 @@
+"""
+The logged-in user without a query per page.
+
+CurrentUserMiddleware puts request.current_user on every request: the
+BlogsUsers row of session["user_id"] (or None), loaded on first use and
+kept in a small per-process LRU (BLOG_USER_CACHE_SIZE entries). An entry is
+served while the user's version stamp in the cache is unchanged and it is
+younger than BLOG_USER_CACHE_TTL seconds. The TTL covers per-process cache
+backends, where a bump is only seen by the worker that made it.
+
+Views that change a user call invalidate_user(): y_user_edit, y_user_delete,
+y_profile_edit, y_reset_password and y_login (last login, rehashed password).
+
+The cached rows are shared between requests: treat them as read-only and
+load a fresh row to modify.
+
+Sessions themselves are cached only with BLOG_REDIS_URL (SESSION_ENGINE
+"cached_db", see settings): read from Redis, written through to the database
+only when changed. Without it they stay in django_session, so a logged-in
+page still reads its session row; caching them per process instead would
+let other workers keep serving a session after logout.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from .fragments import KEY_PREFIX, bump_version, get_version
+
+
+def _version_key(user_id):
+    return f"{KEY_PREFIX}:user-version:{user_id}"
+
+
+class UserCache:
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # user_id -> (version, loaded_at, user)
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """The user's row (None if there is no such user), from this process when current."""
+        if not user_id:
+            return None
+        version = get_version(_version_key(user_id))
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[0] == version and time.monotonic() - entry[1] < self.ttl:
+                self._entries.move_to_end(user_id)
+                return entry[2]
+
+        from .models import BlogsUsers
+
+        user = BlogsUsers.objects.filter(bu_user_id=user_id).first()
+        with self._lock:
+            self._entries[user_id] = (version, time.monotonic(), user)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return user
+
+    def forget(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+user_cache = UserCache(
+    size=getattr(settings, "BLOG_USER_CACHE_SIZE", 1024),
+    ttl=getattr(settings, "BLOG_USER_CACHE_TTL", 60),
+)
+
+
+def invalidate_user(user_id):
+    """Drop the cached row here now and in every process once the transaction commits."""
+    user_cache.forget(user_id)
+    bump_version(_version_key(user_id))
+
+
+class CurrentUserMiddleware:
+    """Sets request.current_user lazily, so requests that never use it cost nothing."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def _attach(self, request):
+        # in async views use sync_to_async(user_cache.get) instead of touching the lazy object
+        request.current_user = SimpleLazyObject(lambda: user_cache.get(request.session.get("user_id")))
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        self._attach(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self._attach(request)
+        return await self.get_response(request)
@@ -1,8 +1,24 @@
 from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
 from django.shortcuts import redirect
 from django.contrib import messages
 
+# Both decorators wrap sync and async views alike. An async view gets an async
+# wrapper that reads the session with aget(), so the session is loaded without
+# blocking the event loop (and is then cached for the rest of the request).
+
+
 def login_required_y(view_func):
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _wrapped(request, *args, **kwargs):
+            if not await request.session.aget("user_id"):
+                messages.error(request, "Please login first.")
+                return redirect("y_login")
+            return await view_func(request, *args, **kwargs)
+        return _wrapped
+
     @wraps(view_func)
     def _wrapped(request, *args, **kwargs):
         if not request.session.get("user_id"):
@@ -13,6 +29,16 @@ def login_required_y(view_func):
 
 def role_required(*allowed_roles):
     def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped(request, *args, **kwargs):
+                role = await request.session.aget("user_role")
+                if role not in allowed_roles:
+                    messages.error(request, "Access denied.")
+                    return redirect("y_home")
+                return await view_func(request, *args, **kwargs)
+            return _wrapped
+
         @wraps(view_func)
         def _wrapped(request, *args, **kwargs):
             role = request.session.get("user_role")
@@ -21,4 +47,4 @@ def role_required(*allowed_roles):
                 return redirect("y_home")
             return view_func(request, *args, **kwargs)
         return _wrapped
-    return decorator
\ No newline at end of file
+    return decorator
@@ -0,0 +1,102 @@
+"""
+Which posts a user has already viewed today, for counting a view once per day.
+
+y_blog_detail used to keep {blog_id: "YYYY-MM-DD"} in the session. That dict
+never shrank, and because it changed on nearly every page view the whole
+session row was rewritten each time. Now each user gets one Bloom filter
+per day, kept in its own cache alias (BLOG_VIEWED_CACHE, "viewed"):
+
+- a fixed BLOG_VIEWED_FILTER_BITS bits (1 KiB by default) however much the
+  user reads, and a constant number of bit checks per lookup;
+- the cache key includes the day, so yesterday's filter is simply never read
+  again and expires with its timeout;
+- the hash positions are salted with the day, so the rare false positive
+  (a view not counted) does not hit the same post every day. With the
+  defaults that is about 0.15% at 500 posts a day.
+
+The filter has to be shared by all workers and must not be evicted with the
+fragment cache, or a view is counted once per worker (or again after a
+cull). In production the alias is Redis (BLOG_REDIS_URL); the bits are set
+with SETBIT in one MULTI/EXEC, which returns the old bits, so concurrent
+requests cannot lose each other's bits. Any other backend is only good for
+one process (development, tests, the benchmark) and is updated under a
+process lock. The system checks warn about it (blog.W001), or refuse it
+(blog.E002) with BLOG_VIEWED_REQUIRE_SHARED = True; a missing alias is
+always an error (blog.E001).
+"""
+import hashlib
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from django.utils import timezone
+
+KEY_PREFIX = "blog:viewed"
+CACHE_ALIAS = getattr(settings, "BLOG_VIEWED_CACHE", "viewed")
+BITS = getattr(settings, "BLOG_VIEWED_FILTER_BITS", 8192)
+HASHES = getattr(settings, "BLOG_VIEWED_FILTER_HASHES", 5)
+# a day plus slack for clock and timezone differences between workers
+TIMEOUT = 2 * 24 * 3600
+
+_local_lock = threading.Lock()
+
+
+def _key(user_id, day):
+    return f"{KEY_PREFIX}:{user_id}:{day:%Y%m%d}"
+
+
+def _positions(blog_id, day):
+    digest = hashlib.blake2b(f"{day:%Y%m%d}:{blog_id}".encode(), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    # double hashing: k positions from two hashes
+    return [(h1 + i * h2) % BITS for i in range(HASHES)]
+
+
+def _add(bits, blog_id, day):
+    """Set the post's bits; returns (bits, True if it was not in the filter yet)."""
+    bits = bytearray(bits) if bits and len(bits) == BITS // 8 else bytearray(BITS // 8)
+    new = False
+    for pos in _positions(blog_id, day):
+        byte, mask = pos >> 3, 1 << (pos & 7)
+        if not bits[byte] & mask:
+            bits[byte] |= mask
+            new = True
+    return bytes(bits), new
+
+
+def is_shared(cache):
+    return isinstance(cache, RedisCache)
+
+
+def _mark_redis(cache, key, positions):
+    key = cache.make_and_validate_key(key)
+    client = cache._cache.get_client(key, write=True)
+    pipe = client.pipeline(transaction=True)
+    for pos in positions:
+        pipe.setbit(key, pos, 1)
+    pipe.expire(key, TIMEOUT)
+    *old_bits, _ = pipe.execute()
+    return not all(old_bits)
+
+
+def mark_viewed(user_id, blog_id):
+    """Record today's view of the post by the user; True if it is the first one today."""
+    day = timezone.localdate()
+    key = _key(user_id, day)
+    cache = caches[CACHE_ALIAS]
+    if is_shared(cache):
+        return _mark_redis(cache, key, _positions(blog_id, day))
+
+    with _local_lock:
+        bits, new = _add(cache.get(key), blog_id, day)
+        if new:
+            cache.set(key, bits, TIMEOUT)
+    return new
+
+
+async def amark_viewed(user_id, blog_id):
+    # Django's Redis backend is sync only: the SETBITs run on a worker thread
+    return await sync_to_async(mark_viewed, thread_sensitive=False)(user_id, blog_id)
@@ -1,46 +1,62 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
+from django.http import Http404, JsonResponse
+from django.template.loader import render_to_string
 from django.contrib import messages
-from django.contrib.auth.hashers import make_password, check_password
 from django.utils import timezone
-from django.db.models import Q, F, Count, Sum
-from django.db.models.functions import TruncDate
-from django.db import IntegrityError
-import os
+from django.db.models import Q, Count, Sum, Exists, OuterRef
+from django.db import IntegrityError, transaction
 from django.conf import settings
-from django.core.files.storage import FileSystemStorage
-from django.core.paginator import Paginator
-from datetime import timedelta
 import uuid
 from django.urls import reverse
-from django.core.mail import send_mail
+from django.views.static import serve
+from asgiref.sync import sync_to_async
 
 from .models import BlogsUsers, BlogsCategories, BlogsDetails, BlogsComments, BlogsLikes, BlogsBookmarks, PasswordResetToken
+from .search import index_blog, match_filter, unindex_blog, search_page
+from .pagination import KeysetPaginator, page_links
+from .counters import view_counter
+from .rollups import CHART_PERIODS, SCOPE_ALL, user_scope, views_chart
+from .comments import create_comment, edit_comment, soft_delete_comment, thread_page, replies_page
+from .fragments import bookmarks_version, cached_fragment, comments_version, fragment_stats, likes_version
+from .categories import bump_categories_version, categories_version, category_registry
+from .feed import (
+    FEED_KEYS, FEED_PER_PAGE, bump_feed_generation, cached_feed, feed_queryset, feed_validator, normalize_feed_params,
+)
+from .slugs import create_with_unique_slug
+from .passwords import HashingBusy, ahash_password, averify_password, hash_password
+from .parallel import gather_sync
+from .utils import login_required_y, role_required
+from .viewed import amark_viewed
+from .users import invalidate_user
+from .images import InvalidImage, media_path, media_url, save_upload, schedule_variants, variant_widths
+from .blobs import IMMUTABLE_CACHE_CONTROL, IMMUTABLE_PATH, add_ref, release
+from .conditional import not_modified, page_etag, with_validators
+from .reactions import toggle
+from .mail import queue_mail
+from .directory import DIRECTORY_KEYS, DIRECTORY_PER_PAGE, USER_ROLES, USER_STATUSES, directory_queryset
 
 
 # ----------- USER MANAGEMENT HELPERS -----------
-USER_ROLES = ["admin", "writer", "viewer"]
-USER_STATUSES = ["Active", "Inactive"]
-
-
 def _render_users_page(request, *, mode=None, edit_user=None):
     """Render the single users page (y_users.html) with optional create/edit form context."""
     q = (request.GET.get("q") or "").strip()
+    role = request.GET.get("role") or ""
+    status = request.GET.get("status") or ""
 
-    users_qs = BlogsUsers.objects.all().order_by("-bu_user_id")
-    if q:
-        users_qs = users_qs.filter(
-            Q(bu_first_name__icontains=q)
-            | Q(bu_last_name__icontains=q)
-            | Q(bu_email__icontains=q)
-            | Q(bu_role__icontains=q)
-        )
+    # keyset pages of lean rows, exact role/status filters and prefix search (blog/directory.py)
+    paginator = KeysetPaginator(directory_queryset(q, role, status), DIRECTORY_KEYS, DIRECTORY_PER_PAGE)
+    page_obj = paginator.page(request.GET.get("cursor"))
 
     return render(
         request,
         "blog/y_users.html",
         {
-            "users": users_qs,
+            "page_obj": page_obj,
+            "users": page_obj,
+            **page_links(request, page_obj),
             "q": q,
+            "role_filter": role,
+            "status_filter": status,
             "mode": mode,  # None | 'create' | 'edit'
             "u": edit_user,
             "roles": USER_ROLES,
@@ -49,27 +65,6 @@ def _render_users_page(request, *, mode=None, edit_user=None):
     )
 
 
-# ----------- SECURITY HELPERS -----------
-def login_required_y(view_func):
-    def wrapper(request, *args, **kwargs):
-        if not request.session.get("user_id"):
-            messages.error(request, "Please login first.")
-            return redirect("y_login")
-        return view_func(request, *args, **kwargs)
-    return wrapper
-
-
-def role_required(*roles):
-    def decorator(view_func):
-        def wrapper(request, *args, **kwargs):
-            role = request.session.get("user_role")
-            if role not in roles:
-                messages.error(request, "Access denied.")
-                return redirect("y_home")
-            return view_func(request, *args, **kwargs)
-        return wrapper
-    return decorator
-
 #---------------SLug---------------------
 def make_slug(title: str) -> str:
     # spaces hatao + small letters
@@ -80,15 +75,6 @@ def make_slug(title: str) -> str:
         slug = slug.replace("--", "-")
     return slug.strip("-") or "post"
 
-# It make unique in slug
-def unique_slug(base: str) -> str:
-    slug = base
-    i = 2
-    while BlogsDetails.objects.filter(bd_slug=slug).exists():
-        slug = f"{base}-{i}"
-        i += 1
-    return slug
-
 def _make_cat_slug(name: str) -> str:
     slug = (name or "").strip().lower()
     slug = "".join(ch if ch.isalnum() else "-" for ch in slug)
@@ -97,27 +83,21 @@ def _make_cat_slug(name: str) -> str:
     return slug.strip("-") or "category"
 
 
-def _unique_cat_slug(base: str) -> str:
-    slug = base
-    i = 2
-    while BlogsCategories.objects.filter(bc_slug=slug).exists():
-        slug = f"{base}-{i}"
-        i += 1
-    return slug
-
-
 def _render_categories_page(request, *, mode=None, edit_category=None):
     q = (request.GET.get("q") or "").strip()
 
-    cats = BlogsCategories.objects.all().order_by("bc_sort_order", "bc_category_name")
+    registry = category_registry.get()
+    cats = registry.all
     if q:
-        cats = cats.filter(
-            Q(bc_category_name__icontains=q) |
-            Q(bc_slug__icontains=q) |
-            Q(bc_description__icontains=q)
-        )
+        needle = q.lower()
+        cats = [
+            c for c in cats
+            if needle in (c.bc_category_name or "").lower()
+            or needle in (c.bc_slug or "").lower()
+            or needle in (c.bc_description or "").lower()
+        ]
 
-    parent_choices = BlogsCategories.objects.all().order_by("bc_category_name")
+    parent_choices = registry.by_name
 
     return render(request, "blog/y_categories.html", {
         "categories": cats,
@@ -129,13 +109,26 @@ def _render_categories_page(request, *, mode=None, edit_category=None):
     })
 
 # ---------------- AUTH ----------------
-def y_login(request):
+HASHING_RETRY_AFTER = 5  # seconds
+
+
+def _hashing_busy(request, render_page):
+    """503 page for when the password hasher is saturated (see blog/passwords.py)."""
+    messages.error(request, "Too many sign-ins right now. Please try again in a few seconds.")
+    response = render_page()
+    response.status_code = 503
+    response["Retry-After"] = str(HASHING_RETRY_AFTER)
+    return response
+
+
+async def y_login(request):
+    # async so that a worker is not held while the password is checked (blog/passwords.py)
     if request.method == "POST":
         email = request.POST.get("email", "").strip().lower()
         password = request.POST.get("password", "")
 
         try:
-            user = BlogsUsers.objects.get(bu_email=email)
+            user = await BlogsUsers.objects.aget(bu_email=email)
         except BlogsUsers.DoesNotExist:
             messages.error(request, "Invalid email or password")
             return redirect("y_login")
@@ -144,29 +137,38 @@ def y_login(request):
             messages.error(request, "Account inactive. Contact admin.")
             return redirect("y_login")
 
-        if not check_password(password, user.bu_password_hash):
+        try:
+            ok, upgraded_hash = await averify_password(password, user.bu_password_hash)
+        except HashingBusy:
+            return await sync_to_async(_hashing_busy)(request, lambda: render(request, "blog/y_login.html"))
+        if not ok:
             messages.error(request, "Invalid email or password")
             return redirect("y_login")
 
         # SESSION SET
-        request.session["user_id"] = user.bu_user_id
-        request.session["user_role"] = user.bu_role
-        request.session["user_email"] = user.bu_email
+        await request.session.aset("user_id", user.bu_user_id)
+        await request.session.aset("user_role", user.bu_role)
+        await request.session.aset("user_email", user.bu_email)
 
-        # update last login
+        # update last login (and the hash, if it was made with older parameters)
         try:
             user.bu_last_login = timezone.now()
-            user.save(update_fields=["bu_last_login"])
+            update_fields = ["bu_last_login"]
+            if upgraded_hash:
+                user.bu_password_hash = upgraded_hash
+                update_fields.append("bu_password_hash")
+            await user.asave(update_fields=update_fields)
+            await sync_to_async(invalidate_user)(user.bu_user_id)
         except:
             pass
 
         # login should go to HOME
         return redirect("y_home")
 
-    return render(request, "blog/y_login.html")
+    return await sync_to_async(render)(request, "blog/y_login.html")
 
 #-------------Register----------------------
-def y_register(request):
+async def y_register(request):
     if request.method == "POST":
         name = request.POST.get("name", "").strip()
         email = request.POST.get("email", "").strip().lower()
@@ -181,7 +183,7 @@ def y_register(request):
             messages.error(request, "Password and Confirm Password do not match.")
             return redirect("y_register")
 
-        if BlogsUsers.objects.filter(bu_email=email).exists():
+        if await BlogsUsers.objects.filter(bu_email=email).aexists():
             messages.error(request, "Email already exists.")
             return redirect("y_register")
 
@@ -193,11 +195,16 @@ def y_register(request):
         # force role to viewer
         role = "viewer"
 
-        user = BlogsUsers.objects.create(
+        try:
+            password_hash = await ahash_password(password)
+        except HashingBusy:
+            return await sync_to_async(_hashing_busy)(request, lambda: render(request, "blog/y_register.html"))
+
+        user = await BlogsUsers.objects.acreate(
             bu_first_name=first_name,
             bu_last_name=last_name,
             bu_email=email,
-            bu_password_hash=make_password(password),
+            bu_password_hash=password_hash,
             bu_role=role,
             bu_status="Active",
             bu_created_at=timezone.now(),  # important if DB requires NOT NULL
@@ -205,14 +212,14 @@ def y_register(request):
         )
 
         # auto-login after register
-        request.session["user_id"] = user.bu_user_id
-        request.session["user_role"] = user.bu_role
-        request.session["user_email"] = user.bu_email
+        await request.session.aset("user_id", user.bu_user_id)
+        await request.session.aset("user_role", user.bu_role)
+        await request.session.aset("user_email", user.bu_email)
 
         messages.success(request, "Registration successful.")
         return redirect("y_home")
 
-    return render(request, "blog/y_register.html")
+    return await sync_to_async(render)(request, "blog/y_register.html")
 
 
 def y_logout(request):
@@ -237,31 +244,35 @@ def y_forgot_password(request):
 
         token = str(uuid.uuid4())
 
-        # create token row
-        try:
-            PasswordResetToken.objects.create(
-                prt_user=user,
-                prt_token=token,
-            )
-        except IntegrityError:
-            # rare case token clash
-            token = str(uuid.uuid4())
-            PasswordResetToken.objects.create(
-                prt_user=user,
-                prt_token=token,
-            )
+        with transaction.atomic():
+            # create token row
+            try:
+                with transaction.atomic():
+                    PasswordResetToken.objects.create(
+                        prt_user=user,
+                        prt_token=token,
+                    )
+            except IntegrityError:
+                # rare case token clash
+                token = str(uuid.uuid4())
+                PasswordResetToken.objects.create(
+                    prt_user=user,
+                    prt_token=token,
+                )
 
-        reset_link = request.build_absolute_uri(
-            reverse("y_reset_password", kwargs={"token": token})
-        )
+            reset_link = request.build_absolute_uri(
+                reverse("y_reset_password", kwargs={"token": token})
+            )
 
-        send_mail(
-            subject="Reset Your Password - MyBlog",
-            message=f"Click this link to reset your password:\n\n{reset_link}\n\nThis link expires in 30 minutes.",
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[email],
-            fail_silently=False,
-        )
+            # sent by `manage.py run_workers` (blog/mail.py). Keyed by the token: every
+            # request mails its own link, and the same link is never queued twice
+            queue_mail(
+                "Reset Your Password - MyBlog",
+                f"Click this link to reset your password:\n\n{reset_link}\n\nThis link expires in 30 minutes.",
+                [email],
+                priority=10,
+                dedup_key=f"password-reset:{user.bu_user_id}:{token}",
+            )
 
         return redirect("y_login")
 
@@ -290,10 +301,16 @@ def y_reset_password(request, token):
             messages.error(request, "Password must be at least 8 characters.")
             return redirect(request.path)
 
+        try:
+            password_hash = hash_password(password)
+        except HashingBusy:
+            return _hashing_busy(request, lambda: render(request, "blog/y_reset_password.html", {"token": token}))
+
         user = reset_obj.prt_user
-        user.bu_password_hash = make_password(password)
+        user.bu_password_hash = password_hash
         user.bu_updated_at = timezone.now()
         user.save(update_fields=["bu_password_hash", "bu_updated_at"])
+        invalidate_user(user.bu_user_id)
 
         reset_obj.prt_is_used = True
         reset_obj.save(update_fields=["prt_is_used"])
@@ -305,91 +322,97 @@ def y_reset_password(request, token):
 
 
 # ---------------- PAGES ----------------
+# y_home, y_blog_detail, y_bookmarks and y_analytics are async: under ASGI a
+# worker serves many readers while their queries are in flight, and the
+# independent queries of a page run side by side (blog/parallel.py).
 @login_required_y
-def y_home(request):
+async def y_home(request):
     q = (request.GET.get("q") or "").strip()
-    cat = (request.GET.get("cat") or "").strip()
+    role = await request.session.aget("user_role", "viewer")
 
-    role = request.session.get("user_role", "viewer")
+    # normalized so that equivalent URLs share one cache entry
+    search_q, cat = normalize_feed_params(q, request.GET.get("cat"))
+    token = request.GET.get("page") if search_q else request.GET.get("cursor")
 
-    categories = BlogsCategories.objects.filter(
-        bc_category_status="Active"
-    ).order_by("bc_sort_order", "bc_category_name")
-
-    blogs = BlogsDetails.objects.filter(
-        bd_blog_status="Published",
-        bd_is_deleted=0
+    etag = page_etag(
+        request, await request.session.aget("user_id"), role,
+        *feed_validator(), categories_version(), q, cat, token or "",
     )
+    if response := not_modified(request, etag):
+        return response
 
-    if cat:
-        blogs = blogs.filter(bd_category_id=cat)
+    def build():
+        blogs = feed_queryset(cat)
 
-    if q:
-        blogs = blogs.filter(
-            Q(bd_blog_title__icontains=q) |
-            Q(bd_excerpt__icontains=q) |
-            Q(bd_blog_content__icontains=q) |
-            Q(bd_slug__icontains=q)
-        )
-
-    blogs = blogs.order_by("-bd_published_at", "-bd_updated_at")
-    paginator = Paginator(blogs, 6)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+        if search_q:
+            # ranked through the search index instead of LIKE scans
+            page_obj = search_page(search_q, blogs, token, FEED_PER_PAGE)
+        else:
+            # keyset pages: no COUNT(*) and no OFFSET, deep pages cost the same as page 1
+            paginator = KeysetPaginator(blogs, FEED_KEYS, FEED_PER_PAGE)
+            page_obj = paginator.page(token)
+        return {"page_obj": page_obj}
+
+    feed, categories = await gather_sync(
+        lambda: cached_feed(role, search_q, cat, token, build),
+        lambda: category_registry.get().active,
+    )
+    page_obj = feed["page_obj"]
 
-    return render(request, "blog/y_home.html", {
+    return with_validators(render(request, "blog/y_home.html", {
         "page_obj": page_obj,
         "blogs": page_obj, 
+        **page_links(request, page_obj),
         "categories": categories,
         "q": q,
         # Url becz i add this in my y_home page
         "cat": cat,
         "role": role,
-    })
+    }), etag)
 
 #----------Blog detail--------------
 @login_required_y
-def y_blog_detail(request, slug):
-    role = request.session.get("user_role", "viewer")
-    user_id = request.session.get("user_id")
-
-    blog = get_object_or_404(BlogsDetails, bd_slug=slug, bd_is_deleted=0)
-
-    if blog.bd_blog_status == "Published":
-        today = timezone.now().date().isoformat()
-
-        viewed_map = request.session.get("viewed_blogs", {})
-        last_viewed = viewed_map.get(str(blog.bd_blog_id))
-
-        if last_viewed != today:
-            BlogsDetails.objects.filter(bd_blog_id=blog.bd_blog_id).update(
-                bd_views=F("bd_views") + 1
-            )
-            viewed_map[str(blog.bd_blog_id)] = today
-            request.session["viewed_blogs"] = viewed_map
-            request.session.modified = True
-
-            blog.refresh_from_db(fields=["bd_views"])
-
-    all_comments = (
-        BlogsComments.objects
-        .filter(bc_blog=blog, bc_is_deleted=0, bc_status="Approved")
-        .select_related("bc_user", "bc_parent")
-        .order_by("-bc_created_at")
+async def y_blog_detail(request, slug):
+    role = await request.session.aget("user_role", "viewer")
+    user_id = await request.session.aget("user_id")
+
+    # the validators first, from a lean row: an unchanged page is answered with a
+    # 304 before the like/bookmark lookups and the rendering (see blog/conditional.py)
+    meta = await BlogsDetails.objects.filter(bd_slug=slug, bd_is_deleted=0).values(
+        "bd_blog_id", "bd_blog_status", "bd_updated_at", "bd_comment_count", "bd_like_count", "bd_bookmark_count",
+    ).afirst()
+    if meta is None:
+        raise Http404
+    blog_id = meta["bd_blog_id"]
+    published = meta["bd_blog_status"] == "Published"
+
+    if published:
+        # once per user per day, tracked outside the session (see blog/viewed.py)
+        if await amark_viewed(user_id, blog_id):
+            # buffered, written in batches by view_counter (no row lock per view)
+            view_counter.incr(blog_id)
+
+        # sessions from before blog/viewed.py still carry the old per-post map
+        if await request.session.ahas_key("viewed_blogs"):
+            await request.session.apop("viewed_blogs")
+
+    etag = page_etag(
+        request, user_id, role, *meta.values(), comments_version(blog_id), likes_version(blog_id),
+        request.GET.get("comments", ""),
     )
+    if response := not_modified(request, etag):
+        return response
 
-    children_map = {}
-    roots = []
-
-    for c in all_comments:
-        parent_id = c.bc_parent_id
-        if parent_id:
-            children_map.setdefault(parent_id, []).append(c)
-        else:
-            roots.append(c)
-
-    for c in all_comments:
-        c.children = children_map.get(c.bc_comment_id, [])
+    blogs = BlogsDetails.objects.all()
+    if role == "viewer" and user_id:
+        # the viewer's like/bookmark state comes with the post in the same query
+        blogs = blogs.annotate(
+            user_liked=Exists(BlogsLikes.objects.filter(bl_blog=OuterRef("pk"), bl_user_id=user_id)),
+            user_bookmarked=Exists(BlogsBookmarks.objects.filter(bb_blog=OuterRef("pk"), bb_user_id=user_id)),
+        )
+    blog = await aget_object_or_404(blogs, bd_blog_id=blog_id, bd_is_deleted=0)
+    if published:
+        blog.bd_views += view_counter.pending(blog_id)
 
     if request.method == "POST":
         if role != "viewer":
@@ -406,7 +429,7 @@ def y_blog_detail(request, slug):
         parent_obj = None
         if parent_id:
             try:
-                parent_obj = BlogsComments.objects.get(
+                parent_obj = await BlogsComments.objects.aget(
                     bc_comment_id=int(parent_id),
                     bc_blog=blog,
                     bc_is_deleted=0
@@ -414,46 +437,67 @@ def y_blog_detail(request, slug):
             except:
                 parent_obj = None
 
-        BlogsComments.objects.create(
-            bc_blog=blog,
-            bc_user_id=user_id,
-            bc_comment=comment_text,
-            bc_status="Approved",
-            bc_created_at=timezone.now(),
-            bc_is_deleted=0,
-            bc_parent=parent_obj
-        )
+        await sync_to_async(create_comment)(blog, user_id, comment_text, parent=parent_obj)
 
         messages.success(request, "Reply added." if parent_obj else "Comment added.")
         return redirect("y_blog_detail", slug=slug)
 
-    like_count = BlogsLikes.objects.filter(bl_blog=blog).count()
-    user_liked = False
-    if role == "viewer" and user_id:
-        user_liked = BlogsLikes.objects.filter(
-            bl_blog=blog,
-            bl_user_id=user_id
-        ).exists()
-    user_bookmarked = False
-    if role == "viewer" and user_id:
-        user_bookmarked = BlogsBookmarks.objects.filter(
-            bb_blog_id=blog.bd_blog_id,
-            bb_user_id=user_id
-        ).exists()
+    # post body and comment thread are the same for everyone: cached per version,
+    # per-user controls are added around them (see blog/fragments.py)
+    def body_fragment():
+        return cached_fragment(
+            "blog_body",
+            (blog.bd_blog_id, blog.bd_updated_at.isoformat() if blog.bd_updated_at else ""),
+            lambda: render_to_string("blog/_blog_body.html", {"blog": blog}),
+        )
 
-    return render(request, "blog/y_detail.html", {
+    def render_thread():
+        # one page of root threads with their first replies; deeper ones load on demand
+        comment_rows, comments_page = thread_page(blog, request.GET.get("comments"))
+        comment_links = page_links(request, comments_page, param="comments")
+        return render_to_string("blog/_comment_thread.html", {
+            "rows": comment_rows,
+            "comments_prev_qs": comment_links["prev_qs"],
+            "comments_next_qs": comment_links["next_qs"],
+        })
+
+    def comments_fragment():
+        return cached_fragment(
+            "blog_comments",
+            (
+                blog.bd_blog_id,
+                comments_version(blog.bd_blog_id),
+                blog.bd_comment_count,
+                request.GET.get("comments", ""),
+            ),
+            render_thread,
+        )
+
+    body_html, comments_html = await gather_sync(body_fragment, comments_fragment)
+
+    like_count = blog.bd_like_count
+    user_liked = getattr(blog, "user_liked", False)
+    user_bookmarked = getattr(blog, "user_bookmarked", False)
+
+    return with_validators(render(request, "blog/y_detail.html", {
         "blog": blog,
-        "comments_roots": roots,
+        "body_html": body_html,
+        "comments_html": comments_html,
         "role": role,
 
         "like_count": like_count,
         "user_liked": user_liked,
         "user_bookmarked": user_bookmarked,
-    })
+    }), etag)
 
 
-@login_required_y
-def y_blog_like_toggle(request, blog_id):
+#-------------------Like / bookmark-------------------------
+def _wants_json(request):
+    return "application/json" in request.headers.get("Accept", "")
+
+
+def _toggle_reaction(request, blog_id, kind, role_error, status_error, done_messages):
+    """Shared body of the like and bookmark toggles (blog/reactions.py); JSON for fetch() callers."""
     role = request.session.get("user_role", "viewer")
     user_id = request.session.get("user_id")
 
@@ -461,36 +505,48 @@ def y_blog_like_toggle(request, blog_id):
         return redirect("y_home")
 
     if role != "viewer":
-        messages.error(request, "Only viewer can like blogs.")
+        if _wants_json(request):
+            return JsonResponse({"error": role_error}, status=403)
+        messages.error(request, role_error)
         return redirect("y_home")
 
-    blog = get_object_or_404(BlogsDetails, bd_blog_id=blog_id, bd_is_deleted=0)
-
-    if blog.bd_blog_status != "Published":
-        messages.error(request, "You can like only published blogs.")
+    reaction = toggle(kind, blog_id, user_id)
+    if reaction is None:
+        # only the failure path looks the post up again, to tell missing from unpublished
+        blog = get_object_or_404(BlogsDetails, bd_blog_id=blog_id, bd_is_deleted=0)
+        if _wants_json(request):
+            return JsonResponse({"error": status_error}, status=409)
+        messages.error(request, status_error)
         return redirect("y_blog_detail", slug=blog.bd_slug)
 
-    existing = BlogsLikes.objects.filter(bl_blog=blog, bl_user_id=user_id)
+    if _wants_json(request):
+        return JsonResponse({"active": reaction.active, "count": reaction.count})
+    messages.success(request, done_messages[reaction.active])
+    return redirect("y_blog_detail", slug=reaction.slug)
 
-    if existing.exists():
-        existing.delete()
-        messages.success(request, "Like removed.")
-    else:
-        try:
-            BlogsLikes.objects.create(bl_blog=blog, bl_user_id=user_id)
-            messages.success(request, "Liked!")
-        except IntegrityError:
-            pass
 
-    return redirect("y_blog_detail", slug=blog.bd_slug)
+@login_required_y
+def y_blog_like_toggle(request, blog_id):
+    return _toggle_reaction(
+        request, blog_id, "like",
+        "Only viewer can like blogs.", "You can like only published blogs.",
+        {True: "Liked!", False: "Like removed."},
+    )
+
+
+@login_required_y
+def y_blog_bookmark_toggle(request, blog_id):
+    return _toggle_reaction(
+        request, blog_id, "bookmark",
+        "Only viewers can bookmark blogs.", "Only published blogs can be bookmarked.",
+        {True: "Saved to bookmarks.", False: "Removed from bookmarks."},
+    )
 
 #-------------------Create--------------------------
 @login_required_y
 @role_required("admin", "writer")
 def y_blog_create(request):
-    categories = BlogsCategories.objects.filter(
-        bc_category_status="Active"
-    ).order_by("bc_sort_order", "bc_category_name")
+    categories = category_registry.get().active
 
     if request.method == "POST":
         title = (request.POST.get("title") or "").strip()
@@ -503,27 +559,43 @@ def y_blog_create(request):
             messages.error(request, "Title and Content are required.")
             return redirect("y_blog_create")
 
-        base = make_slug(title)
-        slug = unique_slug(base)
+        featured_image = None
+        if request.FILES.get("featured_image"):
+            try:
+                featured_image = save_upload(request.FILES["featured_image"], "featured")
+            except InvalidImage as e:
+                messages.error(request, str(e))
+                return redirect("y_blog_create")
 
         now = timezone.now()
-        BlogsDetails.objects.create(
-            bd_blog_title=title,
-            bd_slug=slug,
-            bd_blog_content=content,
-            bd_excerpt=excerpt,
-            bd_category_id=int(category_id) if category_id else None,
-            bd_blog_status=status,
-            bd_is_deleted=0,
-            bd_views=0,
-            bd_updated_at=now,
-            bd_published_at=now if status == "Published" else None,
-            bd_date_added=now.date(),
-            bd_user_id=request.session.get("user_id"),
-        )
+
+        def insert(slug):
+            return BlogsDetails.objects.create(
+                bd_blog_title=title,
+                bd_slug=slug,
+                bd_blog_content=content,
+                bd_excerpt=excerpt,
+                bd_category_id=int(category_id) if category_id else None,
+                bd_blog_status=status,
+                bd_is_deleted=0,
+                bd_views=0,
+                bd_updated_at=now,
+                bd_published_at=now if status == "Published" else None,
+                bd_date_added=now.date(),
+                bd_user_id=request.session.get("user_id"),
+                bd_featured_image=media_url(featured_image) if featured_image else None,
+            )
+
+        # one prefix query for the slug, allocated again if a concurrent create takes it
+        blog = create_with_unique_slug(BlogsDetails, "bd_slug", make_slug(title), insert)
+        index_blog(blog)
+        bump_feed_generation()
+        if featured_image:
+            add_ref(featured_image)
+            schedule_variants(featured_image, "featured")
 
         messages.success(request, "Blog created.")
-        return redirect("y_blog_detail", slug=slug)
+        return redirect("y_blog_detail", slug=blog.bd_slug)
 
     return render(request, "blog/y_create.html", {"categories": categories})
 
@@ -536,9 +608,7 @@ def y_blog_edit(request, blog_id):
 
     blog = get_object_or_404(BlogsDetails, bd_blog_id=blog_id, bd_is_deleted=0)
 
-    categories = BlogsCategories.objects.filter(
-        bc_category_status="Active"
-    ).order_by("bc_sort_order", "bc_category_name")
+    categories = category_registry.get().active
 
     if role == "writer" and blog.bd_user_id != user_id:
         messages.error(request, "You can edit only your own blogs.")
@@ -554,12 +624,29 @@ def y_blog_edit(request, blog_id):
             messages.error(request, "Title and Content are required.")
             return redirect("y_blog_edit", blog_id=blog_id)
 
+        featured_image = None
+        old_image = media_path(blog.bd_featured_image)
+        if request.FILES.get("featured_image"):
+            try:
+                featured_image = save_upload(request.FILES["featured_image"], "featured")
+            except InvalidImage as e:
+                messages.error(request, str(e))
+                return redirect("y_blog_edit", blog_id=blog_id)
+            blog.bd_featured_image = media_url(featured_image)
+            schedule_variants(featured_image, "featured")
+
         blog.bd_blog_title = title
         blog.bd_excerpt = excerpt
         blog.bd_blog_content = content
         blog.bd_category_id = int(category_id) if category_id else blog.bd_category_id
         blog.bd_updated_at = timezone.now()
-        blog.save()
+        with transaction.atomic():
+            blog.save()
+            if featured_image and featured_image != old_image:
+                add_ref(featured_image)
+                release(old_image)
+        index_blog(blog)
+        bump_feed_generation()
 
         messages.success(request, "Blog updated.")
         return redirect("y_blog_detail", slug=blog.bd_slug)
@@ -586,6 +673,8 @@ def y_blog_delete(request, blog_id):
         blog.bd_is_deleted = 1
         blog.bd_updated_at = timezone.now()
         blog.save(update_fields=["bd_is_deleted", "bd_updated_at"])
+        unindex_blog(blog.bd_blog_id)
+        bump_feed_generation()
         messages.success(request, "Blog deleted.")
         return redirect("y_home")
 
@@ -607,22 +696,15 @@ def y_dashboard(request):
 
     q = (request.GET.get("q") or "").strip()
     if q:
-        drafts = drafts.filter(
-            Q(bd_blog_title__icontains=q) |
-            Q(bd_slug__icontains=q) |
-            Q(bd_excerpt__icontains=q) |
-            Q(bd_blog_content__icontains=q)
-        )
-
-    drafts = drafts.order_by("-bd_updated_at", "-bd_blog_id")
-    paginator = Paginator(drafts, 8)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
-
+        page_obj = search_page(q, drafts, request.GET.get("page"), 8)
+    else:
+        paginator = KeysetPaginator(drafts, ("bd_updated_at", "bd_blog_id"), 8)
+        page_obj = paginator.page(request.GET.get("cursor"))
 
     return render(request, "blog/y_dashboard.html", {
         "page_obj": page_obj,
         "drafts": page_obj,
+        **page_links(request, page_obj),
         "q": q,
         "role": role,
         "email": request.session.get("user_email"),
@@ -687,12 +769,17 @@ def y_user_create(request):
             messages.error(request, "Email already exists.")
             return redirect(f"{redirect('y_users').url}?mode=create")
 
+        try:
+            password_hash = hash_password(password)
+        except HashingBusy:
+            return _hashing_busy(request, lambda: _render_users_page(request, mode="create"))
+
         try:
             BlogsUsers.objects.create(
                 bu_first_name=first_name,
                 bu_last_name=last_name,
                 bu_email=email,
-                bu_password_hash=make_password(password),
+                bu_password_hash=password_hash,
                 bu_role=role,
                 bu_status=status,
                 bu_created_at=timezone.now(),
@@ -746,7 +833,10 @@ def y_user_edit(request, user_id):
             if new_password != confirm_password:
                 messages.error(request, "Password and Confirm Password do not match.")
                 return redirect(f"{redirect('y_users').url}?mode=edit&user_id={user_id}")
-            user.bu_password_hash = make_password(new_password)
+            try:
+                user.bu_password_hash = hash_password(new_password)
+            except HashingBusy:
+                return _hashing_busy(request, lambda: _render_users_page(request, mode="edit", edit_user=user))
 
         user.bu_first_name = first_name
         user.bu_last_name = last_name
@@ -755,6 +845,7 @@ def y_user_edit(request, user_id):
         user.bu_status = status
         user.bu_updated_at = timezone.now()
         user.save()
+        invalidate_user(user.bu_user_id)
 
         messages.success(request, "User updated successfully.")
         return redirect("y_users")
@@ -774,7 +865,10 @@ def y_user_delete(request, user_id):
         return redirect("y_users")
 
     if request.method == "POST":
-        user.delete()
+        with transaction.atomic():
+            user.delete()
+            release(user.bu_profile_pic.name)
+        invalidate_user(user_id)
         messages.success(request, "User deleted successfully.")
         return redirect("y_users")
 
@@ -823,11 +917,8 @@ def y_category_create(request):
         except ValueError:
             sort_order_int = 0
 
-        base = _make_cat_slug(name)
-        slug = _unique_cat_slug(base)
-
-        try:
-            BlogsCategories.objects.create(
+        def insert(slug):
+            return BlogsCategories.objects.create(
                 bc_category_name=name,
                 bc_slug=slug,
                 bc_description=description or None,
@@ -837,10 +928,15 @@ def y_category_create(request):
                 bc_created_at=timezone.now(),
                 bc_updated_at=timezone.now(),
             )
+
+        try:
+            create_with_unique_slug(BlogsCategories, "bc_slug", _make_cat_slug(name), insert)
         except IntegrityError as e:
             messages.error(request, f"Could not create category: {e}")
             return redirect(f"{redirect('y_categories').url}?mode=create")
 
+        bump_categories_version()
+        bump_feed_generation()
         messages.success(request, "Category created successfully.")
         return redirect("y_categories")
 
@@ -881,6 +977,8 @@ def y_category_edit(request, category_id):
         cat.bc_updated_at = timezone.now()
 
         cat.save()
+        bump_categories_version()
+        bump_feed_generation()
         messages.success(request, "Category updated successfully.")
         return redirect("y_categories")
 
@@ -902,6 +1000,8 @@ def y_category_delete(request, category_id):
             cat.bc_updated_at = timezone.now()
             cat.save(update_fields=["bc_category_status", "bc_updated_at"])
             messages.warning(request, "Category is used in blogs, so it was marked Inactive instead.")
+        bump_categories_version()
+        bump_feed_generation()
         return redirect("y_categories")
 
     return redirect("y_categories")
@@ -909,17 +1009,27 @@ def y_category_delete(request, category_id):
 #----------------Profile pic---------------------
 @login_required_y
 def y_profile(request):
-    user_id = request.session.get("user_id")
-    u = get_object_or_404(BlogsUsers, bu_user_id=user_id)
-    return render(request, "blog/y_profile.html", {"u": u})
+    u = request.current_user
+    if not u:
+        raise Http404
+    # the avatar markup changes once its variants are built
+    pic = media_path(u.bu_profile_pic)
+    etag = page_etag(
+        request, u.bu_user_id, request.session.get("user_role"), u.bu_updated_at, pic,
+        bool(pic and variant_widths(pic, "profile")),
+    )
+    if response := not_modified(request, etag, u.bu_updated_at):
+        return response
+    return with_validators(render(request, "blog/y_profile.html", {"u": u}), etag, u.bu_updated_at)
 
 #-----------------Edit---------------------------
 @login_required_y
 def y_profile_edit(request):
     user_id = request.session.get("user_id")
-    u = get_object_or_404(BlogsUsers, bu_user_id=user_id)
 
     if request.method == "POST":
+        # a fresh row to modify; request.current_user is shared (blog/users.py)
+        u = get_object_or_404(BlogsUsers, bu_user_id=user_id)
         first_name = (request.POST.get("first_name") or "").strip()
         last_name = (request.POST.get("last_name") or "").strip()
         username = (request.POST.get("username") or "").strip()
@@ -931,21 +1041,36 @@ def y_profile_edit(request):
                 return redirect("y_profile_edit")
 
         pic = request.FILES.get("profile_pic")
+        old_pic = u.bu_profile_pic.name
+        profile_pic = None
         if pic:
-            fs = FileSystemStorage(location=os.path.join(settings.MEDIA_ROOT, "profile_pics"))
-            filename = fs.save(pic.name, pic)
-            u.bu_profile_pic = f"profile_pics/{filename}"
+            # streamed to disk and checked; sized variants are built in the background
+            try:
+                profile_pic = save_upload(pic, "profile")
+            except InvalidImage as e:
+                messages.error(request, str(e))
+                return redirect("y_profile_edit")
+            u.bu_profile_pic = profile_pic
+            schedule_variants(profile_pic, "profile")
 
         u.bu_first_name = first_name
         u.bu_last_name = last_name
         u.bu_username = username or u.bu_username
         u.bu_bio = bio or None
         u.bu_updated_at = timezone.now()
-        u.save()
+        with transaction.atomic():
+            u.save()
+            if profile_pic and profile_pic != old_pic:
+                add_ref(profile_pic)
+                release(old_pic)
+        invalidate_user(user_id)
 
         messages.success(request, "Profile updated successfully.")
         return redirect("y_profile")
 
+    u = request.current_user
+    if not u:
+        raise Http404
     return render(request, "blog/y_profile_edit.html", {"u": u})
 
 
@@ -955,7 +1080,10 @@ def y_comment_edit(request, comment_id):
     role = request.session.get("user_role", "viewer")
     user_id = request.session.get("user_id")
 
-    c = get_object_or_404(BlogsComments, bc_comment_id=comment_id, bc_is_deleted=0)
+    # bc_blog is needed for every redirect below
+    c = get_object_or_404(
+        BlogsComments.objects.select_related("bc_blog"), bc_comment_id=comment_id, bc_is_deleted=0
+    )
 
     # Only viewer can edit (same rule as "only viewer can comment")
     if role != "viewer":
@@ -975,13 +1103,7 @@ def y_comment_edit(request, comment_id):
         messages.error(request, "Comment cannot be empty.")
         return redirect("y_blog_detail", slug=c.bc_blog.bd_slug)
 
-    c.bc_comment = new_text
-
-    # Optional safe update if field exists
-    if hasattr(c, "bc_updated_at"):
-        c.bc_updated_at = timezone.now()
-
-    c.save()
+    edit_comment(c, new_text)
     messages.success(request, "Comment updated.")
     return redirect("y_blog_detail", slug=c.bc_blog.bd_slug)
 
@@ -991,7 +1113,10 @@ def y_comment_delete(request, comment_id):
     role = request.session.get("user_role", "viewer")
     user_id = request.session.get("user_id")
 
-    c = get_object_or_404(BlogsComments, bc_comment_id=comment_id, bc_is_deleted=0)
+    # bc_blog is needed for every redirect below
+    c = get_object_or_404(
+        BlogsComments.objects.select_related("bc_blog"), bc_comment_id=comment_id, bc_is_deleted=0
+    )
 
     if role != "viewer":
         messages.error(request, "Only viewer can delete comments.")
@@ -1004,96 +1129,81 @@ def y_comment_delete(request, comment_id):
     if request.method != "POST":
         return redirect("y_blog_detail", slug=c.bc_blog.bd_slug)
 
-    # Soft delete
-    c.bc_is_deleted = 1
-    if hasattr(c, "bc_updated_at"):
-        c.bc_updated_at = timezone.now()
-
-    c.save(update_fields=["bc_is_deleted"] + (["bc_updated_at"] if hasattr(c, "bc_updated_at") else []))
+    # Soft delete (replies stay in the thread under a placeholder)
+    soft_delete_comment(c)
     messages.success(request, "Comment deleted.")
     return redirect("y_blog_detail", slug=c.bc_blog.bd_slug)
 
-@login_required_y
-def y_blog_like_toggle(request, blog_id):
-    role = request.session.get("user_role", "viewer")
-    user_id = request.session.get("user_id")
 
-    if request.method != "POST":
-        return redirect("y_home")
-    if role != "viewer":
-        messages.error(request, "Only viewer can like blogs.")
-        return redirect("y_home")
-
-    blog = get_object_or_404(BlogsDetails, bd_blog_id=blog_id, bd_is_deleted=0)
-
-    # Optional: only allow likes on published blogs
-    if blog.bd_blog_status != "Published":
-        messages.error(request, "You can like only published blogs.")
-        return redirect("y_blog_detail", slug=blog.bd_slug)
+@login_required_y
+def y_comment_replies(request, comment_id):
+    """HTML rows of the replies under a comment, loaded by the "show more" links."""
+    c = get_object_or_404(
+        BlogsComments,
+        bc_comment_id=comment_id,
+        bc_status="Approved",
+        bc_blog__bd_is_deleted=0,
+    )
+    rows, next_after = replies_page(c, request.GET.get("after"))
 
-    existing = BlogsLikes.objects.filter(bl_blog=blog, bl_user_id=user_id)
+    return render(request, "blog/_comment.html", {
+        "rows": rows,
+        "next_after": next_after,
+        "parent": c,
+    })
 
-    if existing.exists():
-        existing.delete()
-        messages.success(request, "Like removed.")
-    else:
-        try:
-            BlogsLikes.objects.create(bl_blog=blog, bl_user_id=user_id)
-            messages.success(request, "Liked!")
-        except IntegrityError:
-            # safety (in case double submit)
-            pass
 
-    return redirect("y_blog_detail", slug=blog.bd_slug)
+@login_required_y
+@role_required("admin")
+def y_cache_stats(request):
+    """Fragment cache hits/misses of this worker process."""
+    return JsonResponse({"fragments": fragment_stats.snapshot()})
 
 #---------------------analytics---------------------
 @login_required_y
 @role_required("admin", "writer")
-def y_analytics(request):
-    role = request.session.get("user_role")
-    user_id = request.session.get("user_id")
+async def y_analytics(request):
+    role = await request.session.aget("user_role")
+    user_id = await request.session.aget("user_id")
 
     blogs_qs = BlogsDetails.objects.filter(bd_is_deleted=0)
-    comments_qs = BlogsComments.objects.filter(bc_is_deleted=0, bc_status="Approved")
-    likes_qs = BlogsLikes.objects.all()
 
     # Writer = only own blogs
     if role == "writer":
         blogs_qs = blogs_qs.filter(bd_user_id=user_id)
-        comments_qs = comments_qs.filter(bc_blog__bd_user_id=user_id)
-        likes_qs = likes_qs.filter(bl_blog__bd_user_id=user_id)
-
-    total_published = blogs_qs.filter(bd_blog_status="Published").count()
-    total_drafts = blogs_qs.filter(bd_blog_status="Draft").count()
-    total_views = blogs_qs.aggregate(v=Sum("bd_views"))["v"] or 0
-
-    total_comments = comments_qs.count()
-    total_likes = likes_qs.count()
-
-    # Top viewed blogs
-    top_viewed = (
-        blogs_qs.filter(bd_blog_status="Published")
-        .order_by("-bd_views", "-bd_blog_id")[:5]
-    )
 
-    # Last 7 days: daily views (simple)
-    today = timezone.now().date()
-    start_date = today - timedelta(days=6)
-
-    daily_views = (
-        blogs_qs.filter(bd_blog_status="Published", bd_date_added__gte=start_date)
-        .annotate(day=TruncDate("bd_date_added"))
-        .values("day")
-        .annotate(views=Sum("bd_views"))
-        .order_by("day")
+    # Views per day/week/month from the pre-aggregated rollups (blog/rollups.py)
+    try:
+        window = int(request.GET.get("range") or 7)
+    except ValueError:
+        window = 7
+    if window not in CHART_PERIODS:
+        window = 7
+
+    scope = user_scope(user_id) if role == "writer" else SCOPE_ALL
+
+    # the totals, the top posts and the chart are independent queries
+    totals, top_viewed, chart = await gather_sync(
+        # one pass over blogs_details using the denormalized counters (no joins)
+        lambda: blogs_qs.aggregate(
+            published=Count("bd_blog_id", filter=Q(bd_blog_status="Published")),
+            drafts=Count("bd_blog_id", filter=Q(bd_blog_status="Draft")),
+            views=Sum("bd_views"),
+            comments=Sum("bd_comment_count"),
+            likes=Sum("bd_like_count"),
+        ),
+        # Top viewed blogs
+        lambda: list(
+            blogs_qs.filter(bd_blog_status="Published")
+            .order_by("-bd_views", "-bd_blog_id")[:5]
+        ),
+        lambda: views_chart(scope, window),
     )
-
-    # ensure all 7 days exist (fill missing days with 0)
-    day_map = {row["day"]: row["views"] for row in daily_views}
-    chart = []
-    for i in range(7):
-        d = start_date + timedelta(days=i)
-        chart.append({"day": d, "views": day_map.get(d, 0)})
+    total_published = totals["published"]
+    total_drafts = totals["drafts"]
+    total_views = totals["views"] or 0
+    total_comments = totals["comments"] or 0
+    total_likes = totals["likes"] or 0
 
     return render(request, "blog/y_analytics.html", {
         "role": role,
@@ -1104,68 +1214,66 @@ def y_analytics(request):
         "total_likes": total_likes,
         "top_viewed": top_viewed,
         "chart": chart,
+        "window": window,
+        "period": CHART_PERIODS[window],
+        "windows": sorted(CHART_PERIODS),
     })
 
-@login_required_y
-def y_blog_bookmark_toggle(request, blog_id):
-    role = request.session.get("user_role", "viewer")
-    user_id = request.session.get("user_id")
+#---------------Bookmarks-----------------
+BOOKMARKS_PER_PAGE = 12
+BOOKMARK_CARD_FIELDS = (
+    "bb_id", "bb_created_at", "bb_blog__bd_blog_id", "bb_blog__bd_slug",
+    "bb_blog__bd_blog_title", "bb_blog__bd_excerpt", "bb_blog__bd_blog_status",
+)
 
-    if request.method != "POST":
-        return redirect("y_home")
-
-    if role != "viewer":
-        messages.error(request, "Only viewers can bookmark blogs.")
-        return redirect("y_home")
-
-    blog = get_object_or_404(BlogsDetails, bd_blog_id=blog_id, bd_is_deleted=0)
-
-    if blog.bd_blog_status != "Published":
-        messages.error(request, "Only published blogs can be bookmarked.")
-        return redirect("y_blog_detail", slug=blog.bd_slug)
-
-    existing = BlogsBookmarks.objects.filter(bb_blog_id=blog_id, bb_user_id=user_id)
-
-    if existing.exists():
-        existing.delete()
-        messages.success(request, "Removed from bookmarks.")
-    else:
-        try:
-            BlogsBookmarks.objects.create(bb_blog_id=blog_id, bb_user_id=user_id)
-            messages.success(request, "Saved to bookmarks.")
-        except IntegrityError:
-            pass
-
-    return redirect("y_blog_detail", slug=blog.bd_slug)
 
 @login_required_y
-def y_bookmarks(request):
-    role = request.session.get("user_role", "viewer")
-    user_id = request.session.get("user_id")
+async def y_bookmarks(request):
+    role = await request.session.aget("user_role", "viewer")
+    user_id = await request.session.aget("user_id")
 
     if role != "viewer":
         messages.error(request, "Only viewers can access bookmarks.")
         return redirect("y_home")
 
     q = (request.GET.get("q") or "").strip()
+    token = request.GET.get("cursor")
 
+    # the bookmarked posts' titles and excerpts change with the feed generation
+    etag = page_etag(request, user_id, role, bookmarks_version(user_id), *feed_validator(), q, token or "")
+    if response := not_modified(request, etag):
+        return response
+
+    # only what a card shows: no bd_blog_content, walked along bb_user_created_idx
     qs = (
         BlogsBookmarks.objects
         .filter(bb_user_id=user_id)
         .select_related("bb_blog")
-        .order_by("-bb_created_at")
+        .only(*BOOKMARK_CARD_FIELDS)
     )
 
     if q:
-        qs = qs.filter(
-            Q(bb_blog__bd_blog_title__icontains=q) |
-            Q(bb_blog__bd_excerpt__icontains=q) |
-            Q(bb_blog__bd_slug__icontains=q)
-        )
+        # through the search index instead of LIKE over the joined posts
+        cond = match_filter(q, "bb_blog_id")
+        qs = qs.filter(cond) if cond is not None else qs.none()
 
-    return render(request, "blog/y_bookmarks.html", {
-        "bookmarks": qs,
+    paginator = KeysetPaginator(qs, ("bb_created_at", "bb_id"), BOOKMARKS_PER_PAGE)
+    page_obj = await sync_to_async(paginator.page)(token)
+
+    return with_validators(render(request, "blog/y_bookmarks.html", {
+        "page_obj": page_obj,
+        "bookmarks": page_obj,
+        **page_links(request, page_obj),
         "q": q,
         "role": role
-    })
+    }), etag)
+
+
 
+#---------------------media---------------------
+def y_media(request, path):
+    """Uploaded files in development; blobs and their variants are cached for good (blog/blobs.py)."""
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if IMMUTABLE_PATH.match(path):
+        response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return response
@@ -49,6 +49,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "blog.users.CurrentUserMiddleware",
+    "blog.middleware.QueryInstrumentationMiddleware",
 ]
 
 ROOT_URLCONF = "myblog.urls"
@@ -115,6 +117,10 @@ CSRF_COOKIE_SECURE = False
 CSRF_COOKIE_HTTPONLY = False
 CSRF_COOKIE_SAMESITE = "Lax"
 SESSION_COOKIE_SAMESITE = "Lax"
+# Sessions stay in django_session (one read per logged-in request) unless
+# BLOG_REDIS_URL is set, which switches to "cached_db" below. There is no
+# per-process session cache: a logout would not reach the other workers.
+SESSION_ENGINE = "django.contrib.sessions.backends.db"
 
 CSRF_TRUSTED_ORIGINS = [
     "http://127.0.0.1:8000",
@@ -144,5 +150,96 @@ STATIC_URL = "static/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Blog post views are buffered in memory and written in batches
+BLOG_VIEW_FLUSH_INTERVAL = 10  # seconds
+BLOG_VIEW_FLUSH_MAX_PENDING = 1000  # distinct posts
+BLOG_VIEW_ROLLUP_INTERVAL = 300  # seconds between analytics rollups
+
+# Caches for rendered page fragments. LocMemCache is per worker process;
+# set BLOG_REDIS_URL to share one cache (and its version keys) across workers.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "myblog",
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+    # viewed-today filters (blog/viewed.py): never culled with the fragments.
+    # Per process here, which is only right for a single dev server.
+    "viewed": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "myblog-viewed",
+        "OPTIONS": {"MAX_ENTRIES": 1_000_000},
+    },
+}
+if os.environ.get("BLOG_REDIS_URL"):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["BLOG_REDIS_URL"],
+    }
+    CACHES["viewed"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["BLOG_REDIS_URL"],
+        "KEY_PREFIX": "viewed",
+    }
+    # sessions read from the shared cache, written through to django_session on change.
+    # Not with LocMemCache: other workers would keep serving a session after logout.
+    SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+BLOG_FRAGMENT_CACHE_TIMEOUT = 600  # seconds
+BLOG_FEED_CACHE_TIMEOUT = 300  # seconds, backstop for the counters on feed cards
+BLOG_CATEGORY_REGISTRY_MAX_AGE = 300  # seconds before a worker reloads categories anyway
+BLOG_VIEWED_FILTER_BITS = 8192  # per user per day (blog/viewed.py); ~0.15% misses at 500 posts/day
+BLOG_VIEWED_FILTER_HASHES = 5
+BLOG_VIEWED_CACHE = "viewed"
+# a per-process viewed cache is a warning (blog.W001); True makes it an error
+# (blog.E002), for deployments that always run with BLOG_REDIS_URL
+BLOG_VIEWED_REQUIRE_SHARED = False
+BLOG_USER_CACHE_SIZE = 1024  # users kept per process for request.current_user (blog/users.py)
+BLOG_USER_CACHE_TTL = 60  # seconds
+
+# Per-request SQL instrumentation (blog/middleware.py)
+BLOG_QUERY_INSTRUMENTATION = DEBUG
+BLOG_QUERY_REPEAT_THRESHOLD = 5  # same fingerprint this often in one request -> N+1 warning
+BLOG_QUERY_BUDGET_DEFAULT = 30
+BLOG_QUERY_BUDGETS = {
+    "y_home": 8,
+    "y_blog_detail": 12,
+    "y_dashboard": 8,
+    "y_analytics": 10,
+}
+BLOG_QUERY_BUDGET_ACTION = "log"  # or "raise" while developing
+
+# Password hashing pool (blog/passwords.py)
+BLOG_PASSWORD_HASH_WORKERS = 2  # processes; 0 hashes inline on the request thread
+BLOG_PASSWORD_HASH_MAX_PENDING = 16  # running + queued hashes per web process
+BLOG_PASSWORD_HASH_WAIT = 2  # seconds to wait for a slot before answering 503
+BLOG_PASSWORD_HASH_TIMEOUT = 10  # seconds
+
+# Threads (each with its own DB connection) running the independent queries of
+# the async views side by side (blog/parallel.py)
+BLOG_ASYNC_QUERY_THREADS = 8
+BLOG_ASYNC_QUERY_CONN_MAX_AGE = 300  # seconds; below MySQL's wait_timeout
+
 MEDIA_URL = "/media/"
-MEDIA_ROOT = os.path.join(BASE_DIR, "media")
\ No newline at end of file
+MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+
+# Uploaded images (blog/images.py): resized variants are built by a background thread
+BLOG_IMAGE_MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+BLOG_IMAGE_MAX_PIXELS = 40_000_000
+BLOG_IMAGE_WORKERS = 1
+# Uploads are content-addressed (blog/blobs.py); `manage.py gc_media` keeps
+# unreferenced blobs this long before deleting them
+BLOG_MEDIA_GC_GRACE_HOURS = 24
+
+# Background jobs (blog/jobs.py), run by `manage.py run_workers`
+BLOG_JOB_WORKERS = 2  # processes
+BLOG_JOB_POLL_INTERVAL = 1.0  # seconds an idle worker waits
+BLOG_JOB_MAX_ATTEMPTS = 5
+BLOG_JOB_BACKOFF = 30  # seconds before the first retry, doubled for each next one
+BLOG_JOB_LOCK_TIMEOUT = 300  # a running job older than this is assumed lost and retried
+BLOG_JOB_KEEP_DAYS = 7  # finished jobs are deleted after this
+BLOG_MAIL_BATCH_SIZE = 50  # mails sent over one SMTP connection
+
+# `manage.py seed_blog` migrates and fills the configured database with
+# synthetic rows. Only settings for a throwaway database (settings_bench,
+# settings_test) turn this on; elsewhere the command needs --yes.
+BLOG_SEEDING_ALLOWED = False
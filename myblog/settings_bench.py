@@ -0,0 +1,39 @@
+"""
+Settings for `manage.py benchmark`: the normal settings on a throwaway
+SQLite database, with dev-only instrumentation off.
+
+    python manage.py benchmark --settings=myblog.settings_bench
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+DEBUG = False
+ALLOWED_HOSTS = ["testserver", "localhost", "127.0.0.1"]
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.environ.get("BLOG_BENCH_DB", str(BASE_DIR / "bench.sqlite3")),
+    }
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "bench",
+    },
+    "viewed": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "bench-viewed",
+    },
+}
+# one process: the per-process viewed filter is exact here
+SILENCED_SYSTEM_CHECKS = ["blog.W001"]
+
+# a throwaway database: seed_blog may fill it
+BLOG_SEEDING_ALLOWED = True
+
+# query counts are measured by the benchmark itself
+BLOG_QUERY_INSTRUMENTATION = False
@@ -0,0 +1,43 @@
+"""
+Settings for the test suite: the normal settings on SQLite, with the
+unmanaged blogs_* tables created by the runner (myblog/test_runner.py).
+
+    python manage.py test blog --settings=myblog.settings_test
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+DEBUG = False
+ALLOWED_HOSTS = ["testserver"]
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        # the test database itself is in memory
+        "NAME": str(BASE_DIR / "test.sqlite3"),
+    }
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test",
+    },
+    "viewed": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test-viewed",
+    },
+}
+# one process: the per-process viewed filter is exact here
+SILENCED_SYSTEM_CHECKS = ["blog.W001"]
+
+# hash inline and cheaply
+BLOG_PASSWORD_HASH_WORKERS = 0
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+# a throwaway database: seed_blog may fill it
+BLOG_SEEDING_ALLOWED = True
+
+BLOG_QUERY_INSTRUMENTATION = False
+
+TEST_RUNNER = "myblog.test_runner.BlogTestRunner"
@@ -0,0 +1,20 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.test.runner import DiscoverRunner
+
+
+class BlogTestRunner(DiscoverRunner):
+    """
+    Django creates no tables for unmanaged models, and most blogs_* tables
+    are unmanaged (they come from the MySQL schema). Create them on the test
+    databases the same way the benchmark does (seeding.ensure_schema).
+    """
+
+    def setup_databases(self, **kwargs):
+        from blog.seeding import ensure_schema
+
+        config = super().setup_databases(**kwargs)
+        # only once the test database is in place: with no database tests
+        # none is created, and this would migrate the configured one
+        if any(conn.alias == DEFAULT_DB_ALIAS for conn, _, _ in config):
+            ensure_schema()
+        return config
@@ -15,12 +15,15 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
-from django.conf.urls.static import static
 from django.http import JsonResponse
 
+from blog.views import y_media
+
 def chrome_devtools_dummy(request):
     return JsonResponse({}, status=200)
 
@@ -30,4 +33,5 @@ urlpatterns = [
     path(".well-known/appspecific/com.chrome.devtools.json", chrome_devtools_dummy),
 ]
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    # like static(), plus the immutable Cache-Control of content-addressed uploads
+    urlpatterns += [re_path(r"^%s(?P<path>.*)$" % re.escape(settings.MEDIA_URL.lstrip("/")), y_media)]
\ No newline at end of file